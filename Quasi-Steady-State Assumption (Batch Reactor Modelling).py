@@ -33,38 +33,19 @@
 #------------------------------------------------------------------------------------------------------------------
 
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.integrate import solve_ivp
 import warnings
+from chemical_kinetics import solve_batch, solve_kinetics
+from chemical_kinetics.models import (series_reactions_batch, series_reactions_batch_jac,
+                                      series_reactions_batch_QSSA, series_reactions_batch_QSSA_jac)
+from chemical_kinetics import plotting
 warnings.filterwarnings("ignore")
 
-plt.rcParams["axes.labelsize"] = 14
-plt.rcParams['font.family'] = 'Times New Roman'
+# The species balances of the full and QSSA models are defined in chemical_kinetics/models.py.
 
 #------------------------------------------------------------------------------------------------------------------
 #                        Part 1 : Solving Full Reaction Model ODE Equations
 #------------------------------------------------------------------------------------------------------------------
 
-def series_reactions_batch(t,c_ini,k):
-    
-    # Batch reactor component species balances used to model series reaction.
-    
-    CA = c_ini[0]
-    CB = c_ini[1]
-    CC = c_ini[2] 
-    
-    k1  = k[0] 
-    k2  = k[1] 
-    
-    r1 = k1*CA 
-    r2 = k2*CB 
-    
-    dCAdt = -r1
-    dCBdt = r1 -r2
-    dCCdt = r2
-    
-    return [dCAdt,dCBdt,dCCdt]
-
 #For reaction A -> B :
 k1  = 2     #[1/s]
 
@@ -83,174 +64,45 @@ CC0 = 0      #[mol/L]
 
 c_ini = [CA0, CB0, CC0]
 
-# Solving the ODE reaction model describing the reaction series:
-conc_sol = solve_ivp(series_reactions_batch, [0, t[-1]], c_ini, t_eval=t, method='Radau', args=[k])
-CA=conc_sol.y[0]
-CB=conc_sol.y[1]
-CC=conc_sol.y[2]
+# Solving the ODE reaction model describing the reaction series (the model is linear, so it is
+# evaluated in closed form as C(t) = expm(K t) C0 instead of integrating it with Radau):
+conc_sol = solve_kinetics(series_reactions_batch, [0, t[-1]], c_ini, t_eval=t, method='Radau', jac=series_reactions_batch_jac, args=[k])
 
 # Plotting Results:
-fig = plt.figure(figsize=(9,6))
-plt.plot(t,CA,'k',label='A')
-plt.plot(t,CB,'r',label='B')
-plt.plot(t,CC,'g',label='C')
-plt.xlabel('Time [s]')
-plt.ylabel('Concentration [mol/L]')
-plt.title('Concentration Evolution of Species in Batch Reactor',fontsize = 15)
-plt.grid(True, color = "grey", linewidth = "1.0", linestyle = "-")
-plt.legend(loc='center right',shadow='True',fontsize=14)
-plt.show()
+plotting.plot_concentrations(t, conc_sol.y, 'Concentration Evolution of Species in Batch Reactor', legend_loc='center right')
+plotting.show()
 
 #------------------------------------------------------------------------------------------------------------------
 #           Part 2 : Solving Full Reaction Model ODE Equations With Increasing k2 values
 #------------------------------------------------------------------------------------------------------------------
 
-# Case 1:
-k2_10  = 10     #[1/s]
-k_10 = [k1, k2_10]
-
-conc_sol_10 = solve_ivp(series_reactions_batch, [0, t[-1]], c_ini, t_eval=t, method='Radau', args=[k_10])
-CA_10=conc_sol_10.y[0]
-CB_10=conc_sol_10.y[1]
-CC_10=conc_sol_10.y[2]
-
-# Case 2:
-k2_100  = 100     #[1/s]
-k_100 = [k1,k2_100]
-
-conc_sol_100 = solve_ivp(series_reactions_batch, [0, t[-1]], c_ini, t_eval=t, method='Radau', args=[k_100])
-CA_100=conc_sol_100.y[0]
-CB_100=conc_sol_100.y[1]
-CC_100=conc_sol_100.y[2]
-
-# Case 3:
-k2_1000  = 1000     #[1/s]
-k_1000 = [k1, k2_1000]
-
-conc_sol_1000 = solve_ivp(series_reactions_batch, [0, t[-1]], c_ini, t_eval=t, method='Radau', args=[k_1000])
-CA_1000=conc_sol_1000.y[0]
-CB_1000=conc_sol_1000.y[1]
-CC_1000=conc_sol_1000.y[2]
-
-# Case 4:
-k2_10000  = 10000     #[1/s]
-k_10000 = [k1, k2_10000]
-
-conc_sol_10000 = solve_ivp(series_reactions_batch, [0, t[-1]], c_ini, t_eval=t, method='Radau', args=[k_10000])
-CA_10000=conc_sol_10000.y[0]
-CB_10000=conc_sol_10000.y[1]
-CC_10000=conc_sol_10000.y[2]
+# Cases 1-4 (k2 = 10, 100, 1000, 10000) are integrated together in one batched solve,
+# with one row of rate constants per case:
+k2_sweep = [10, 100, 1000, 10000]     #[1/s]
+k_sweep = [[k1, k2_case] for k2_case in k2_sweep]
 
+C_sweep = solve_batch(series_reactions_batch, [0, t[-1]], c_ini, k_sweep, t_eval=t, method='Radau', jac=series_reactions_batch_jac)
 
 # Plotting Results:
-fig, axs = plt.subplots(nrows=2, ncols=2, figsize=(20, 15), dpi=150) 
-fig.suptitle('Concentration Evolution of Species in Batch Reactor With Increasing k$_2$ ',fontsize = 37,y=0.95)
-axs[0,0].plot(t,CA,'k-',label='A| k$_2$ = 1')
-axs[0,0].plot(t,CB,'r-',label='B| k$_2$ = 1')
-axs[0,0].plot(t,CC,'g-',label='C| k$_2$ = 1')
-axs[0,0].plot(t,CA_10,'k--',label='A| k$_2$ = 10')
-axs[0,0].plot(t,CB_10,'r--',label='B| k$_2$ = 10')
-axs[0,0].plot(t,CC_10,'g--',label='C| k$_2$ = 10')
-axs[0,0].set_xlabel('Time [s]',fontsize = 20)
-axs[0,0].set_ylabel('Concentration [mol/L]',fontsize = 20)
-axs[0,0].set_title('k$_2$ = 10 [1/s]',fontsize = 20)
-axs[0,0].grid(True, color = "grey", linewidth = "1.0", linestyle = "-")
-axs[0,0].legend(loc='upper right',shadow='True',fontsize=14)  
-
-axs[0,1].plot(t,CA,'k-',label='A| k$_2$ = 1')
-axs[0,1].plot(t,CB,'r-',label='B| k$_2$ = 1')
-axs[0,1].plot(t,CC,'g-',label='C| k$_2$ = 1')
-axs[0,1].plot(t,CA_100,'k--',label='A| k$_2$ = 100')
-axs[0,1].plot(t,CB_100,'r--',label='B| k$_2$ = 100')
-axs[0,1].plot(t,CC_100,'g--',label='C| k$_2$ = 100')
-axs[0,1].set_xlabel('Time [s]',fontsize = 20)
-axs[0,1].set_ylabel('Concentration [mol/L]',fontsize = 20)
-axs[0,1].set_title('k$_2$ = 100 [1/s]',fontsize = 20)
-axs[0,1].grid(True, color = "grey", linewidth = "1.0", linestyle = "-")
-axs[0,1].legend(loc='upper right',shadow='True',fontsize=14)  
-
-axs[1,0].plot(t,CA,'k-',label='A| k$_2$ = 1')
-axs[1,0].plot(t,CB,'r-',label='B| k$_2$ = 1')
-axs[1,0].plot(t,CC,'g-',label='C| k$_2$ = 1')
-axs[1,0].plot(t,CA_1000,'k--',label='A| k$_2$ = 1000')
-axs[1,0].plot(t,CB_1000,'r--',label='B| k$_2$ = 1000')
-axs[1,0].plot(t,CC_1000,'g--',label='C| k$_2$ = 1000')
-axs[1,0].set_xlabel('Time [s]',fontsize = 20)
-axs[1,0].set_ylabel('Concentration [mol/L]',fontsize = 20)
-axs[1,0].set_title('k$_2$ = 1000 [1/s]',fontsize = 20)
-axs[1,0].grid(True, color = "grey", linewidth = "1.0", linestyle = "-")
-axs[1,0].legend(loc='upper right',shadow='True',fontsize=14)   
-
-axs[1,1].plot(t,CA,'k-',label='A| k$_2$ = 1')
-axs[1,1].plot(t,CB,'r-',label='B| k$_2$ = 1')
-axs[1,1].plot(t,CC,'g-',label='C| k$_2$ = 1')
-axs[1,1].plot(t,CA_10000,'k--',label='A| k$_2$ = 10000')
-axs[1,1].plot(t,CB_10000,'r--',label='B| k$_2$ = 10000')
-axs[1,1].plot(t,CC_10000,'g--',label='C| k$_2$ = 10000')
-axs[1,1].set_xlabel('Time [s]',fontsize = 20)
-axs[1,1].set_ylabel('Concentration [mol/L]',fontsize = 20)
-axs[1,1].set_title('k$_2$ = 10000 [1/s]',fontsize = 20)
-axs[1,1].grid(True, color = "grey", linewidth = "1.0", linestyle = "-")
-axs[1,1].legend(loc='upper right',shadow='True',fontsize=14)   
-plt.show()
+plotting.plot_k2_sweep(t, conc_sol.y, C_sweep, 'k$_2$ = 1', ['k$_2$ = %g' % k2_case for k2_case in k2_sweep],
+                       'Concentration Evolution of Species in Batch Reactor With Increasing k$_2$ ', suptitle_fontsize=37)
+plotting.show()
 
 #------------------------------------------------------------------------------------------------------------------
 #          Part 3 : Applying QSSA Approximation to Obtain Simplified ODE Reaction Model
 #------------------------------------------------------------------------------------------------------------------
 
-def series_reactions_batch_QSSA(t,c_ini,k):
-    
-    # Batch reactor component species balances obtained using QSSA approximation
-    
-   CA = c_ini[0]
-   CB = c_ini[1]
-   CC = c_ini[2] 
-   
-   k1  = k[0] 
-   k2  = k[1] 
-   
-   r1 = k1*CA 
-   r2 = 0
-   
-   dCAdt = -r1
-   dCBdt = 0
-   dCCdt = r1
-   
-   return [dCAdt,dCBdt,dCCdt]
-
 # Solving the ODE reaction model describing the reaction series:
-conc_sol_QSSA = solve_ivp(series_reactions_batch_QSSA, [0, t[-1]], c_ini, t_eval=t, method='Radau', args=[k])
-CA_QSSA=conc_sol_QSSA.y[0]
-CB_QSSA=conc_sol_QSSA.y[1]
-CC_QSSA=conc_sol_QSSA.y[2]
+conc_sol_QSSA = solve_kinetics(series_reactions_batch_QSSA, [0, t[-1]], c_ini, t_eval=t, method='Radau', jac=series_reactions_batch_QSSA_jac, args=[k])
 
 # Plotting Results:
-fig = plt.figure(figsize=(9,6))
-plt.plot(t,CA_QSSA,'k',label='A')
-plt.plot(t,CB_QSSA,'r',label='B')
-plt.plot(t,CC_QSSA,'g',label='C')
-plt.xlabel('Time [s]')
-plt.ylabel('Concentration [mol/L]')
-plt.title('Concentration Evolution of Species in Batch Reactor (QSSA Approximation)',fontsize = 15)
-plt.grid(True, color = "grey", linewidth = "1.0", linestyle = "-")
-plt.legend(loc='center right',shadow='True',fontsize=14)
-plt.show()
+plotting.plot_concentrations(t, conc_sol_QSSA.y, 'Concentration Evolution of Species in Batch Reactor (QSSA Approximation)', legend_loc='center right')
+plotting.show()
 
 #------------------------------------------------------------------------------------------------------------------
 #               Part 4 : Comparison of QSSA Approximation to Full Reaction Model
 #------------------------------------------------------------------------------------------------------------------
 
 # Plotting Comparison:
-fig = plt.figure(figsize=(9,6))
-plt.plot(t,CA_QSSA,'k',label='A| REA approx.')
-plt.plot(t,CB_QSSA,'r',label='B| REA approx.')
-plt.plot(t,CC_QSSA,'g',label='C| REA approx.')
-plt.plot(t,CA_10,'k--',label='A| k$_2$ = k$_{2}$ = 10')
-plt.plot(t,CB_10,'r--',label='B| k$_2$ = k$_{2}$ = 10')
-plt.plot(t,CC_10,'g--',label='C| k$_2$ = k$_{2}$ = 10')
-plt.xlabel('Time [s]')
-plt.ylabel('Concentration [mol/L]')
-plt.title('Comparison of QSSA Approximation to Full Reaction Model',fontsize = 15)
-plt.grid(True, color = "grey", linewidth = "1.0", linestyle = "-")
-plt.legend(loc='upper right',shadow='True',fontsize=12)
-plt.show()
\ No newline at end of file
+plotting.plot_comparison(t, conc_sol_QSSA.y, C_sweep[0], 'QSSA approx.', 'k$_2$ = 10', 'Comparison of QSSA Approximation to Full Reaction Model')
+plotting.show()
@@ -0,0 +1,63 @@
+"""Stored baseline of the machine-independent metrics of the regression suite.
+
+Timings depend on the machine and are tracked by pytest-benchmark itself
+(``--benchmark-autosave`` / ``--benchmark-compare``). Solver work (nfev, njev,
+nlu), peak memory and accuracy do not, so they are kept in ``baseline.json``
+next to this file, committed with the code, and every run fails a case whose
+metric grew beyond the slack below. ``--update-baseline`` rewrites the file
+with the values of the run instead of checking them.
+"""
+
+import json
+import os
+
+import pytest
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Allowed relative growth per metric; every metric is "lower is better".
+SLACK = {"nfev": 0.1, "njev": 0.1, "nlu": 0.1, "peak_kib": 0.25, "error": 1.0}
+
+
+def pytest_addoption(parser):
+    parser.addoption("--update-baseline", action="store_true",
+                     help="Rewrite benchmarks/baseline.json with the metrics of this run.")
+
+
+class Baseline:
+
+    def __init__(self, path, update):
+        self.path = path
+        self.update = update
+        self.stored = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.stored = json.load(f)
+        self.measured = {}
+
+    def check(self, key, benchmark, **metrics):
+        """Record ``metrics`` of case ``key`` and compare them with the baseline."""
+        metrics = {name: float(value) for name, value in metrics.items()}
+        benchmark.extra_info.update(metrics)
+        self.measured[key] = metrics
+        if self.update or key not in self.stored:
+            return
+        regressions = ["%s %.4g > %.4g" % (name, value, self.stored[key][name]*(1 + SLACK[name]))
+                       for name, value in metrics.items()
+                       if name in self.stored[key] and value > self.stored[key][name]*(1 + SLACK[name]) + 1e-15]
+        assert not regressions, "%s regressed: %s" % (key, ", ".join(regressions))
+
+    def save(self):
+        stored = {**self.stored, **self.measured}
+        with open(self.path, "w") as f:
+            json.dump({key: stored[key] for key in sorted(stored)}, f, indent=1)
+            f.write("\n")
+
+
+@pytest.fixture(scope="session")
+def baseline(request):
+    update = request.config.getoption("--update-baseline", default=False)
+    stored = Baseline(BASELINE, update)
+    yield stored
+    if update:
+        stored.save()
@@ -0,0 +1,58 @@
+"""Analytic vs finite-difference Jacobian in the Radau solves of the series reaction.
+
+Radau re-estimates the Jacobian by finite differences when jac is not
+supplied, which costs extra calls of the species balances. sol.nfev does not
+include those calls, so the balances are wrapped to count every call
+(rhs calls). Run from the repository root with
+``python -m benchmarks.jacobian``.
+"""
+
+import time
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from chemical_kinetics.models import series_reactions_batch, series_reactions_batch_jac
+
+K2_SWEEP = [1, 10, 100, 1000, 10000]
+
+
+def counted(fun, counter):
+    def fun_counted(t, c_ini, k):
+        counter[0] += 1
+        return fun(t, c_ini, k)
+
+    return fun_counted
+
+
+def benchmark(k_cases, c_ini, t):
+    """Return (rhs calls, nfev, njev, time [ms]) with and without jac for each case."""
+    rows = []
+    for k in k_cases:
+        stats = []
+        for jac in [series_reactions_batch_jac, None]:
+            counter = [0]
+            start = time.perf_counter()
+            sol = solve_ivp(counted(series_reactions_batch, counter), [0, t[-1]], c_ini, t_eval=t,
+                            method="Radau", jac=jac, args=[k])
+            stats += [counter[0], sol.nfev, sol.njev, 1000*(time.perf_counter() - start)]
+        rows.append(stats)
+    return rows
+
+
+def report(title, label, k2_sweep, rows):
+    print(title)
+    print("%8s | %-36s | %-36s" % ("", "analytic jac", "finite differences"))
+    print("%8s | %9s %6s %6s %11s | %9s %6s %6s %11s"
+          % (label, "rhs calls", "nfev", "njev", "time [ms]", "rhs calls", "nfev", "njev", "time [ms]"))
+    for k2, stats in zip(k2_sweep, rows):
+        print("%8g | %9d %6d %6d %11.2f | %9d %6d %6d %11.2f" % (k2, *stats))
+    print()
+
+
+if __name__ == "__main__":
+    t = np.linspace(0, 5, 110)
+    report("A -> B -> C (k1 = 2):", "k2", K2_SWEEP,
+           benchmark([[2, k2] for k2 in K2_SWEEP], [1, 0, 0], t))
+    report("A <-> B <-> C (k1 = 1, k_1 = 0.5):", "k2,k_2", K2_SWEEP,
+           benchmark([[1, 0.5, k2, k2] for k2 in K2_SWEEP], [2, 0.8, 0], t))
@@ -0,0 +1,68 @@
+"""Compiled (Numba) models against the Python models.
+
+Per RHS call: the Python model, the compiled model wrapped for solve_ivp by
+``compiled`` and the bare kernel writing into a preallocated array. Per full
+solve of the k2 sweep: solve_ivp Radau with the Python model and Jacobian,
+solve_ivp Radau with the compiled wrappers, and ``solve_jit``, which runs the
+whole ROS3 integration in compiled code. Compilation happens (and is cached)
+before timing. Run from the repository root with ``python -m benchmarks.jit``.
+"""
+
+import time
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from chemical_kinetics.jit import HAVE_NUMBA, KERNELS, compiled, solve_jit
+from chemical_kinetics.models import series_reactions_batch, series_reactions_batch_jac
+
+K2_SWEEP = [1, 10, 100, 1000, 10000]
+CALLS = 100000
+REPEATS = 20
+
+
+def per_call(fun, *args):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        fun(*args)
+    return (time.perf_counter() - start)/CALLS
+
+
+def per_solve(solve):
+    sol = solve()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        solve()
+    return (time.perf_counter() - start)/REPEATS, sol
+
+
+if __name__ == "__main__":
+    if not HAVE_NUMBA:
+        print("numba is not installed: the 'compiled' timings run the kernels as plain Python.")
+    rhs, jac = compiled(series_reactions_batch)
+    kernel = KERNELS[series_reactions_batch][0]
+    c, k, out = np.array([2, 0.8, 0.0]), np.array([1, 0.5, 100, 100.0]), np.empty(3)
+    kernel(0.0, c, k, out)
+    python = per_call(series_reactions_batch, 0.0, c, k)
+    wrapped = per_call(rhs, 0.0, c, k)
+    bare = per_call(kernel, 0.0, c, k, out)
+    print("RHS call: Python %.2f us | compiled wrapper %.2f us (%.1fx) | kernel into out %.2f us (%.1fx)\n"
+          % (1e6*python, 1e6*wrapped, python/wrapped, 1e6*bare, python/bare))
+
+    t = np.linspace(0, 5, 110)
+    solve_jit(series_reactions_batch, [0, t[-1]], [2, 0.8, 0], [1, 0.5, 1, 1], t_eval=t)
+    print("%-16s | %-15s | %-24s | %-24s | %s" % ("", "Radau, Python", "Radau, compiled RHS", "solve_jit (ROS3)",
+                                                 "max diff"))
+    print("%-16s | %6s %8s | %6s %8s %7s | %6s %8s %7s |" % ("k2 = k_2", "nfev", "ms", "nfev", "ms", "gain",
+                                                            "nfev", "ms", "gain"))
+    for k2 in K2_SWEEP:
+        k = [1, 0.5, k2, k2]
+        options = dict(t_eval=t, args=[np.array(k, dtype=float)], rtol=1e-6, atol=1e-9, method="Radau")
+        time_py, py = per_solve(lambda: solve_ivp(series_reactions_batch, [0, t[-1]], [2, 0.8, 0],
+                                                  jac=series_reactions_batch_jac, **options))
+        time_c, sol_c = per_solve(lambda: solve_ivp(rhs, [0, t[-1]], [2, 0.8, 0], jac=jac, **options))
+        time_jit, sol_jit = per_solve(lambda: solve_jit(series_reactions_batch, [0, t[-1]], [2, 0.8, 0], k,
+                                                        t_eval=t, rtol=1e-6, atol=1e-9))
+        print("%-16g | %6d %8.3f | %6d %8.3f %6.1fx | %6d %8.3f %6.1fx | %.1e"
+              % (k2, py.nfev, 1e3*time_py, sol_c.nfev, 1e3*time_c, time_py/time_c,
+                 sol_jit.nfev, 1e3*time_jit, time_py/time_jit, np.abs(sol_jit.y - py.y).max()))
@@ -0,0 +1,148 @@
+"""Performance regression suite for the batch models and effectiveness factors.
+
+Cases:
+
+- the full model ``series_reactions_batch``, irreversible (A -> B -> C) and
+  reversible (A <-> B <-> C), at every k2 of the sweep, solved with Radau and
+  the analytic Jacobian as in the example scripts;
+- the QSSA and REA reduced models at every k2, with their error against the
+  full model;
+- the effectiveness factors of the three shapes, in closed form and from
+  :class:`chemical_kinetics.tables.EffectivenessTable`, over 1e4 to 1e7 Thiele
+  moduli.
+
+Besides the timing, every case records nfev/njev/nlu, the peak memory of one
+call (tracemalloc) and its error: for the full model against the closed form
+expm(K t) C0, for the reduced models against the full model (the modelling
+error, which shrinks as k2 grows; the REA after the initial B <-> C
+relaxation), for the tables against the closed form.
+These are checked against ``benchmarks/baseline.json`` (see ``conftest.py``).
+
+Needs pytest-benchmark. Run from the repository root with::
+
+    python -m pytest benchmarks/regression.py --benchmark-autosave
+    python -m pytest benchmarks/regression.py --benchmark-compare --benchmark-compare-fail=median:20%
+
+The first stores the timings of the current commit under ``.benchmarks/``,
+the second fails if a case got more than 20 % slower than the last stored run.
+"""
+
+import gc
+import tracemalloc
+
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+pytest.importorskip("pytest_benchmark")
+
+from chemical_kinetics.effectiveness import effectiveness_cylinder, effectiveness_slab, effectiveness_sphere
+from chemical_kinetics.linear import propagate
+from chemical_kinetics.models import (
+    rea_initial_conditions,
+    series_reactions_batch,
+    series_reactions_batch_jac,
+    series_reactions_batch_QSSA,
+    series_reactions_batch_QSSA_jac,
+    series_reactions_batch_REA,
+    series_reactions_batch_REA_jac,
+)
+from chemical_kinetics.tables import EffectivenessTable
+
+K2_SWEEP = [1, 10, 100, 1000, 10000]
+T = np.linspace(0, 5, 110)
+# Rate constants and initial concentrations of the example scripts.
+CASES = {
+    "irreversible": (lambda k2: [2, k2], [1, 0, 0]),
+    "reversible": (lambda k2: [1, 0.5, k2, k2], [2, 0.8, 0]),
+}
+SHAPES = {"slab": effectiveness_slab, "cylinder": effectiveness_cylinder, "sphere": effectiveness_sphere}
+SIZES = [10**4, 10**5, 10**6, 10**7]
+
+
+def peak_kib(fun, *args, repeats=3):
+    """Peak memory allocated during a call of ``fun``, the least of ``repeats`` calls.
+
+    The garbage collector is paused so that its timing does not move the peak.
+    """
+    peaks = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            tracemalloc.start()
+            fun(*args)
+            peaks.append(tracemalloc.get_traced_memory()[1]/1024)
+            tracemalloc.stop()
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    return min(peaks)
+
+
+def exact(kind, k2):
+    k, c_ini = CASES[kind]
+    K = np.array(series_reactions_batch_jac(0, c_ini, k(k2)), dtype=float)
+    return propagate(K[None], c_ini, T)[0]
+
+
+def radau(fun, jac, c_ini, k):
+    sol = solve_ivp(fun, [0, T[-1]], c_ini, method="Radau", t_eval=T, jac=jac, args=[k])
+    assert sol.success, sol.message
+    return sol
+
+
+@pytest.mark.parametrize("k2", K2_SWEEP)
+@pytest.mark.parametrize("kind", sorted(CASES))
+def test_full_model(benchmark, baseline, kind, k2):
+    k, c_ini = CASES[kind]
+    solve = lambda: radau(series_reactions_batch, series_reactions_batch_jac, c_ini, k(k2))
+    sol = benchmark(solve)
+    baseline.check("full/%s/k2=%g" % (kind, k2), benchmark, nfev=sol.nfev, njev=sol.njev, nlu=sol.nlu,
+                   peak_kib=peak_kib(solve), error=np.abs(sol.y - exact(kind, k2)).max())
+
+
+@pytest.mark.parametrize("k2", K2_SWEEP)
+def test_qssa(benchmark, baseline, k2):
+    k, c_ini = CASES["irreversible"]
+    solve = lambda: radau(series_reactions_batch_QSSA, series_reactions_batch_QSSA_jac, c_ini, k(k2))
+    sol = benchmark(solve)
+    baseline.check("qssa/k2=%g" % k2, benchmark, nfev=sol.nfev, njev=sol.njev, nlu=sol.nlu,
+                   peak_kib=peak_kib(solve), error=np.abs(sol.y - exact("irreversible", k2)).max())
+
+
+@pytest.mark.parametrize("k2", K2_SWEEP)
+def test_rea(benchmark, baseline, k2):
+    _, c_ini = CASES["reversible"]
+    # k2 = k_2 throughout the sweep, so K2 = 1.
+    k = [1, 0.5, 1.0]
+    solve = lambda: radau(series_reactions_batch_REA, series_reactions_batch_REA_jac,
+                          rea_initial_conditions(c_ini, k[2]), k)
+    sol = benchmark(solve)
+    # The REA starts on the B <-> C equilibrium, which the full model reaches
+    # with the time constant 1/(k2 + k_2): compare after ten of them.
+    settled = T >= 10/(2*k2)
+    baseline.check("rea/k2=%g" % k2, benchmark, nfev=sol.nfev, njev=sol.njev, nlu=sol.nlu, peak_kib=peak_kib(solve),
+                   error=np.abs(sol.y - exact("reversible", k2))[:, settled].max())
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return {shape: EffectivenessTable.build(shape) for shape in SHAPES}
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("shape", sorted(SHAPES))
+def test_effectiveness(benchmark, baseline, shape, size):
+    thiele = np.logspace(-3, 3, size)
+    benchmark(SHAPES[shape], thiele)
+    baseline.check("effectiveness/%s/%d" % (shape, size), benchmark, peak_kib=peak_kib(SHAPES[shape], thiele))
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("shape", sorted(SHAPES))
+def test_effectiveness_table(benchmark, baseline, tables, shape, size):
+    thiele = np.logspace(-3, 3, size)
+    eta = benchmark(tables[shape], thiele)
+    baseline.check("table/%s/%d" % (shape, size), benchmark, peak_kib=peak_kib(tables[shape], thiele),
+                   error=np.abs(eta/SHAPES[shape](thiele) - 1).max())
@@ -0,0 +1,58 @@
+"""Automatic solver selection against always-Radau over the k2 sweep.
+
+Each case is solved with ``solve_ivp(..., method="Radau")`` and with
+``solve_kinetics(..., method="auto", closed_form=False)``, which picks RK45 or
+Radau per trajectory segment from the Jacobian eigenvalues. The closed form is
+disabled so that only the solver choice differs. Throughput is reported in
+solves per second. Run from the repository root with
+``python -m benchmarks.solver_selection``.
+"""
+
+import time
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from chemical_kinetics.linear import solve_kinetics
+from chemical_kinetics.models import (
+    series_reactions_batch,
+    series_reactions_batch_jac,
+    series_reactions_batch_QSSA,
+    series_reactions_batch_QSSA_jac,
+    series_reactions_batch_REA,
+    series_reactions_batch_REA_jac,
+)
+
+K2_SWEEP = [1, 10, 100, 1000, 10000]
+REPEATS = 20
+
+
+def throughput(solve):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        sol = solve()
+    return REPEATS/(time.perf_counter() - start), sol
+
+
+def compare(label, fun, jac, c_ini, k, t):
+    radau_rate, radau = throughput(lambda: solve_ivp(fun, [0, t[-1]], c_ini, t_eval=t, method="Radau",
+                                                     jac=jac, args=[k]))
+    auto_rate, auto = throughput(lambda: solve_kinetics(fun, [0, t[-1]], c_ini, t_eval=t, method="auto",
+                                                        jac=jac, args=[k], closed_form=False))
+    methods = "/".join(sorted({method for _, _, method, _ in auto.methods}))
+    print("%-22s | %6d %9.0f | %6d %9.0f %-11s | %5.2fx | %.1e"
+          % (label, radau.nfev, radau_rate, auto.nfev, auto_rate, methods, auto_rate/radau_rate,
+             np.abs(auto.y - radau.y).max()))
+
+
+if __name__ == "__main__":
+    t = np.linspace(0, 5, 110)
+    print("%-22s | %-16s | %-28s | %-6s | %s" % ("", "always Radau", "auto", "gain", "max diff"))
+    print("%-22s | %6s %9s | %6s %9s %-11s |" % ("case", "nfev", "solves/s", "nfev", "solves/s", "methods"))
+    for k2 in K2_SWEEP:
+        compare("A->B->C k2=%g" % k2, series_reactions_batch, series_reactions_batch_jac, [1, 0, 0], [2, k2], t)
+    for k2 in K2_SWEEP:
+        compare("A<->B<->C k2=k_2=%g" % k2, series_reactions_batch, series_reactions_batch_jac,
+                [2, 0.8, 0], [1, 0.5, k2, k2], t)
+    compare("QSSA", series_reactions_batch_QSSA, series_reactions_batch_QSSA_jac, [1, 0, 0], [2, 1], t)
+    compare("REA", series_reactions_batch_REA, series_reactions_batch_REA_jac, [2, 0.4, 0.4], [1, 0.5, 1], t)
@@ -0,0 +1,91 @@
+"""Reaction kinetics modelling tools for batch reactors, catalyst pellets and packed beds.
+
+Importing the package has no side effects: nothing is solved or plotted, and
+matplotlib is only loaded by :mod:`chemical_kinetics.plotting` when a figure
+is requested. The optional Numba backend, :mod:`chemical_kinetics.jit`, is not
+imported by the package.
+"""
+
+from chemical_kinetics.batch import solve_batch
+from chemical_kinetics.bed import pellet_effectiveness, solve_bed
+from chemical_kinetics.cache import TrajectoryCache
+from chemical_kinetics.effectiveness import (
+    effectiveness_cylinder,
+    effectiveness_slab,
+    effectiveness_sphere,
+    slab_profile,
+)
+from chemical_kinetics.equilibrium import conservation_laws, solve_steady_state
+from chemical_kinetics.events import Criterion, conversion, crossing, solve_until, steady_state
+from chemical_kinetics.fitting import Experiment, fit_rate_constants, forward_sensitivities
+from chemical_kinetics.linear import propagate, rate_matrix, solve_kinetics
+from chemical_kinetics.models import (
+    rea_initial_conditions,
+    series_reactions_batch,
+    series_reactions_batch_jac,
+    series_reactions_batch_QSSA,
+    series_reactions_batch_QSSA_jac,
+    series_reactions_batch_REA,
+    series_reactions_batch_REA_jac,
+)
+from chemical_kinetics.network import Reaction, ReactionNetwork, parse_reaction
+from chemical_kinetics.pellet import solve_pellet
+from chemical_kinetics.profiling import SolverProfiler
+from chemical_kinetics.reduction import ReducedModel, reduce_model
+from chemical_kinetics.stiffness import select_method, solve_auto, stiffness
+from chemical_kinetics.stream import TrajectoryStore, solve_stream
+from chemical_kinetics.surrogate import Surrogate, validation_report
+from chemical_kinetics.sweep import map_sweep, run_sweep
+from chemical_kinetics.tables import EffectivenessTable, effectiveness_tables
+from chemical_kinetics.uncertainty import StreamingStats, propagate_uncertainty
+
+__all__ = [
+    "conservation_laws",
+    "conversion",
+    "Criterion",
+    "crossing",
+    "effectiveness_cylinder",
+    "effectiveness_slab",
+    "effectiveness_sphere",
+    "effectiveness_tables",
+    "EffectivenessTable",
+    "Experiment",
+    "fit_rate_constants",
+    "forward_sensitivities",
+    "map_sweep",
+    "parse_reaction",
+    "pellet_effectiveness",
+    "propagate",
+    "propagate_uncertainty",
+    "rate_matrix",
+    "rea_initial_conditions",
+    "Reaction",
+    "ReactionNetwork",
+    "reduce_model",
+    "ReducedModel",
+    "run_sweep",
+    "select_method",
+    "series_reactions_batch",
+    "series_reactions_batch_jac",
+    "series_reactions_batch_QSSA",
+    "series_reactions_batch_QSSA_jac",
+    "series_reactions_batch_REA",
+    "series_reactions_batch_REA_jac",
+    "slab_profile",
+    "solve_auto",
+    "solve_batch",
+    "solve_bed",
+    "solve_kinetics",
+    "solve_pellet",
+    "solve_steady_state",
+    "solve_stream",
+    "solve_until",
+    "SolverProfiler",
+    "steady_state",
+    "stiffness",
+    "StreamingStats",
+    "Surrogate",
+    "TrajectoryCache",
+    "TrajectoryStore",
+    "validation_report",
+]
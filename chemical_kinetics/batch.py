@@ -0,0 +1,162 @@
+"""Batched integration of many rate-constant cases in a single solve_ivp call.
+
+The kinetic models in this repository are written as ``fun(t, c_ini, k)`` with
+the species and rate constants unpacked by index (``CA = c_ini[0]``,
+``k1 = k[0]``, ...). Because they only use NumPy arithmetic, they evaluate
+unchanged when every entry is an array holding one value per case. The batch
+engine exploits this: all cases are stacked into one block-diagonal ODE system
+whose right-hand side is a single vectorized model call.
+"""
+
+import numpy as np
+import scipy.sparse as sparse
+from scipy.integrate import solve_ivp
+
+from chemical_kinetics.stiffness import logger, select_method
+
+
+def _stack(values, shape):
+    # Model functions may return plain scalars (e.g. dCBdt = 0) next to arrays,
+    # so every entry is broadcast to the common per-case shape before stacking.
+    return np.stack([np.broadcast_to(np.asarray(v, dtype=float), shape) for v in values])
+
+
+def _batch_jacobian(fun, jac, t, C, k_params):
+    # Per-case Jacobians, shape (N_cases, n_species, n_species). Without an
+    # analytic Jacobian every species is perturbed in all cases at once.
+    n_species, n_cases = C.shape
+    if jac is not None:
+        return _stack([_stack(row, (n_cases,)) for row in jac(t, C, k_params)],
+                      (n_species, n_cases)).transpose(2, 0, 1)
+    h = 1e-7*np.maximum(1.0, np.abs(C))
+    columns = []
+    for i in range(n_species):
+        up, down = C.copy(), C.copy()
+        up[i] += h[i]
+        down[i] -= h[i]
+        columns.append((_stack(fun(t, up, k_params), (n_cases,))
+                        - _stack(fun(t, down, k_params), (n_cases,)))/(2*h[i]))
+    return np.stack(columns, axis=1).transpose(2, 0, 1)
+
+
+def _batch_rhs(fun, k_params, n_cases, n_species):
+    # Right-hand side of the stacked system, case-major, for solve_ivp.
+    def rhs(t, y):
+        if y.ndim == 1:
+            C = y.reshape(n_cases, n_species).T
+            return _stack(fun(t, C, k_params), (n_cases,)).T.ravel()
+        # Vectorized call: y has shape (n, m) with one state per column.
+        m = y.shape[1]
+        C = y.reshape(n_cases, n_species, m).transpose(1, 0, 2)
+        dC = _stack(fun(t, C, k_params[:, :, None]), (n_cases, m))
+        return dC.transpose(1, 0, 2).reshape(n_cases*n_species, m)
+    return rhs
+
+
+def _batch_jac_options(jac, k_params, n_cases, n_species, method):
+    # solve_ivp options of the implicit solvers for the stacked system: the
+    # sparse block-diagonal analytic Jacobian (dense for LSODA, which cannot
+    # take a sparse one) or, without one, its sparsity.
+    offsets = n_species*np.arange(n_cases)
+    i, j = np.meshgrid(np.arange(n_species), np.arange(n_species), indexing="ij")
+    rows = (offsets[:, None, None] + i).ravel()
+    cols = (offsets[:, None, None] + j).ravel()
+    size = n_cases*n_species
+
+    if jac is not None and method in ("Radau", "BDF", "LSODA"):
+        def rhs_jac(t, y):
+            C = y.reshape(n_cases, n_species).T
+            J = _stack([_stack(row, (n_cases,)) for row in jac(t, C, k_params)], (n_species, n_cases))
+            M = sparse.csc_matrix((J.transpose(2, 0, 1).ravel(), (rows, cols)), shape=(size, size))
+            return M.toarray() if method == "LSODA" else M
+        return {"jac": rhs_jac}
+    if jac is None and method in ("Radau", "BDF"):
+        return {"jac_sparsity": sparse.csc_matrix((np.ones(rows.size), (rows, cols)), shape=(size, size))}
+    return {}
+
+
+def _select_batch_method(fun, jac, t_span, c0, k_params, options):
+    # "auto": the method for the stiffest case at t0.
+    J = _batch_jacobian(fun, jac, t_span[0], c0.T, k_params)
+    rates = np.abs(np.linalg.eigvals(J).real)
+    fastest = rates.max()
+    relaxing = rates[rates > 1e-7*fastest]
+    measures = {"fastest": fastest, "index": fastest*abs(t_span[-1] - t_span[0]),
+                "ratio": fastest/relaxing.min() if relaxing.size else 1.0}
+    method, reason = select_method(measures, c0.size, rtol=options.get("rtol", 1e-3))
+    logger.info("solve_batch with %d cases: %s (%s)", c0.shape[0], method, reason)
+    return method
+
+
+def solve_batch(fun, t_span, c_ini, k_cases, t_eval=None, method="Radau", jac=None,
+                vectorized=True, closed_form=True, **options):
+    """Integrate ``fun`` for every row of ``k_cases`` in one solve_ivp call.
+
+    Parameters
+    ----------
+    fun : callable
+        Species balances ``fun(t, c_ini, k)`` returning one derivative per species.
+    t_span : sequence of float
+        Integration interval ``[t0, tf]``.
+    c_ini : array_like, shape (n_species,) or (N_cases, n_species)
+        Initial concentrations, either shared by all cases or given per case.
+    k_cases : array_like, shape (N_cases, n_params)
+        Rate constants, one row per case.
+    t_eval : array_like, optional
+        Times at which the solution is stored.
+    method : str, optional
+        Integration method passed to solve_ivp, or ``"auto"`` to select it
+        from the stiffness of the stiffest case at ``t0`` (see
+        :mod:`chemical_kinetics.stiffness`).
+    jac : callable, optional
+        Analytic Jacobian ``jac(t, c_ini, k)`` of ``fun``, returned as an
+        n_species x n_species nested list. It is assembled into a sparse
+        block-diagonal matrix. Without it, the block sparsity pattern is still
+        passed to the implicit solvers so the finite-difference estimate costs
+        n_species RHS evaluations regardless of N_cases.
+    vectorized : bool, optional
+        Evaluate the finite-difference Jacobian columns in a single RHS call.
+    closed_form : bool, optional
+        Evaluate linear, constant-coefficient networks as expm(K t) C0 at
+        ``t_eval`` (or at the ends of ``t_span``) instead of integrating them.
+    **options
+        Further keyword arguments for solve_ivp (rtol, atol, ...).
+
+    Returns
+    -------
+    ndarray, shape (N_cases, n_species, n_times)
+        Concentration trajectories of every case.
+
+    Notes
+    -----
+    All cases share one step-size sequence, which is dictated by the stiffest
+    case. The error norm of the implicit solvers is an RMS over all components,
+    so tighten ``rtol``/``atol`` when a single outlier case must meet the
+    tolerance on its own.
+    """
+    k_cases = np.atleast_2d(np.asarray(k_cases, dtype=float))
+    n_cases = k_cases.shape[0]
+    c_ini = np.asarray(c_ini, dtype=float)
+    n_species = c_ini.shape[-1]
+    c0 = np.broadcast_to(c_ini, (n_cases, n_species))
+    k_params = k_cases.T
+
+    if closed_form:
+        # Imported here because chemical_kinetics.linear builds on this module.
+        from chemical_kinetics.linear import _output_times, propagate, rate_matrix
+
+        K = rate_matrix(fun, t_span, k_cases, n_species, jac=jac,
+                        scale=max(1.0, np.abs(c_ini).max(initial=0.0)))
+        if K is not None:
+            return propagate(K, c0, _output_times(t_span, t_eval), t0=t_span[0])
+
+    if method == "auto":
+        method = _select_batch_method(fun, jac, t_span, c0, k_params, options)
+    rhs = _batch_rhs(fun, k_params, n_cases, n_species)
+    options.update(_batch_jac_options(jac, k_params, n_cases, n_species, method))
+
+    sol = solve_ivp(rhs, t_span, c0.ravel(), method=method, t_eval=t_eval,
+                    vectorized=vectorized, **options)
+    if not sol.success:
+        raise RuntimeError(sol.message)
+    return sol.y.reshape(n_cases, n_species, -1)
@@ -0,0 +1,221 @@
+"""Memoization of dense-output trajectories keyed on model and parameters.
+
+Dashboards re-request the same (model, k, c_ini, t_span) combinations at
+different time grids. :class:`TrajectoryCache` integrates each combination
+once with ``dense_output=True`` and serves later queries at any ``t_eval``
+inside the integrated span from the stored interpolant, without integrating
+again. A query reaching past the cached end time re-integrates and replaces
+the entry; forward and backward spans from the same start are separate
+entries.
+
+Entries are keyed on a SHA-1 hash of the model identity (module, qualified
+name, byte code, closure contents and default arguments, and the same for
+the Jacobian), the rate constants, the initial state and time, the
+direction of integration, the method and the solver options. The in-memory
+tier is an LRU bounded by ``maxsize`` entries. With a ``directory`` an on-disk
+tier keeps every entry as ``<key>.npz``; since the native scipy interpolants
+cannot be stored in ``.npz`` files, the disk tier stores the dense output at
+the solver steps plus three interior points per step, with the model
+derivatives there, and serves them through a piecewise cubic Hermite
+interpolant.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+from scipy.integrate import solve_ivp
+from scipy.interpolate import CubicHermiteSpline
+from scipy.optimize import OptimizeResult
+
+
+def _describe(value, seen):
+    # Text identifying a closure cell or default value, and whether it is
+    # stable across processes: reprs with a memory address are not.
+    if hasattr(value, "__code__") or hasattr(value, "__func__"):
+        return _model_id(value, seen)
+    if isinstance(value, np.ndarray):
+        return "%s%s:%s" % (value.dtype, value.shape, hashlib.sha1(np.ascontiguousarray(value)).hexdigest()), True
+    text = repr(value)
+    return text, " at 0x" not in text
+
+
+def _model_id(fun, seen=()):
+    # Identity of a model function and whether it is stable across
+    # processes: module, qualified name, byte code and constants, closure
+    # cell contents and default arguments. Bound methods (e.g.
+    # ReactionNetwork.rhs) depend on their instance, which is only
+    # identified within the running process.
+    function = getattr(fun, "__func__", fun)
+    if id(function) in seen:
+        return "recursive", True
+    seen = seen + (id(function),)
+    code = getattr(function, "__code__", None)
+    parts = [getattr(fun, "__module__", "") or "", getattr(fun, "__qualname__", None) or repr(fun)]
+    portable = " at 0x" not in parts[1]
+    if code is not None:
+        parts += [code.co_code.hex(), repr(code.co_consts)]
+    values = []
+    for cell in getattr(function, "__closure__", None) or ():
+        try:
+            values.append(cell.cell_contents)
+        except ValueError:
+            values.append(None)
+    values += getattr(function, "__defaults__", None) or ()
+    for name, value in sorted((getattr(function, "__kwdefaults__", None) or {}).items()):
+        values += [name, value]
+    for value in values:
+        text, stable = _describe(value, seen)
+        parts.append(text)
+        portable = portable and stable
+    if hasattr(fun, "__self__"):
+        parts.append("instance-%d" % id(fun.__self__))
+        portable = False
+    return "|".join(parts), portable
+
+
+class _HermiteSolution:
+    """Dense output restored from the disk tier."""
+
+    def __init__(self, t, y, dy):
+        self.t_min, self.t_max = t[0], t[-1]
+        self._spline = CubicHermiteSpline(t, y, dy, axis=1)
+
+    def __call__(self, t):
+        return self._spline(t)
+
+
+class TrajectoryCache:
+    """LRU cache of dense-output solutions with an optional ``.npz`` disk tier.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of trajectories kept in memory.
+    directory : str, optional
+        Directory of the on-disk tier; created if missing. Entries of bound
+        methods are only stored on disk when a ``model_id`` is given.
+    """
+
+    def __init__(self, maxsize=128, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Drop the in-memory tier (the disk tier is kept)."""
+        self._entries.clear()
+
+    def key(self, fun, t0, c_ini, args=(), method="Radau", model_id=None, direction=1, jac=None, **options):
+        """Hash identifying a trajectory; of the end time only its ``direction`` from t0 is part of the key.
+
+        An explicit ``model_id`` stands for both ``fun`` and ``jac``.
+        """
+        digest = hashlib.sha1()
+        if model_id is not None:
+            digest.update(model_id.encode())
+        else:
+            digest.update(_model_id(fun)[0].encode())
+            digest.update(b"jac:" + (_model_id(jac)[0].encode() if callable(jac) else repr(jac).encode()))
+        digest.update(np.float64(t0).tobytes())
+        digest.update(b"backward" if direction < 0 else b"forward")
+        digest.update(np.ascontiguousarray(c_ini, dtype=float).tobytes())
+        for arg in args:
+            digest.update(np.ascontiguousarray(arg, dtype=float).tobytes())
+        digest.update(method.encode())
+        digest.update(repr(sorted((name, repr(value)) for name, value in options.items())).encode())
+        return digest.hexdigest()
+
+    def solve(self, fun, t_span, c_ini, t_eval=None, method="Radau", jac=None, args=(), model_id=None,
+              **options):
+        """Cached equivalent of ``solve_ivp(fun, t_span, c_ini, t_eval=t_eval, ...)``.
+
+        ``model_id`` overrides the identity of ``fun`` and ``jac``, e.g. to
+        give a ReactionNetwork instance a name that is stable across
+        processes. Without it, closure contents and default arguments are part
+        of the identity, and models whose identity is only valid in this
+        process (bound methods, closures over arbitrary objects) are kept in
+        the memory tier only.
+
+        Returns
+        -------
+        OptimizeResult
+            With ``t``, ``y`` (at ``t_eval``, or at the ends of ``t_span`` if
+            None), the interpolant ``sol`` and ``cached`` telling whether the
+            trajectory was served without integrating.
+        """
+        t0, tf = float(t_span[0]), float(t_span[-1])
+        t = np.asarray(t_eval if t_eval is not None else [t0, tf], dtype=float)
+        if np.any(t < min(t0, tf)) or np.any(t > max(t0, tf)):
+            raise ValueError("Values in `t_eval` are not within `t_span`.")
+        direction = -1 if tf < t0 else 1
+        key = self.key(fun, t0, c_ini, args, method, model_id, direction, jac, **options)
+        portable = model_id is not None or (_model_id(fun)[1] and (not callable(jac) or _model_id(jac)[1]))
+        persistent = self.directory is not None and portable
+
+        entry = self._lookup(key, tf, direction, persistent)
+        cached = entry is not None
+        if cached:
+            self.hits += 1
+        else:
+            self.misses += 1
+            sol = solve_ivp(fun, [t0, tf], c_ini, method=method, jac=jac, args=args, dense_output=True,
+                            **options)
+            if not sol.success:
+                raise RuntimeError(sol.message)
+            entry = (tf, sol.sol)
+            self._store(key, entry)
+            if persistent:
+                self._save(key, sol, fun, args)
+
+        return OptimizeResult(t=t, y=entry[1](t), sol=entry[1], cached=cached, success=True,
+                              status=0, message="Served from the trajectory cache." if cached
+                              else "Integrated and stored in the trajectory cache.")
+
+    def _lookup(self, key, tf, direction, persistent):
+        entry = self._entries.get(key)
+        if entry is None and persistent:
+            entry = self._load(key, direction)
+            if entry is not None:
+                self._store(key, entry)
+        if entry is None or direction*(entry[0] - tf) < 0:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def _save(self, key, sol, fun, args):
+        steps = sol.t
+        fractions = np.array([0.25, 0.5, 0.75])
+        interior = (steps[:-1, None] + np.diff(steps)[:, None]*fractions).ravel()
+        t = np.sort(np.concatenate([steps, interior]))
+        y = sol.sol(t)
+        dy = np.column_stack([np.asarray(fun(ti, y[:, i], *args), dtype=float) for i, ti in enumerate(t)])
+        # Write to a temporary file first so readers never see a partial entry.
+        tmp = self._path(key) + ".tmp.npz"
+        np.savez_compressed(tmp, t=t, y=y, dy=dy)
+        os.replace(tmp, self._path(key))
+
+    def _load(self, key, direction):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            t, y, dy = data["t"], data["y"], data["dy"]
+        return (t[-1] if direction > 0 else t[0], _HermiteSolution(t, y, dy))
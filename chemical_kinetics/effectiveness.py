@@ -0,0 +1,89 @@
+"""Internal mass transfer in catalyst pellets with first-order reaction.
+
+The Thiele modulus Φ compares the reaction rate with the diffusion rate
+through the pellet. All functions accept scalars or NumPy arrays of Φ.
+
+The effectiveness factors are evaluated without overflow or cancellation from
+Φ = 0 (η = 1) up to Φ = 1e6 and beyond: each kernel splits Φ into a small-Φ
+range evaluated from the Taylor series, the closed form in between, and a
+large-Φ range evaluated from the asymptotic expansion, and only computes each
+formula where it is used, so no warnings are raised. The Bessel functions of
+the cylinder are exponentially scaled (``ive``), whose ratio equals the ratio
+of the unscaled ones that overflow beyond Φ ≈ 350.
+"""
+
+import numpy as np
+import scipy.special as sp
+
+# Below SMALL the Taylor series is used; above LARGE the asymptotic expansion.
+_SMALL = {"slab": 1e-4, "cylinder": 1e-4, "sphere": 0.1}
+_LARGE = {"slab": 20.0, "cylinder": 1e3, "sphere": 20.0}
+
+# Taylor coefficients of η in powers of Φ².
+_SERIES_SLAB = (1.0, -1/3, 2/15)
+_SERIES_CYLINDER = (1.0, -1/2, 1/3)
+# coth(y) - 1/y = sum 2^(2n) B_2n y^(2n-1)/(2n)!, divided by y/3 with y = 3Φ;
+# the coefficients in powers of y² are scaled by 9^n to powers of Φ².
+_SERIES_SPHERE = tuple(c*9**n for n, c in enumerate(
+    (1.0, -1/15, 2/315, -1/1575, 2/31185, -1382/212837625, 4/6081075)))
+
+
+def _evaluate(thiele, small, large, series, closed, asymptotic):
+    # Evaluate η piecewise on |Φ|; η is even in Φ.
+    thiele = np.asarray(thiele, dtype=float)
+    phi = np.abs(thiele)
+    eta = np.empty_like(phi)
+    low = phi < small
+    high = phi >= large
+    mid = ~(low | high)
+    eta[low] = np.polynomial.polynomial.polyval(phi[low]**2, series)
+    eta[mid] = closed(phi[mid])
+    eta[high] = asymptotic(phi[high])
+    return eta if eta.ndim else eta[()]
+
+
+def slab_profile(thiele, x):
+    """Dimensionless concentration C* = cosh(Φ x*)/cosh(Φ) through a slab.
+
+    Evaluated as exp(Φ(x*-1)) (1 + exp(-2Φx*))/(1 + exp(-2Φ)), which does not
+    overflow for large Φ. Returns an array of shape (len(x), len(thiele)) for
+    array arguments.
+    """
+    thiele = np.abs(np.asarray(thiele, dtype=float))
+    x = np.abs(np.asarray(x, dtype=float))
+    phi_x = np.multiply.outer(x, thiele)
+    return np.exp(phi_x - thiele)*(1 + np.exp(-2*phi_x))/(1 + np.exp(-2*thiele))
+
+
+def effectiveness_slab(thiele):
+    """Effectiveness factor η = tanh(Φ)/Φ of a slab (η → 1/Φ for large Φ)."""
+    return _evaluate(thiele, _SMALL["slab"], _LARGE["slab"], _SERIES_SLAB,
+                     lambda phi: np.tanh(phi)/phi,
+                     lambda phi: 1/phi)
+
+
+def _bessel_ratio_asymptotic(x):
+    # I1(x)/I0(x) from the asymptotic expansions of I0 and I1 in 1/(8x).
+    u = 1/(8*x)
+    I0, I1 = np.ones_like(x), np.ones_like(x)
+    term0, term1 = np.ones_like(x), np.ones_like(x)
+    for j in range(1, 6):
+        term0 = -term0*(0 - (2*j - 1)**2)*u/j
+        term1 = -term1*(4 - (2*j - 1)**2)*u/j
+        I0 += term0
+        I1 += term1
+    return I1/I0
+
+
+def effectiveness_cylinder(thiele):
+    """Effectiveness factor η = I1(2Φ)/(Φ I0(2Φ)) of a cylinder."""
+    return _evaluate(thiele, _SMALL["cylinder"], _LARGE["cylinder"], _SERIES_CYLINDER,
+                     lambda phi: sp.ive(1, 2*phi)/(phi*sp.ive(0, 2*phi)),
+                     lambda phi: _bessel_ratio_asymptotic(2*phi)/phi)
+
+
+def effectiveness_sphere(thiele):
+    """Effectiveness factor η = (1/Φ)(1/tanh(3Φ) - 1/(3Φ)) of a sphere."""
+    return _evaluate(thiele, _SMALL["sphere"], _LARGE["sphere"], _SERIES_SPHERE,
+                     lambda phi: (1/phi)*(1/np.tanh(3*phi) - 1/(3*phi)),
+                     lambda phi: (1/phi)*(1 - 1/(3*phi)))
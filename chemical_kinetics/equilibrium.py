@@ -0,0 +1,195 @@
+"""Steady states and equilibria computed directly, without time integration.
+
+The final composition of a batch run is the steady state f(C, k) = 0 of the
+species balances that has the same conserved totals as the initial state. The
+balances alone are singular there: every conservation law w (w @ S = 0 for the
+stoichiometric matrix S, e.g. the total CA + CB + CC of the series reactions)
+makes w @ f vanish identically. With an orthonormal basis W of these laws the
+steady state is instead the root of
+
+    F(C) = f(C, k) + s W.T @ W (C - C0),
+
+whose Jacobian J + s W.T @ W is regular: W @ F = s W @ (C - C0) fixes the
+totals and the remaining components are f = 0. The factor s is the size of
+the Jacobian of each case, which keeps both terms of the same magnitude.
+
+Newton's method is applied to all cases at once, with the models evaluated
+vectorized over cases as in :mod:`chemical_kinetics.batch` and a batched
+dense solve per iteration. Linear networks such as A <-> B <-> C converge in
+one step.
+"""
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from chemical_kinetics.batch import _batch_jacobian, _stack
+
+
+def _left_null_space(blocks, rtol=1e-10, chunk=65536):
+    # Orthonormal rows w with w @ M = 0 for the columns M of all blocks, each
+    # of shape (n, m_i). The columns are reduced chunk by chunk to the
+    # triangular factor R of M.T = Q R, whose null space is the same.
+    n = blocks[0].shape[0]
+    R = np.zeros((0, n))
+    for M in blocks:
+        for start in range(0, M.shape[1], chunk):
+            R = np.linalg.qr(np.vstack([R, M[:, start:start + chunk].T]), mode="r")
+    _, s, Vt = np.linalg.svd(np.vstack([R, np.zeros((n, n))]))
+    rank = int(np.sum(s > rtol*s[0])) if s[0] > 0 else 0
+    return Vt[rank:]
+
+
+def conservation_laws(stoichiometry, rtol=1e-10):
+    """Orthonormal basis of the conservation laws of a stoichiometric matrix.
+
+    Parameters
+    ----------
+    stoichiometry : array_like, shape (n_species, n_steps)
+        E.g. :attr:`chemical_kinetics.network.ReactionNetwork.stoichiometry`.
+    rtol : float, optional
+        Singular values below ``rtol`` times the largest count as zero.
+
+    Returns
+    -------
+    ndarray, shape (n_laws, n_species)
+        Rows w with w @ S = 0: element and mass balances, and every other
+        linear combination of concentrations the reactions leave unchanged.
+    """
+    return _left_null_space([np.asarray(stoichiometry, dtype=float)], rtol)
+
+
+def _detect_laws(fun, jac, t, c0, k_params, seed=0):
+    # Laws shared by all cases: the left null space of their Jacobians at
+    # the initial and a random state, or, without an analytic Jacobian, of
+    # the rates at the initial and n_species + 1 random states, whose exact
+    # evaluations span the same directions without the ~1e-9 error of
+    # finite-difference Jacobians. Every column is scaled to unit size.
+    n_species, n_cases = c0.shape
+    rng = np.random.default_rng(seed)
+    size = np.abs(c0).max(axis=0, keepdims=True)
+    n_random = 1 if jac is not None else n_species + 1
+    states = [c0] + [size*rng.random(c0.shape) + rng.random(c0.shape) for _ in range(n_random)]
+    blocks = []
+    for C in states:
+        if jac is not None:
+            M = _batch_jacobian(fun, jac, t, C, k_params)
+            norm = np.abs(M).max(axis=(1, 2), keepdims=True)
+            M = (M/np.where(norm > 0, norm, 1.0)).transpose(1, 0, 2).reshape(n_species, -1)
+        else:
+            M = _stack(fun(t, C, k_params), (n_cases,))
+            norm = np.abs(M).max(axis=0)
+            M = M/np.where(norm > 0, norm, 1.0)
+        blocks.append(M)
+    return _left_null_space(blocks)
+
+
+def solve_steady_state(fun, c_ini, k_cases, jac=None, conservation=None, t=0.0, tol=1e-10, max_iter=50):
+    """Steady state of every case of ``k_cases`` with the totals of ``c_ini``.
+
+    Parameters
+    ----------
+    fun : callable
+        Species balances ``fun(t, c_ini, k)``, vectorized over cases like the
+        models in :mod:`chemical_kinetics.models`.
+    c_ini : array_like, shape (n_species,) or (N_cases, n_species)
+        Initial concentrations, shared or per case; they fix the conserved
+        totals and are the Newton starting point.
+    k_cases : array_like, shape (N_cases, n_params)
+        Rate constants, one row per case.
+    jac : callable, optional
+        Analytic Jacobian ``jac(t, c_ini, k)`` of ``fun``; central differences
+        are used without it.
+    conservation : array_like, shape (n_laws, n_species), optional
+        Conservation laws, e.g. ``conservation_laws(net.stoichiometry)``. By
+        default they are found as the left null space of the Jacobians of all
+        cases at the initial and at a random state, or of the rates at the
+        initial and at random states when ``jac`` is not given.
+    t : float, optional
+        Time passed to the model.
+    tol : float, optional
+        Convergence tolerance on the Newton step, relative to the largest
+        initial concentration of the case.
+    max_iter : int, optional
+        Maximum number of Newton iterations.
+
+    Returns
+    -------
+    OptimizeResult
+        With ``c`` (N_cases, n_species) the steady states, ``residual`` the
+        largest |dC/dt| of every case there, ``conservation`` the laws used,
+        ``nit`` and ``nfev``.
+
+    Raises
+    ------
+    RuntimeError
+        If the iteration does not converge for some case, e.g. when the
+        network has no steady state with the given totals.
+    """
+    k_cases = np.atleast_2d(np.asarray(k_cases, dtype=float))
+    n_cases = k_cases.shape[0]
+    k_params = k_cases.T
+    c_ini = np.asarray(c_ini, dtype=float)
+    n_species = c_ini.shape[-1]
+    c0 = np.array(np.broadcast_to(c_ini, (n_cases, n_species)).T)
+
+    if conservation is None:
+        W = _detect_laws(fun, jac, t, c0, k_params)
+    else:
+        W = np.linalg.qr(np.atleast_2d(np.asarray(conservation, dtype=float)).T)[0].T
+    P = W.T @ W
+
+    nfev = [0]
+
+    def residual(C, cases):
+        nfev[0] += 1
+        f = _stack(fun(t, C, k_params[:, cases]), (len(cases),))
+        return f, f + scale[cases]*(P @ (C - c0[:, cases]))
+
+    C = c0.copy()
+    J = _batch_jacobian(fun, jac, t, C, k_params)
+    scale = np.abs(J).max(axis=(1, 2))
+    scale[scale == 0] = 1.0
+    reference = np.maximum(np.abs(c0).max(axis=0), np.finfo(float).tiny)
+    active = np.arange(n_cases)
+    f, F = residual(C, active)
+    nit = 0
+    for nit in range(1, max_iter + 1):
+        if nit > 1:
+            J = _batch_jacobian(fun, jac, t, C[:, active], k_params[:, active])
+        A = J + scale[active, None, None]*P
+        try:
+            step = np.linalg.solve(A, -F.T[:, :, None])[:, :, 0].T
+        except np.linalg.LinAlgError:
+            # Cases with further conservation laws of their own (e.g. a zero
+            # rate constant) are singular; take the least-squares step.
+            step = np.einsum("cij,jc->ic", np.linalg.pinv(A), -F)
+        # Halve the step of every case whose residual does not decrease,
+        # except the converging ones, whose residual is at rounding level.
+        norm = np.linalg.norm(F, axis=0)
+        damping = np.ones(active.size)
+        small = np.abs(step).max(axis=0) <= tol*reference[active]
+        C_new = C[:, active] + step
+        f_new, F_new = residual(C_new, active)
+        for _ in range(10):
+            worse = ~(np.linalg.norm(F_new, axis=0) < norm) & ~small
+            if not worse.any():
+                break
+            damping[worse] *= 0.5
+            C_new[:, worse] = C[:, active[worse]] + damping[worse]*step[:, worse]
+            f_new[:, worse], F_new[:, worse] = residual(C_new[:, worse], active[worse])
+        C[:, active] = C_new
+        f[:, active] = f_new
+        done = np.abs(damping*step).max(axis=0) <= tol*reference[active]
+        active, F = active[~done], F_new[:, ~done]
+        if not active.size:
+            break
+    if active.size:
+        raise RuntimeError("Newton iteration did not converge for %d of %d cases in %d iterations."
+                           % (active.size, n_cases, max_iter))
+    drift = np.abs(W @ (C - c0)).max(axis=0, initial=0.0)
+    if np.any(drift > np.sqrt(tol)*reference):
+        raise RuntimeError("The steady state of %d of %d cases violates the conservation laws."
+                           % (np.sum(drift > np.sqrt(tol)*reference), n_cases))
+
+    return OptimizeResult(c=C.T, residual=np.abs(f).max(axis=0), conservation=W, nit=nit, nfev=nfev[0],
+                          success=True, status=0, message="Newton iteration converged.")
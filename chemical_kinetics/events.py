@@ -0,0 +1,319 @@
+"""Event criteria and early-terminating integration.
+
+Operational questions such as "time to 99 % conversion" or "time to reach
+equilibrium" are answered by integrating until a criterion is met instead of
+over a fixed time grid. A :class:`Criterion` is a function
+``value(t, c, k, c0)`` whose zero crossing marks the target, written like the
+models in :mod:`chemical_kinetics.models` so it evaluates for a whole batch of
+cases at once:
+
+- :func:`conversion`: the conversion 1 - c/c0 of a species reaches a target;
+- :func:`crossing`: a species concentration crosses a level;
+- :func:`steady_state`: the largest |dc/dt| falls below a tolerance.
+
+:func:`solve_until` integrates a batch of rate-constant cases as one stacked
+system (see :mod:`chemical_kinetics.batch`), checks every criterion of every
+case after each step and locates the crossings on the dense output. A case
+stops at its first terminal event, and the solve stops as soon as every case
+has stopped. Stopped cases no longer limit the step size: when at most half of
+the stacked cases are still running, the system is rebuilt with those only.
+For a single run with solve_ivp, :meth:`Criterion.event` gives the equivalent
+event function.
+"""
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from chemical_kinetics.batch import _batch_jac_options, _batch_rhs, _select_batch_method, _stack
+from chemical_kinetics.stiffness import IMPLICIT, IMPLICIT_ONLY_OPTIONS, METHODS
+
+
+class Criterion:
+    """Target whose crossing ends a run (``terminal``) or is only recorded.
+
+    Parameters
+    ----------
+    name : str
+    value : callable
+        ``value(t, c, k, c0)`` with the concentrations ``c`` and initial
+        concentrations ``c0`` indexed by species, broadcasting over cases like
+        the models; its zero crossing marks the target.
+    direction : {-1, 0, 1}, optional
+        Only crossings from positive to negative (-1), negative to positive
+        (1) or both (0) count. A directional target already met at the start
+        is reported at t0.
+    terminal : bool, optional
+        Stop the run at the crossing.
+    """
+
+    def __init__(self, name, value, direction=0, terminal=True):
+        self.name = name
+        self.value = value
+        self.direction = direction
+        self.terminal = terminal
+
+    def __repr__(self):
+        return "Criterion(%r, direction=%d, terminal=%s)" % (self.name, self.direction, self.terminal)
+
+    def met(self, g):
+        """Whether the values ``g`` at the start of a run already meet the target."""
+        g = np.asarray(g)
+        if self.direction < 0:
+            return g <= 0
+        if self.direction > 0:
+            return g >= 0
+        return g == 0
+
+    def event(self, c_ini, k=None):
+        """Event function ``event(t, y, *args)`` of one run for solve_ivp.
+
+        ``c_ini`` are the initial concentrations of the run and ``k`` the
+        rate constants used when solve_ivp passes no ``args``.
+        """
+        c0 = np.asarray(c_ini, dtype=float)
+
+        def event(t, y, *args):
+            return float(self.value(t, y, args[0] if args else k, c0))
+
+        event.terminal = self.terminal
+        event.direction = self.direction
+        return event
+
+
+def conversion(target, species=0, terminal=True):
+    """Conversion 1 - c/c0 of ``species`` reaching ``target``, e.g. 0.99."""
+    return Criterion("conversion(%d) = %g" % (species, target),
+                     lambda t, c, k, c0: c[species] - (1 - target)*c0[species], -1, terminal)
+
+
+def crossing(species, level, direction=0, terminal=True):
+    """Concentration of ``species`` crossing ``level`` (see :class:`Criterion` for ``direction``)."""
+    return Criterion("c(%d) = %g" % (species, level), lambda t, c, k, c0: c[species] - level, direction, terminal)
+
+
+def steady_state(fun, tol=1e-6, terminal=True):
+    """Largest |dc_i/dt| of the model ``fun`` falling below ``tol`` [mol/L/s].
+
+    Marks the approach of equilibrium (or of any steady state) within
+    ``tol``; every check costs one model call. Keep the solver's ``atol``
+    well below ``tol``, or the detected time follows the integration error.
+    """
+    def value(t, c, k, c0):
+        return np.max(np.abs(_stack(fun(t, c, k), np.shape(c[0]))), axis=0) - tol
+
+    return Criterion("|dc/dt| < %g" % tol, value, -1, terminal)
+
+
+def _states(sol, n_species, cases, t):
+    # Concentrations (n_species, m) of system case cases[i] at time t[i] from
+    # the dense output of the last step.
+    Y = sol(t).reshape(-1, n_species, t.size)
+    return Y[cases, :, np.arange(t.size)].T
+
+
+def _locate(g, a, b, ga, gb, max_iter=60):
+    # Illinois (modified regula falsi) for the crossings of all cases at once.
+    # g(t) evaluates case i at t[i]; g changes sign over every [a, b]. Returns
+    # the end of the final bracket on the side of b, where the target is met.
+    # The bracket is closed to 1e-9 of the step: the dense output is not more
+    # accurate than that, and g of stiff models is noisy at rounding level,
+    # which stalls regula falsi below it.
+    side = np.zeros(a.shape)
+    tiny = 4*np.finfo(float).eps*np.maximum(np.abs(b), 1.0) + 1e-9*(b - a)
+    for _ in range(max_iter):
+        done = (b - a <= tiny) | (gb == 0)
+        if done.all():
+            break
+        t = np.where(ga != gb, (ga*b - gb*a)/np.where(ga != gb, ga - gb, 1.0), (a + b)/2)
+        t = np.where(done, b, np.clip(t, a, b))
+        gt = np.where(done, gb, g(t))
+        towards_a = ~done & ((np.sign(gt) == np.sign(gb)) | (gt == 0))
+        towards_b = ~done & ~towards_a
+        # Root in [a, t]: t becomes b, and a's value is halved if a was kept
+        # on the previous iteration too; symmetrically for [t, b].
+        ga = np.where(towards_a & (side < 0), ga/2, ga)
+        gb = np.where(towards_b & (side > 0), gb/2, gb)
+        b, gb = np.where(towards_a, t, b), np.where(towards_a, gt, gb)
+        a, ga = np.where(towards_b, t, a), np.where(towards_b, gt, ga)
+        side = np.where(towards_a, -1, np.where(towards_b, 1, side))
+    return b
+
+
+def solve_until(fun, t_span, c_ini, k_cases, criteria, t_eval=None, method="Radau", jac=None, vectorized=True,
+                compact=True, **options):
+    """Integrate every case of ``k_cases`` until its first terminal criterion is met.
+
+    Parameters
+    ----------
+    fun : callable
+        Species balances ``fun(t, c_ini, k)``, vectorized over cases like the
+        models in :mod:`chemical_kinetics.models`.
+    t_span : sequence of float
+        Integration interval ``[t0, tf]`` with ``tf >= t0``; cases that meet
+        no terminal criterion run to ``tf``.
+    c_ini : array_like, shape (n_species,) or (N_cases, n_species)
+        Initial concentrations, shared or per case.
+    k_cases : array_like, shape (N_cases, n_params)
+        Rate constants, one row per case.
+    criteria : sequence of Criterion
+        Targets to detect, e.g. ``[conversion(0.99), steady_state(fun)]``.
+    t_eval : array_like, optional
+        Times at which the trajectories are stored; NaN after a case stopped.
+    method : str, optional
+        ``"RK45"``, ``"DOP853"``, ``"Radau"``, ``"BDF"`` or ``"auto"``.
+    jac : callable, optional
+        Analytic Jacobian ``jac(t, c_ini, k)`` of ``fun``.
+    vectorized : bool, optional
+        Evaluate the finite-difference Jacobian columns in one RHS call.
+    compact : bool, optional
+        Rebuild the stacked system without the stopped cases once at most
+        half of its cases are still running.
+    **options
+        Further keyword arguments for the solver class (rtol, atol, ...).
+
+    Returns
+    -------
+    OptimizeResult
+        With ``t_events`` (n_criteria, N_cases), the time each criterion was
+        first met (NaN if never), ``y_events`` (n_criteria, N_cases,
+        n_species) the concentrations then, ``t_stop`` and ``c_stop`` the
+        time and state at which every case stopped, ``stopped`` whether it
+        stopped on a terminal criterion, ``t`` and ``y`` (N_cases, n_species,
+        n_times) at ``t_eval`` (None without it), ``nfev``, ``njev``,
+        ``nlu``, ``n_steps``, ``status`` (1 if every case stopped on a terminal
+        criterion, 0 if the end of ``t_span`` was reached, -1 on failure),
+        ``message`` and ``success``.
+    """
+    k_cases = np.atleast_2d(np.asarray(k_cases, dtype=float))
+    n_cases = k_cases.shape[0]
+    c_ini = np.asarray(c_ini, dtype=float)
+    n_species = c_ini.shape[-1]
+    c0 = np.array(np.broadcast_to(c_ini, (n_cases, n_species)))
+    k_params = k_cases.T
+    t0, tf = float(t_span[0]), float(t_span[-1])
+    if tf < t0:
+        raise ValueError("solve_until integrates forward only; got t_span = [%g, %g]." % (t0, tf))
+    criteria = list(criteria)
+    if not criteria:
+        raise ValueError("solve_until needs at least one criterion.")
+    terminal = np.array([criterion.terminal for criterion in criteria], dtype=bool)
+    if method == "auto":
+        method = _select_batch_method(fun, jac, t_span, c0, k_params, options)
+    if method not in IMPLICIT:
+        options = {key: value for key, value in options.items() if key not in IMPLICIT_ONLY_OPTIONS}
+
+    def values(t, C, cases):
+        # Criteria values (n_criteria, m) of the given cases, C (n_species, m).
+        return np.stack([np.broadcast_to(criterion.value(t, C, k_params[:, cases], c0[cases].T), (len(cases),))
+                         for criterion in criteria])
+
+    def start(cases, t, y, first_step=None):
+        n = len(cases)
+        system_options = dict(options)
+        system_options.update(_batch_jac_options(jac, k_params[:, cases], n, n_species, method))
+        if first_step is not None and "first_step" not in options:
+            system_options["first_step"] = min(first_step, tf - t)
+        return METHODS[method](_batch_rhs(fun, k_params[:, cases], n, n_species), t, y.ravel(), tf,
+                               vectorized=vectorized, **system_options)
+
+    t_events = np.full((len(criteria), n_cases), np.nan)
+    y_events = np.full((len(criteria), n_cases, n_species), np.nan)
+    t_stop = np.full(n_cases, tf)
+    c_stop = np.full((n_cases, n_species), np.nan)
+    stats = {"nfev": 0, "njev": 0, "nlu": 0, "n_steps": 0}
+
+    g = values(t0, c0.T, np.arange(n_cases))
+    met = np.stack([criterion.met(row) for criterion, row in zip(criteria, g)])
+    t_events[met] = t0
+    y_events[met] = np.broadcast_to(c0, y_events.shape)[met]
+    stopped = (met & terminal[:, None]).any(axis=0)
+    t_stop[stopped] = t0
+    c_stop[stopped] = c0[stopped]
+
+    if t_eval is not None:
+        t_eval = np.asarray(t_eval, dtype=float)
+        y = np.full((n_cases, n_species, t_eval.size), np.nan)
+        y[:, :, t_eval == t0] = c0[:, :, None]
+        next_eval = np.searchsorted(t_eval, t0, side="right")
+
+    # Cases of the current stacked system, and which of them still run.
+    system = np.flatnonzero(~stopped)
+    running = np.ones(system.size, dtype=bool)
+    g = g[:, system]
+    solver = start(system, t0, c0[system]) if system.size else None
+    status, message = 0, "The solver successfully reached the end of the integration interval."
+    if solver is None:
+        status, message = 1, "Every case met a terminal criterion."
+
+    while solver is not None and solver.status == "running":
+        solver.step()
+        stats["n_steps"] += 1
+        if solver.status == "failed":
+            status, message = -1, "%s failed at t = %g." % (method, solver.t)
+            break
+        t_old, t_new = solver.t_old, solver.t
+        Y = solver.y.reshape(system.size, n_species)
+        g_new = values(t_new, Y.T, system)
+        sol = solver.dense_output()
+
+        for i, criterion in enumerate(criteria):
+            if criterion.direction < 0:
+                hit = g_new[i] <= 0
+            elif criterion.direction > 0:
+                hit = g_new[i] >= 0
+            else:
+                hit = np.sign(g_new[i]) != np.sign(g[i])
+            hit &= running & np.isnan(t_events[i, system])
+            if not hit.any():
+                continue
+            cases = np.flatnonzero(hit)
+            a = np.full(cases.size, t_old)
+            b = np.full(cases.size, t_new)
+            evaluate = lambda t: criterion.value(t, _states(sol, n_species, cases, t), k_params[:, system[cases]],
+                                                 c0[system[cases]].T)
+            t_hit = _locate(evaluate, a, b, g[i, cases], g_new[i, cases])
+            t_events[i, system[cases]] = t_hit
+            y_events[i, system[cases]] = _states(sol, n_species, cases, t_hit).T
+
+        now_stopped = running & (~np.isnan(t_events[terminal][:, system])).any(axis=0)
+        if now_stopped.any():
+            cases = np.flatnonzero(now_stopped)
+            t_stop[system[cases]] = np.nanmin(t_events[terminal][:, system[cases]], axis=0)
+            c_stop[system[cases]] = _states(sol, n_species, cases, t_stop[system[cases]]).T
+            # Crossings later in the step than the stop did not happen.
+            later = t_events[:, system[cases]] > t_stop[system[cases]]
+            t_events[:, system[cases]] = np.where(later, np.nan, t_events[:, system[cases]])
+            y_events[:, system[cases]] = np.where(later[:, :, None], np.nan, y_events[:, system[cases]])
+
+        if t_eval is not None:
+            stop = np.searchsorted(t_eval, t_new, side="right")
+            if stop > next_eval:
+                times = t_eval[next_eval:stop]
+                Y_eval = sol(times).reshape(system.size, n_species, times.size)
+                keep = running[:, None] & (times[None, :] <= t_stop[system][:, None])
+                y[system, :, next_eval:stop] = np.where(keep[:, None, :], Y_eval, y[system, :, next_eval:stop])
+                next_eval = stop
+
+        running &= ~now_stopped
+        g = g_new
+        if not running.any():
+            status, message = 1, "Every case met a terminal criterion."
+            break
+        if compact and running.sum() <= system.size//2:
+            for key in ("nfev", "njev", "nlu"):
+                stats[key] += getattr(solver, key)
+            h = getattr(solver, "h_abs", None)
+            system, Y, g = system[running], Y[running], g[:, running]
+            running = np.ones(system.size, dtype=bool)
+            solver = start(system, t_new, Y, first_step=h)
+
+    if solver is not None:
+        for key in ("nfev", "njev", "nlu"):
+            stats[key] += getattr(solver, key)
+        unfinished = system[running]
+        c_stop[unfinished] = solver.y.reshape(system.size, n_species)[running]
+        t_stop[unfinished] = solver.t
+    return OptimizeResult(t_events=t_events, y_events=y_events, t_stop=t_stop, c_stop=c_stop,
+                          stopped=(~np.isnan(t_events[terminal])).any(axis=0), t=t_eval,
+                          y=y if t_eval is not None else None, status=status, message=message, success=status >= 0,
+                          **stats)
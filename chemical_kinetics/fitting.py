@@ -0,0 +1,217 @@
+"""Estimation of rate constants from batch data with forward sensitivities.
+
+The sensitivities S = dC/dk of the trajectories with respect to the rate
+constants obey the variational equations
+
+    dS/dt = J S + df/dk,        S(0) = 0,
+
+with J = df/dC. They are integrated together with the species balances, so one
+augmented solve gives the model predictions and their exact gradient instead
+of the n_params extra solves of finite differences around solve_ivp. df/dk is
+estimated by central differences of the (cheap) model function in k.
+
+All experiments of a fit are stacked into one augmented system whose
+right-hand side is a single vectorized model call, as in
+:func:`chemical_kinetics.batch.solve_batch`. The implicit solvers receive a
+block-diagonal Newton matrix with J repeated for the state and every
+sensitivity (the staggered approximation that leaves out the second
+derivatives of f), which is exact for the linear series reactions and enough
+for the simplified Newton iterations otherwise.
+
+:func:`fit_rate_constants` fits log k with scipy's trust-region least squares,
+so the constants stay positive and are scaled alike however many decades
+apart they are.
+"""
+
+import numpy as np
+import scipy.sparse as sparse
+from scipy.integrate import solve_ivp
+from scipy.optimize import OptimizeResult, least_squares
+
+from chemical_kinetics.batch import _batch_jacobian, _stack
+
+
+class Experiment:
+    """Measured concentrations of one batch run.
+
+    Parameters
+    ----------
+    t : array_like, shape (n_times,)
+        Sampling times; the run starts at t = 0.
+    data : array_like, shape (n_measured, n_times)
+        Measured concentrations of the ``species`` rows.
+    c_ini : array_like, shape (n_species,)
+        Initial concentrations.
+    species : sequence of int, optional
+        Indices of the measured species; all species if None.
+    weights : float or array_like, optional
+        Residual weights broadcast to ``data``, e.g. one over the
+        measurement standard deviation.
+    """
+
+    def __init__(self, t, data, c_ini, species=None, weights=1.0):
+        self.t = np.asarray(t, dtype=float)
+        self.data = np.atleast_2d(np.asarray(data, dtype=float))
+        self.c_ini = np.asarray(c_ini, dtype=float)
+        self.species = list(range(self.c_ini.size)) if species is None else list(species)
+        self.weights = np.broadcast_to(np.asarray(weights, dtype=float), self.data.shape)
+
+    def __repr__(self):
+        return "Experiment(%d times, species %r)" % (self.t.size, self.species)
+
+
+def forward_sensitivities(fun, t_eval, c_ini, k, jac=None, method="Radau", **options):
+    """Trajectories and their sensitivities to the rate constants.
+
+    Parameters
+    ----------
+    fun : callable
+        Species balances ``fun(t, c_ini, k)``, vectorized over cases like the
+        models in :mod:`chemical_kinetics.models`.
+    t_eval : array_like, shape (n_times,)
+        Output times; the integration starts at 0.
+    c_ini : array_like, shape (n_species,) or (N_cases, n_species)
+        Initial concentrations, one row per experiment.
+    k : array_like, shape (n_params,)
+        Rate constants shared by all experiments.
+    jac : callable, optional
+        Analytic Jacobian ``jac(t, c_ini, k)`` of ``fun``.
+    method : str, optional
+        Integration method passed to solve_ivp.
+    **options
+        Further keyword arguments for solve_ivp (rtol, atol, ...).
+
+    Returns
+    -------
+    C : ndarray, shape (N_cases, n_species, n_times)
+    S : ndarray, shape (N_cases, n_species, n_params, n_times)
+        ``S[e, i, j]`` is dC_i/dk_j of experiment e.
+    """
+    c0 = np.atleast_2d(np.asarray(c_ini, dtype=float))
+    k = np.asarray(k, dtype=float)
+    n_cases, n_species = c0.shape
+    n_params = k.size
+    block = (1 + n_params)*n_species
+    h = 1e-6*np.maximum(np.abs(k), 1e-8)
+    # Rate constants k, k + h_j e_j and k - h_j e_j side by side, so f and all
+    # central differences in k come from one model call broadcast over them.
+    K = np.repeat(k[:, None], 1 + 2*n_params, axis=1)
+    K[np.arange(n_params), 1 + 2*np.arange(n_params)] += h
+    K[np.arange(n_params), 2 + 2*np.arange(n_params)] -= h
+    K = K[:, :, None]
+
+    def rhs(t, y):
+        Y = y.reshape(n_cases, 1 + n_params, n_species)
+        C = Y[:, 0].T
+        F = _stack(fun(t, np.broadcast_to(C[:, None], (n_species, K.shape[1], n_cases)), K),
+                   (K.shape[1], n_cases))
+        dY = np.empty_like(Y)
+        dY[:, 0] = F[:, 0].T
+        J = _batch_jacobian(fun, jac, t, C, k)
+        dY[:, 1:] = np.einsum("eil,ejl->eji", J, Y[:, 1:])
+        dY[:, 1:] += ((F[:, 1::2] - F[:, 2::2])/(2*h[:, None])).transpose(2, 1, 0)
+        return dY.ravel()
+
+    # Block-diagonal Newton matrix: J for the state and for every sensitivity,
+    # dense for LSODA, which cannot take a sparse one.
+    offsets = (block*np.arange(n_cases)[:, None] + n_species*np.arange(1 + n_params)[None, :])[:, :, None, None]
+    i, l = np.meshgrid(np.arange(n_species), np.arange(n_species), indexing="ij")
+    rows = (offsets + i).ravel()
+    cols = (offsets + l).ravel()
+    size = n_cases*block
+
+    def rhs_jac(t, y):
+        C = y.reshape(n_cases, 1 + n_params, n_species)[:, 0].T
+        J = _batch_jacobian(fun, jac, t, C, k)
+        values = np.broadcast_to(J[:, None], (n_cases, 1 + n_params, n_species, n_species))
+        M = sparse.csc_matrix((values.ravel(), (rows, cols)), shape=(size, size))
+        return M.toarray() if method == "LSODA" else M
+
+    y0 = np.zeros((n_cases, 1 + n_params, n_species))
+    y0[:, 0] = c0
+    t_eval = np.asarray(t_eval, dtype=float)
+    implicit = {"jac": rhs_jac} if method in ("Radau", "BDF", "LSODA") else {}
+    sol = solve_ivp(rhs, [0.0, t_eval[-1]], y0.ravel(), method=method, t_eval=t_eval, **implicit, **options)
+    if not sol.success:
+        raise RuntimeError(sol.message)
+    Y = sol.y.reshape(n_cases, 1 + n_params, n_species, -1)
+    return Y[:, 0], Y[:, 1:].transpose(0, 2, 1, 3)
+
+
+def fit_rate_constants(fun, experiments, k0, jac=None, free=None, bounds=(0.0, np.inf), method="Radau",
+                       solver_options=None, **options):
+    """Least-squares fit of the rate constants to one or more experiments.
+
+    Parameters
+    ----------
+    fun, jac : callable
+        Species balances ``fun(t, c_ini, k)`` and optional analytic Jacobian.
+    experiments : sequence of Experiment
+        Batch runs sharing the rate constants; all are integrated in one
+        stacked solve per iteration.
+    k0 : array_like, shape (n_params,)
+        Initial guess; must be positive since log k is fitted.
+    free : array_like of bool, optional
+        Which constants are fitted; the others are held at ``k0``.
+    bounds : tuple, optional
+        Bounds on the fitted constants (in k, not log k).
+    method : str, optional
+        Integration method passed to solve_ivp.
+    solver_options : dict, optional
+        Keyword arguments for solve_ivp; ``rtol=1e-6`` and ``atol=1e-9`` by
+        default.
+    **options
+        Further keyword arguments for scipy.optimize.least_squares.
+
+    Returns
+    -------
+    OptimizeResult
+        The least_squares result with the fitted constants ``k``, their
+        standard errors ``k_std`` and covariance ``covariance`` of the fitted
+        log k (NaN if the fit is not identifiable), and ``n_solves``, the
+        number of augmented solves.
+    """
+    k0 = np.asarray(k0, dtype=float)
+    free = np.ones(k0.size, dtype=bool) if free is None else np.asarray(free, dtype=bool)
+    solver_options = {"rtol": 1e-6, "atol": 1e-9, **(solver_options or {})}
+    t_all = np.unique(np.concatenate([e.t for e in experiments]))
+    c_ini = np.stack([e.c_ini for e in experiments])
+    columns = [np.searchsorted(t_all, e.t) for e in experiments]
+    lower, upper = (np.broadcast_to(np.asarray(b, dtype=float), k0.shape)[free] for b in bounds)
+    with np.errstate(divide="ignore"):
+        log_bounds = (np.log(lower), np.log(upper))
+
+    cache, n_solves = {}, [0]
+
+    def evaluate(theta):
+        key = theta.tobytes()
+        if key not in cache:
+            n_solves[0] += 1
+            k = k0.copy()
+            k[free] = np.exp(theta)
+            C, S = forward_sensitivities(fun, t_all, c_ini, k, jac=jac, method=method, **solver_options)
+            residuals, gradients = [], []
+            for e, experiment in enumerate(experiments):
+                w = experiment.weights
+                C_e = C[e][experiment.species][:, columns[e]]
+                S_e = S[e][experiment.species][:, :, columns[e]][:, free]
+                residuals.append((w*(C_e - experiment.data)).ravel())
+                # d/dlog k = k d/dk; rows ordered like the residuals.
+                gradients.append((w[:, None]*S_e*k[free][None, :, None]).transpose(0, 2, 1).reshape(-1, free.sum()))
+            cache.clear()
+            cache[key] = (np.concatenate(residuals), np.vstack(gradients))
+        return cache[key]
+
+    result = least_squares(lambda theta: evaluate(theta)[0], np.log(k0[free]), jac=lambda theta: evaluate(theta)[1],
+                           bounds=log_bounds, **options)
+
+    k = k0.copy()
+    k[free] = np.exp(result.x)
+    dof = result.fun.size - free.sum()
+    try:
+        covariance = np.linalg.inv(result.jac.T @ result.jac)*(2*result.cost/dof if dof > 0 else np.nan)
+    except np.linalg.LinAlgError:
+        covariance = np.full((free.sum(), free.sum()), np.nan)
+    k_std = np.zeros(k0.size)
+    k_std[free] = k[free]*np.sqrt(np.diag(covariance))
+    return OptimizeResult(result, k=k, k_std=k_std, covariance=covariance, n_solves=n_solves[0])
@@ -0,0 +1,313 @@
+"""Numba-compiled species balances and a compiled stiff integrator.
+
+The Python models in :mod:`chemical_kinetics.models` unpack lists and return a
+new list on every call, which costs microseconds per RHS evaluation inside
+solve_ivp. This module provides compiled kernels of the same models that write
+into preallocated arrays:
+
+    rhs(t, c, k, out)      out[i] = dC_i/dt
+    jac(t, c, k, out)      out[i, j] = d(dC_i/dt)/dC_j
+
+with ``c``, ``k`` and ``out`` float arrays. :func:`compiled` wraps them with
+the ``fun(t, c_ini, k)`` signature for solve_ivp and the other solvers of the
+package. :func:`solve_jit` goes further and runs the whole integration in
+compiled code: a three-stage, L-stable Rosenbrock method of order 3 (ROS3,
+Sandu et al. 1997) with embedded error estimate, step size control and cubic
+Hermite output at ``t_eval``, so no Python runs per step.
+
+Numba is optional. Without it ``HAVE_NUMBA`` is False and the same kernels and
+integrator run as ordinary Python functions: correct, but slow.
+"""
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from chemical_kinetics.models import (
+    series_reactions_batch,
+    series_reactions_batch_jac,
+    series_reactions_batch_QSSA,
+    series_reactions_batch_QSSA_jac,
+    series_reactions_batch_REA,
+    series_reactions_batch_REA_jac,
+)
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+HAVE_NUMBA = numba is not None
+
+
+def _njit(func):
+    return numba.njit(cache=True)(func) if HAVE_NUMBA else func
+
+
+@_njit
+def series_rhs(t, c, k, out):
+    if k.shape[0] == 2:
+        k1, k_1, k2, k_2 = k[0], 0.0, k[1], 0.0
+    else:
+        k1, k_1, k2, k_2 = k[0], k[1], k[2], k[3]
+    r1 = k1*c[0] - k_1*c[1]
+    r2 = k2*c[1] - k_2*c[2]
+    out[0] = -r1
+    out[1] = r1 - r2
+    out[2] = r2
+
+
+@_njit
+def series_jac(t, c, k, out):
+    if k.shape[0] == 2:
+        k1, k_1, k2, k_2 = k[0], 0.0, k[1], 0.0
+    else:
+        k1, k_1, k2, k_2 = k[0], k[1], k[2], k[3]
+    out[0, 0], out[0, 1], out[0, 2] = -k1, k_1, 0.0
+    out[1, 0], out[1, 1], out[1, 2] = k1, -k_1 - k2, k_2
+    out[2, 0], out[2, 1], out[2, 2] = 0.0, k2, -k_2
+
+
+@_njit
+def series_qssa_rhs(t, c, k, out):
+    r1 = k[0]*c[0]
+    out[0] = -r1
+    out[1] = 0.0
+    out[2] = r1
+
+
+@_njit
+def series_qssa_jac(t, c, k, out):
+    out[:, :] = 0.0
+    out[0, 0] = -k[0]
+    out[2, 0] = k[0]
+
+
+@_njit
+def series_rea_rhs(t, c, k, out):
+    r1 = k[0]*c[0] - k[1]*c[1]
+    out[0] = -r1
+    out[1] = r1/(1 + k[2])
+    out[2] = k[2]*r1/(1 + k[2])
+
+
+@_njit
+def series_rea_jac(t, c, k, out):
+    b, g = 1/(1 + k[2]), k[2]/(1 + k[2])
+    out[0, 0], out[0, 1], out[0, 2] = -k[0], k[1], 0.0
+    out[1, 0], out[1, 1], out[1, 2] = b*k[0], -b*k[1], 0.0
+    out[2, 0], out[2, 1], out[2, 2] = g*k[0], -g*k[1], 0.0
+
+
+# Compiled kernels of the Python models, keyed by the model and its Jacobian.
+KERNELS = {
+    series_reactions_batch: (series_rhs, series_jac),
+    series_reactions_batch_jac: (series_rhs, series_jac),
+    series_reactions_batch_QSSA: (series_qssa_rhs, series_qssa_jac),
+    series_reactions_batch_QSSA_jac: (series_qssa_rhs, series_qssa_jac),
+    series_reactions_batch_REA: (series_rea_rhs, series_rea_jac),
+    series_reactions_batch_REA_jac: (series_rea_rhs, series_rea_jac),
+}
+
+
+def compiled(fun):
+    """Compiled replacements ``(rhs, jac)`` of a model for solve_ivp.
+
+    Both have the ``fun(t, c_ini, k)`` signature of the Python model and
+    return new arrays (solve_ivp keeps references to returned values), but
+    evaluate the model in a compiled kernel. For the three-species models the
+    call overhead dominates, so the gain inside solve_ivp is small; use
+    :func:`solve_jit` to remove the per-step Python cost.
+    """
+    rhs_kernel, jac_kernel = KERNELS[fun]
+
+    def rhs(t, c_ini, k):
+        c = np.asarray(c_ini, dtype=float)
+        out = np.empty(c.shape[0])
+        rhs_kernel(t, c, np.asarray(k, dtype=float), out)
+        return out
+
+    def jac(t, c_ini, k):
+        c = np.asarray(c_ini, dtype=float)
+        out = np.empty((c.shape[0], c.shape[0]))
+        jac_kernel(t, c, np.asarray(k, dtype=float), out)
+        return out
+
+    return rhs, jac
+
+
+@_njit
+def _lu(M, perm):
+    # In-place LU factorization with partial pivoting of a small dense matrix.
+    n = M.shape[0]
+    for j in range(n):
+        p = j + np.argmax(np.abs(M[j:, j]))
+        perm[j] = p
+        if p != j:
+            for l in range(n):
+                M[j, l], M[p, l] = M[p, l], M[j, l]
+        for i in range(j + 1, n):
+            M[i, j] /= M[j, j]
+            for l in range(j + 1, n):
+                M[i, l] -= M[i, j]*M[j, l]
+
+
+@_njit
+def _lu_solve(LU, perm, b, x):
+    n = LU.shape[0]
+    x[:] = b
+    for j in range(n):
+        p = perm[j]
+        x[j], x[p] = x[p], x[j]
+    for i in range(n):
+        for l in range(i):
+            x[i] -= LU[i, l]*x[l]
+    for i in range(n - 1, -1, -1):
+        for l in range(i + 1, n):
+            x[i] -= LU[i, l]*x[l]
+        x[i] /= LU[i, i]
+
+
+# Coefficients of ROS3 (Sandu et al. 1997): three stages, order 3 with an
+# embedded second-order error estimate, L-stable. The third stage reuses the
+# RHS of the second (A31 = A21, A32 = 0). The models are autonomous, so the
+# time-derivative terms of the method are left out.
+_ROS3_GAMMA = 0.43586652150845899941601945119356
+_ROS3_ALPHA = 0.43586652150845899941601945119356
+_ROS3_C = (-0.10156171083877702091975600115545e+01, 0.40759956452537699824805835358067e+01,
+           0.92076794298330791242156818474003e+01)
+_ROS3_M = (1.0, 0.61697947043828245592553615689730e+01, -0.42772256543218573326238373806514)
+_ROS3_E = (0.5, -0.29079558716805469821718236208017e+01, 0.22354069897811569627360909276199)
+
+
+@_njit
+def _ros3(rhs, jac, t0, tf, y0, k, t_eval, rtol, atol, first_step, max_steps):
+    n = y0.size
+    c21, c31, c32 = _ROS3_C
+    m1, m2, m3 = _ROS3_M
+    e1, e2, e3 = _ROS3_E
+    out = np.empty((n, t_eval.size))
+    y, y1, y_new = y0.copy(), np.empty(n), np.empty(n)
+    f, f1, f_new, b = np.empty(n), np.empty(n), np.empty(n), np.empty(n)
+    K1, K2, K3 = np.empty(n), np.empty(n), np.empty(n)
+    J, G = np.empty((n, n)), np.empty((n, n))
+    perm = np.empty(n, dtype=np.int64)
+    stats = np.zeros(5, dtype=np.int64)  # nfev, njev, nlu, accepted, rejected
+
+    # h is the step length; the signed step hs = d*h runs toward tf.
+    d = 1.0 if tf >= t0 else -1.0
+    t = t0
+    rhs(t, y, k, f)
+    stats[0] += 1
+    next_eval = 0
+    while next_eval < t_eval.size and d*t_eval[next_eval] <= d*t0:
+        out[:, next_eval] = y
+        next_eval += 1
+
+    h = first_step
+    jac_current = False
+    while d*(tf - t) > 0:
+        if stats[3] + stats[4] >= max_steps:
+            return out[:, :next_eval], stats, t, False
+        h = min(h, d*(tf - t))
+        hs = d*h
+        if not jac_current:
+            jac(t, y, k, J)
+            stats[1] += 1
+            jac_current = True
+        for i in range(n):
+            for l in range(n):
+                G[i, l] = -J[i, l]
+            G[i, i] += 1/(hs*_ROS3_GAMMA)
+        _lu(G, perm)
+        stats[2] += 1
+
+        # Stages (I/(hγ) - J) K_i = f(y + sum A_ij K_j) + sum C_ij/h K_j.
+        _lu_solve(G, perm, f, K1)
+        for i in range(n):
+            y1[i] = y[i] + K1[i]
+        rhs(t + _ROS3_ALPHA*hs, y1, k, f1)
+        stats[0] += 1
+        for i in range(n):
+            b[i] = f1[i] + c21/hs*K1[i]
+        _lu_solve(G, perm, b, K2)
+        for i in range(n):
+            b[i] = f1[i] + (c31*K1[i] + c32*K2[i])/hs
+        _lu_solve(G, perm, b, K3)
+
+        error = 0.0
+        for i in range(n):
+            y_new[i] = y[i] + m1*K1[i] + m2*K2[i] + m3*K3[i]
+            scale = atol + rtol*max(abs(y[i]), abs(y_new[i]))
+            error += ((e1*K1[i] + e2*K2[i] + e3*K3[i])/scale)**2
+        error = np.sqrt(error/n)
+
+        if error <= 1.0:
+            rhs(t + hs, y_new, k, f_new)
+            stats[0] += 1
+            while next_eval < t_eval.size and d*t_eval[next_eval] <= d*(t + hs):
+                # Cubic Hermite interpolation between (y, f) and (y_new, f_new).
+                s = (t_eval[next_eval] - t)/hs
+                h00, h10 = (1 + 2*s)*(1 - s)**2, s*(1 - s)**2
+                h01, h11 = s*s*(3 - 2*s), s*s*(s - 1)
+                for i in range(n):
+                    out[i, next_eval] = h00*y[i] + h10*hs*f[i] + h01*y_new[i] + h11*hs*f_new[i]
+                next_eval += 1
+            t += hs
+            y[:] = y_new
+            f[:] = f_new
+            jac_current = False
+            stats[3] += 1
+        else:
+            stats[4] += 1
+        h *= min(5.0, max(0.2, 0.9*error**(-1/3))) if error > 0 else 5.0
+    return out[:, :next_eval], stats, t, True
+
+
+def solve_jit(fun, t_span, c_ini, k, t_eval=None, rtol=1e-6, atol=1e-9, first_step=None, max_steps=10**6):
+    """Integrate a model entirely in compiled code with the ROS3 Rosenbrock method.
+
+    Parameters
+    ----------
+    fun : callable
+        One of the models in :mod:`chemical_kinetics.models` (see
+        ``KERNELS``), or a tuple ``(rhs, jac)`` of compiled kernels with the
+        ``(t, c, k, out)`` signature.
+    t_span : sequence of float
+        Integration interval ``[t0, tf]``; ``tf < t0`` integrates backward.
+    c_ini : array_like, shape (n_species,)
+        Initial concentrations.
+    k : array_like
+        Rate constants.
+    t_eval : array_like, optional
+        Times at which the solution is stored, within ``t_span`` and sorted
+        in the direction of integration; the ends of ``t_span`` if None.
+    rtol, atol : float, optional
+        Tolerances of the embedded error estimate. ROS3 is third order, so
+        its cost rises faster than Radau's as the tolerances are tightened.
+    first_step : float, optional
+        Initial step size; 1e-6 of the interval by default.
+    max_steps : int, optional
+        Maximum number of attempted steps.
+
+    Returns
+    -------
+    OptimizeResult
+        With ``t``, ``y``, ``nfev``, ``njev``, ``nlu``, ``n_accepted``,
+        ``n_rejected``, ``status``, ``message`` and ``success`` as for
+        solve_ivp.
+    """
+    rhs, jac = KERNELS[fun] if callable(fun) else fun
+    t0, tf = float(t_span[0]), float(t_span[-1])
+    t_eval = np.asarray(t_eval if t_eval is not None else [t0, tf], dtype=float)
+    if np.any(t_eval < min(t0, tf)) or np.any(t_eval > max(t0, tf)):
+        raise ValueError("Values in `t_eval` are not within `t_span`.")
+    if np.any(np.diff(t_eval)*(tf - t0) < 0):
+        raise ValueError("Values in `t_eval` are not properly sorted.")
+    first_step = 1e-6*abs(tf - t0) if first_step is None else abs(first_step)
+    y, stats, t, success = _ros3(rhs, jac, t0, tf, np.asarray(c_ini, dtype=float), np.asarray(k, dtype=float),
+                                 t_eval, rtol, atol, first_step, max_steps)
+    message = ("The solver successfully reached the end of the integration interval." if success
+               else "Maximum number of steps reached at t = %g." % t)
+    return OptimizeResult(t=t_eval[:y.shape[1]], y=y, nfev=int(stats[0]), njev=int(stats[1]),
+                          nlu=int(stats[2]), n_accepted=int(stats[3]), n_rejected=int(stats[4]),
+                          status=0 if success else -1, message=message, success=success)
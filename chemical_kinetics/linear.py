@@ -0,0 +1,175 @@
+"""Closed-form solutions of linear, first-order, constant-coefficient networks.
+
+Mass-action networks made only of first-order steps, such as the series
+reactions A -> B -> C and A <-> B <-> C and their QSSA/REA reductions, have
+species balances of the form dC/dt = K C with a constant rate matrix K. Their
+solution C(t) = expm(K (t - t0)) C0 is evaluated here at every output time in
+one vectorized step instead of integrating the ODEs.
+
+Linearity is detected numerically: K is assembled column by column from model
+evaluations at unit concentration vectors, or taken from the analytic
+Jacobian, and then checked against the model at random states, at both ends
+of the time span and at random times inside it. Any network that fails the
+check is integrated with solve_ivp instead.
+"""
+
+import numpy as np
+import scipy.linalg
+from scipy.integrate import solve_ivp
+from scipy.optimize import OptimizeResult
+
+from chemical_kinetics.batch import _stack
+from chemical_kinetics.stiffness import solve_auto
+
+# Eigenvector matrices above this condition number are treated as defective
+# (e.g. k1 == k2 in A -> B -> C) and propagated with scipy.linalg.expm instead.
+_MAX_EIGVEC_COND = 1e8
+
+
+def rate_matrix(fun, t_span, k_cases, n_species, jac=None, rtol=1e-9, scale=1.0, seed=0):
+    """Return the constant rate matrices K of ``fun`` or None if it is not linear.
+
+    Parameters
+    ----------
+    fun : callable
+        Species balances ``fun(t, c_ini, k)``.
+    t_span : sequence of float
+        Time interval over which K must be constant; it is checked at both
+        ends and at two random interior times.
+    k_cases : array_like, shape (N_cases, n_params)
+        Rate constants, one row per case.
+    n_species : int
+        Number of species in the model.
+    jac : callable, optional
+        Analytic Jacobian of ``fun``; used as the candidate K when given.
+    rtol : float, optional
+        Relative tolerance of the linearity check.
+    scale : float, optional
+        Typical concentration magnitude of the random test states.
+    seed : int, optional
+        Seed of the random test states.
+
+    Returns
+    -------
+    ndarray, shape (N_cases, n_species, n_species) or None
+        K for every case such that ``fun(t, C, k) == K @ C``; None also when
+        ``fun`` raises on the stacked probe states.
+    """
+    k_params = np.atleast_2d(np.asarray(k_cases, dtype=float)).T
+    n_cases = k_params.shape[1]
+    t0, tf = float(t_span[0]), float(t_span[-1])
+
+    # Models written for scalar states (``if c[0] > 0.5``, ``max(c[0], 0)``)
+    # cannot be evaluated on the stacked probes; they are left to the solver.
+    with np.errstate(all="ignore"):
+        try:
+            if jac is None:
+                # Column j of K is the model evaluated at the unit vector e_j.
+                probes = np.eye(n_species)[:, :, None]
+                K = _stack(fun(t0, probes, k_params[:, None, :]), (n_species, n_cases)).transpose(2, 0, 1)
+            else:
+                probes = np.full((n_species, n_cases), scale)
+                K = _stack([_stack(row, (n_cases,)) for row in jac(t0, probes, k_params)],
+                           (n_species, n_cases)).transpose(2, 0, 1)
+            if not np.all(np.isfinite(K)):
+                return None
+
+            rng = np.random.default_rng(seed)
+            for t in (t0, tf, *(t0 + rng.random(2)*(tf - t0))):
+                for C in (np.zeros((n_species, n_cases)), scale*rng.random((n_species, n_cases))):
+                    dC = _stack(fun(t, C, k_params), (n_cases,))
+                    expected = np.einsum("cij,jc->ic", K, C)
+                    bound = rtol*(np.einsum("cij,jc->ic", np.abs(K), np.abs(C)) + np.abs(dC)) + 1e-300
+                    if not np.all(np.abs(dC - expected) <= bound):
+                        return None
+        except Exception:
+            return None
+    return K
+
+
+def _output_times(t_span, t_eval):
+    # The closed-form output times, rejected outside t_span like solve_ivp.
+    t0, tf = float(t_span[0]), float(t_span[-1])
+    if t_eval is None:
+        return np.array([t0, tf])
+    t = np.asarray(t_eval, dtype=float)
+    if np.any(t < min(t0, tf)) or np.any(t > max(t0, tf)):
+        raise ValueError("Values in `t_eval` are not within `t_span`.")
+    return t
+
+
+def propagate(K, c_ini, t, t0=0.0):
+    """Evaluate C(t) = expm(K (t - t0)) C0 for every case at every time.
+
+    Parameters
+    ----------
+    K : array_like, shape (N_cases, n_species, n_species)
+        Constant rate matrices.
+    c_ini : array_like, shape (n_species,) or (N_cases, n_species)
+        Concentrations at ``t0``.
+    t : array_like, shape (n_times,)
+        Output times.
+    t0 : float, optional
+        Time at which ``c_ini`` is given.
+
+    Returns
+    -------
+    ndarray, shape (N_cases, n_species, n_times)
+    """
+    K = np.asarray(K, dtype=float)
+    n_cases, n_species = K.shape[:2]
+    c0 = np.broadcast_to(np.asarray(c_ini, dtype=float), (n_cases, n_species))
+    dt = np.asarray(t, dtype=float) - t0
+
+    # Diagonalizable cases: C(t) = V diag(exp(w dt)) V^-1 C0.
+    w, V = np.linalg.eig(K)
+    cond = np.linalg.cond(V)
+    good = np.isfinite(cond) & (cond < _MAX_EIGVEC_COND)
+    C = np.empty((n_cases, n_species, dt.size))
+    if np.any(good):
+        coeffs = np.linalg.solve(V[good], c0[good][:, :, None])
+        modes = np.exp(w[good][:, :, None]*dt)*coeffs
+        C[good] = np.real(V[good] @ modes)
+
+    # Defective or nearly defective cases fall back to the matrix exponential.
+    for case in np.flatnonzero(~good):
+        C[case] = (scipy.linalg.expm(K[case]*dt[:, None, None]) @ c0[case]).T
+    return C
+
+
+def solve_kinetics(fun, t_span, c_ini, t_eval=None, method="Radau", jac=None, args=(),
+                   closed_form=True, **options):
+    """Drop-in replacement for solve_ivp that uses the closed form when possible.
+
+    When ``closed_form`` is set and the model ``fun(t, c_ini, k)`` (with
+    ``args=[k]``) is linear in the concentrations with constant coefficients,
+    the solution is evaluated as expm(K t) C0 at ``t_eval``, or at the ends of
+    ``t_span`` if ``t_eval`` is None. Otherwise, or when events or dense output
+    are requested, the call is forwarded to solve_ivp unchanged, or to
+    :func:`chemical_kinetics.stiffness.solve_auto` for ``method="auto"``.
+
+    Returns
+    -------
+    OptimizeResult
+        With the same fields as the solve_ivp result. ``nfev`` counts the
+        model evaluations used by the linearity check.
+    """
+    if closed_form and len(args) == 1 and options.get("events") is None and not options.get("dense_output"):
+        c0 = np.asarray(c_ini, dtype=float)
+        nfev = [0]
+
+        def counted(t, C, k):
+            nfev[0] += 1
+            return fun(t, C, k)
+
+        K = rate_matrix(counted, t_span, [args[0]], c0.size, jac=jac,
+                        scale=max(1.0, np.abs(c0).max(initial=0.0)))
+        if K is not None:
+            t = _output_times(t_span, t_eval)
+            return OptimizeResult(t=t, y=propagate(K, c0, t, t0=t_span[0])[0], sol=None,
+                                  t_events=None, y_events=None, nfev=nfev[0], njev=int(jac is not None),
+                                  nlu=0, status=0, message="Closed-form solution expm(K t) C0.",
+                                  success=True)
+    if method == "auto":
+        return solve_auto(fun, t_span, c_ini, t_eval=t_eval, jac=jac, args=args, **options)
+    return solve_ivp(fun, t_span, c_ini, method=method, t_eval=t_eval, jac=jac, args=args, **options)
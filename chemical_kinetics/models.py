@@ -0,0 +1,123 @@
+"""Batch reactor species balances for the series reaction A <-> B <-> C.
+
+All models follow the solve_ivp signature ``fun(t, c_ini, k)`` and return one
+derivative per species. They only use NumPy arithmetic on the unpacked
+entries, so ``c_ini`` and ``k`` may hold arrays of cases (see
+:func:`chemical_kinetics.batch.solve_batch`). Every model comes with its
+analytic Jacobian ``<model>_jac`` for the implicit solvers.
+
+The full model is the hand-written form of
+``ReactionNetwork(["A", "B", "C"], ["A <-> B", "B <-> C"])`` from
+:mod:`chemical_kinetics.network`, which compiles other mechanisms.
+"""
+
+
+def series_reactions_batch(t, c_ini, k):
+    """Batch reactor species balances of the series reaction.
+
+    ``k = [k1, k2]`` models the irreversible series A -> B -> C, and
+    ``k = [k1, k_1, k2, k_2]`` the reversible series A <-> B <-> C.
+    """
+    CA = c_ini[0]
+    CB = c_ini[1]
+    CC = c_ini[2]
+
+    if len(k) == 2:
+        k1, k_1, k2, k_2 = k[0], 0, k[1], 0
+    else:
+        k1, k_1, k2, k_2 = k[0], k[1], k[2], k[3]
+
+    r1 = k1*CA - k_1*CB
+    r2 = k2*CB - k_2*CC
+
+    dCAdt = -r1
+    dCBdt = r1 - r2
+    dCCdt = r2
+
+    return [dCAdt, dCBdt, dCCdt]
+
+
+def series_reactions_batch_jac(t, c_ini, k):
+    """Analytic Jacobian d(dC/dt)/dC of :func:`series_reactions_batch`."""
+    if len(k) == 2:
+        k1, k_1, k2, k_2 = k[0], 0, k[1], 0
+    else:
+        k1, k_1, k2, k_2 = k[0], k[1], k[2], k[3]
+
+    return [[-k1,       k_1,    0],
+            [ k1, -k_1 - k2,  k_2],
+            [  0,        k2, -k_2]]
+
+
+def series_reactions_batch_QSSA(t, c_ini, k):
+    """Species balances of A -> B -> C under the quasi-steady-state assumption for B.
+
+    ``k = [k1, k2]``; with B at its quasi-steady state every A converted
+    passes straight through to C.
+    """
+    CA = c_ini[0]
+
+    k1 = k[0]
+
+    r1 = k1*CA
+
+    dCAdt = -r1
+    dCBdt = 0
+    dCCdt = r1
+
+    return [dCAdt, dCBdt, dCCdt]
+
+
+def series_reactions_batch_QSSA_jac(t, c_ini, k):
+    """Analytic Jacobian of :func:`series_reactions_batch_QSSA`."""
+    k1 = k[0]
+
+    return [[-k1, 0, 0],
+            [  0, 0, 0],
+            [ k1, 0, 0]]
+
+
+def series_reactions_batch_REA(t, c_ini, k):
+    """Species balances of A <-> B <-> C with B <-> C at equilibrium.
+
+    ``k = [k1, k_1, K2]`` with the equilibrium constant K2 = k2/k_2. The
+    converted A is split between B and C in the equilibrium ratio.
+    """
+    CA = c_ini[0]
+    CB = c_ini[1]
+
+    k1 = k[0]
+    k_1 = k[1]
+    K2 = k[2]
+
+    r1 = k1*CA - k_1*CB
+
+    dCAdt = -r1
+    dCBdt = (1/(1 + K2))*r1
+    dCCdt = (K2/(1 + K2))*r1
+
+    return [dCAdt, dCBdt, dCCdt]
+
+
+def series_reactions_batch_REA_jac(t, c_ini, k):
+    """Analytic Jacobian of :func:`series_reactions_batch_REA`."""
+    k1 = k[0]
+    k_1 = k[1]
+    K2 = k[2]
+
+    return [[            -k1,              k_1, 0],
+            [ (1/(1 + K2))*k1, -(1/(1 + K2))*k_1, 0],
+            [(K2/(1 + K2))*k1, -(K2/(1 + K2))*k_1, 0]]
+
+
+def rea_initial_conditions(c_ini, K2):
+    """Project initial concentrations onto the B <-> C equilibrium of the REA model.
+
+    The total CB0 + CC0 is kept and split as 1/(1+K2) and K2/(1+K2).
+    """
+    CA0, CB0, CC0 = c_ini[0], c_ini[1], c_ini[2]
+
+    CBs = (1/(1 + K2))*(CB0 + CC0)
+    CCs = (K2/(1 + K2))*(CB0 + CC0)
+
+    return [CA0, CBs, CCs]
@@ -0,0 +1,229 @@
+"""Reaction networks compiled to vectorized species balances and Jacobians.
+
+A network is defined by its species and reactions, e.g.::
+
+    net = ReactionNetwork(["A", "B", "C"], ["A <-> B", "B <-> C"])
+
+Reversible reactions are split into a forward and a backward step, so the rate
+constant vector is ordered like the hand-written models: ``k = [k1, k_1, k2,
+k_2]`` above. The species balances are dC/dt = S @ r(C, k), with the
+stoichiometric matrix S (n_species x n_steps) and the step rates r. Mass-action
+rates are evaluated for all steps at once from precomputed reactant index
+arrays, so no per-species Python code runs during integration.
+
+``net.rhs`` and ``net.jac`` have the ``fun(t, c_ini, k)`` signature of the
+models in :mod:`chemical_kinetics.models` and broadcast over arrays of cases,
+so they work with solve_ivp, solve_batch and solve_kinetics alike. For large
+networks ``net.jac_sparse`` returns a sparse Jacobian for a single state and
+``net.jac_sparsity`` its pattern.
+"""
+
+import re
+
+import numpy as np
+import scipy.sparse as sparse
+
+_ARROWS = ("<->", "->")
+
+
+class Reaction:
+    """One reaction step ``reactants -> products``.
+
+    Parameters
+    ----------
+    reactants, products : dict
+        Species name to stoichiometric coefficient.
+    rate : callable, optional
+        Custom rate law ``rate(C, k)`` of the step, where ``C`` holds one row
+        per species of the network and ``k`` is the step's rate constant.
+        Defaults to mass action with the reactant coefficients as orders.
+    rate_jac : callable, optional
+        Derivatives ``rate_jac(C, k)`` of the custom rate law with respect to
+        every species, one entry per species. Without it the derivatives of a
+        custom rate law are estimated by central differences.
+    reversible : bool, optional
+        Add the backward step ``products -> reactants`` with its own rate
+        constant (mass action only).
+    """
+
+    def __init__(self, reactants, products, rate=None, rate_jac=None, reversible=False):
+        if reversible and rate is not None:
+            raise ValueError("custom rate laws must be given per direction")
+        self.reactants = dict(reactants)
+        self.products = dict(products)
+        self.rate = rate
+        self.rate_jac = rate_jac
+        self.reversible = reversible
+
+    def __repr__(self):
+        arrow = " <-> " if self.reversible else " -> "
+        return "Reaction(%r)" % (_format_side(self.reactants) + arrow + _format_side(self.products))
+
+    def steps(self):
+        """Directional steps of the reaction, backward step last."""
+        if not self.reversible:
+            return [self]
+        return [Reaction(self.reactants, self.products), Reaction(self.products, self.reactants)]
+
+
+def _format_side(side):
+    return " + ".join(name if nu == 1 else "%g %s" % (nu, name) for name, nu in side.items()) or "0"
+
+
+def _parse_side(text):
+    side = {}
+    for term in text.split("+"):
+        term = term.strip()
+        if not term or term == "0":
+            continue
+        match = re.fullmatch(r"(\d*\.?\d*)\s*([A-Za-z_][\w()]*)", term)
+        if match is None:
+            raise ValueError("cannot parse reaction term %r" % term)
+        nu = float(match.group(1)) if match.group(1) else 1.0
+        side[match.group(2)] = side.get(match.group(2), 0.0) + nu
+    return side
+
+
+def parse_reaction(equation):
+    """Parse ``"2 A + B -> C"`` or ``"A <-> B"`` into a :class:`Reaction`."""
+    for arrow in _ARROWS:
+        if arrow in equation:
+            left, right = equation.split(arrow)
+            return Reaction(_parse_side(left), _parse_side(right), reversible=arrow == "<->")
+    raise ValueError("reaction %r has no '->' or '<->'" % equation)
+
+
+class ReactionNetwork:
+    """Species balances dC/dt = S @ r(C, k) of a reaction network.
+
+    Parameters
+    ----------
+    species : sequence of str
+        Species names; fixes the order of the concentration vector.
+    reactions : sequence of str or Reaction
+        Reactions as equations (see :func:`parse_reaction`) or objects.
+    """
+
+    def __init__(self, species, reactions):
+        self.species = list(species)
+        index = {name: i for i, name in enumerate(self.species)}
+        reactions = [parse_reaction(r) if isinstance(r, str) else r for r in reactions]
+        self.steps = [step for reaction in reactions for step in reaction.steps()]
+        n_species, n_steps = len(self.species), len(self.steps)
+
+        S = np.zeros((n_species, n_steps))
+        for j, step in enumerate(self.steps):
+            for side, sign in ((step.reactants, -1.0), (step.products, 1.0)):
+                for name, nu in side.items():
+                    if name not in index:
+                        raise ValueError("unknown species %r in %r" % (name, step))
+                    S[index[name], j] += sign*nu
+        self.stoichiometry = S
+        self._S = sparse.csr_matrix(S)
+
+        # Mass-action steps: the rate is k times the product of the reactant
+        # concentrations listed in one padded row of species indices per step.
+        # The padding index n_species points at a row of ones.
+        self._mass_action = np.array([step.rate is None for step in self.steps], dtype=bool)
+        self._custom = [j for j in range(n_steps) if not self._mass_action[j]]
+        slots = []
+        for step in self.steps:
+            row = []
+            if step.rate is not None:
+                slots.append(row)
+                continue
+            for name, nu in step.reactants.items():
+                if nu != int(nu):
+                    raise ValueError("mass-action orders must be integers in %r" % step)
+                row += [index[name]]*int(nu)
+            slots.append(row)
+        width = max([len(row) for row in slots] + [1])
+        self._slots = np.full((n_steps, width), n_species)
+        for j, row in enumerate(slots):
+            self._slots[j, :len(row)] = row
+
+        # Jacobian sparsity: dC_i/dt depends on C_l if a step consuming or
+        # producing i has l among its reactants (or a custom rate law).
+        depends = np.zeros((n_steps, n_species), dtype=bool)
+        for j in range(n_steps):
+            if self._mass_action[j]:
+                depends[j, self._slots[j][self._slots[j] < n_species]] = True
+            else:
+                depends[j] = True
+        self._depends = depends
+        self.jac_sparsity = sparse.csc_matrix((np.abs(S) @ depends) > 0, dtype=float)
+
+    def __repr__(self):
+        return "ReactionNetwork(%d species, %d steps)" % (len(self.species), len(self.steps))
+
+    @property
+    def n_params(self):
+        """Number of rate constants, one per directional step."""
+        return len(self.steps)
+
+    def _padded(self, c_ini):
+        C = np.asarray(c_ini, dtype=float)
+        return np.concatenate([C, np.ones((1,) + C.shape[1:])])
+
+    def _k(self, k, shape):
+        k = np.asarray(k, dtype=float)
+        return k.reshape(k.shape + (1,)*(len(shape) - k.ndim + 1)) if k.ndim < len(shape) + 1 else k
+
+    def rates(self, c_ini, k):
+        """Step rates r(C, k), shape (n_steps, ...)."""
+        C = self._padded(c_ini)
+        k = self._k(k, C.shape[1:])
+        r = k*np.prod(C[self._slots], axis=1)
+        for j in self._custom:
+            r[j] = self.steps[j].rate(C[:-1], k[j])
+        return r
+
+    def rate_jacobian(self, c_ini, k):
+        """Derivatives dr/dC of the step rates, shape (n_steps, n_species, ...)."""
+        C = self._padded(c_ini)
+        n_species = C.shape[0] - 1
+        k = self._k(k, C.shape[1:])
+        factors = C[self._slots]
+        D = np.zeros((len(self.steps), n_species + 1) + C.shape[1:])
+        steps = np.arange(len(self.steps))
+        for m in range(self._slots.shape[1]):
+            others = np.prod(np.delete(factors, m, axis=1), axis=1)
+            # Repeated reactants (A + A) add up through np.add.at.
+            np.add.at(D, (steps, self._slots[:, m]), k*others)
+        D = D[:, :n_species]
+        for j in self._custom:
+            D[j] = self._custom_rate_jac(self.steps[j], C[:-1], k[j])
+        return D
+
+    def _custom_rate_jac(self, step, C, k):
+        if step.rate_jac is not None:
+            return np.stack([np.broadcast_to(np.asarray(d, dtype=float), C.shape[1:])
+                             for d in step.rate_jac(C, k)])
+        columns = []
+        for i in range(C.shape[0]):
+            h = 1e-7*np.maximum(1.0, np.abs(C[i]))
+            up, down = C.copy(), C.copy()
+            up[i] += h
+            down[i] -= h
+            columns.append((np.asarray(step.rate(up, k)) - np.asarray(step.rate(down, k)))/(2*h))
+        return np.stack(columns)
+
+    def rhs(self, t, c_ini, k):
+        """Species balances dC/dt = S @ r(C, k) with the ``fun(t, c_ini, k)`` signature."""
+        r = self.rates(c_ini, k)
+        return (self._S @ r.reshape(r.shape[0], -1)).reshape((-1,) + r.shape[1:])
+
+    def jac(self, t, c_ini, k):
+        """Dense Jacobian S @ dr/dC, shape (n_species, n_species, ...)."""
+        D = self.rate_jacobian(c_ini, k)
+        return np.tensordot(self.stoichiometry, D, axes=(1, 0))
+
+    def jac_sparse(self, t, c_ini, k):
+        """Sparse Jacobian of a single state ``c_ini`` of shape (n_species,).
+
+        Batched states, as passed by solve_batch, get the dense :meth:`jac`.
+        """
+        if np.ndim(c_ini) > 1:
+            return self.jac(t, c_ini, k)
+        D = self.rate_jacobian(c_ini, k)
+        return sparse.csc_matrix(self._S @ sparse.csr_matrix(D*self._depends))
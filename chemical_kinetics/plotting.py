@@ -0,0 +1,114 @@
+"""Figures of the batch reactor and catalyst pellet examples.
+
+Matplotlib is imported on the first plotting call only, so importing
+chemical_kinetics stays fast and headless workers never load a GUI backend.
+"""
+
+SPECIES_STYLES = (("A", "k"), ("B", "r"), ("C", "g"))
+
+
+def _style():
+    import matplotlib
+
+    matplotlib.rcParams["axes.labelsize"] = 14
+    matplotlib.rcParams["font.family"] = "Times New Roman"
+
+
+def _pyplot():
+    import matplotlib.pyplot as plt
+
+    _style()
+    return plt
+
+
+def _grid(ax):
+    ax.grid(True, color="grey", linewidth=1.0, linestyle="-")
+
+
+def _plot_species(ax, t, C, linestyle="-", suffix=""):
+    return [ax.plot(t, conc, color + linestyle, label=name + suffix)[0]
+            for (name, color), conc in zip(SPECIES_STYLES, C)]
+
+
+def show():
+    """Display all open figures."""
+    _pyplot().show()
+
+
+def plot_concentrations(t, C, title, legend_loc="upper right"):
+    """Concentration evolution of A, B and C in the batch reactor.
+
+    ``C`` holds one row per species, as in ``solve_ivp(...).y``.
+    """
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(9, 6))
+    _plot_species(ax, t, C)
+    ax.set_xlabel("Time [s]")
+    ax.set_ylabel("Concentration [mol/L]")
+    ax.set_title(title, fontsize=15)
+    _grid(ax)
+    ax.legend(loc=legend_loc, shadow=True, fontsize=14)
+    return fig
+
+
+def plot_k2_sweep(t, C_base, C_cases, base_label, case_labels, suptitle, suptitle_fontsize=35):
+    """2x2 grid comparing the base case with four cases of increasing k2.
+
+    ``base_label`` and ``case_labels`` describe the rate constants, e.g.
+    ``'k$_2$ = 10'``; each panel is titled with its case label in [1/s].
+    """
+    plt = _pyplot()
+    fig, axs = plt.subplots(nrows=2, ncols=2, figsize=(20, 15), dpi=150)
+    fig.suptitle(suptitle, fontsize=suptitle_fontsize, y=0.95)
+    for ax, C_case, case_label in zip(axs.flat, C_cases, case_labels):
+        _plot_species(ax, t, C_base, "-", "| " + base_label)
+        _plot_species(ax, t, C_case, "--", "| " + case_label)
+        ax.set_xlabel("Time [s]", fontsize=20)
+        ax.set_ylabel("Concentration [mol/L]", fontsize=20)
+        ax.set_title(case_label + " [1/s]", fontsize=20)
+        _grid(ax)
+        ax.legend(loc="upper right", shadow=True, fontsize=14)
+    return fig
+
+
+def plot_comparison(t, C_approx, C_full, approx_label, full_label, title):
+    """Approximate model (solid) against the full reaction model (dashed)."""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(9, 6))
+    _plot_species(ax, t, C_approx, "-", "| " + approx_label)
+    _plot_species(ax, t, C_full, "--", "| " + full_label)
+    ax.set_xlabel("Time [s]")
+    ax.set_ylabel("Concentration [mol/L]")
+    ax.set_title(title, fontsize=15)
+    _grid(ax)
+    ax.legend(loc="upper right", shadow=True, fontsize=12)
+    return fig
+
+
+def plot_slab_profiles(x, thiele, C):
+    """Concentration profiles through a slab, one column of ``C`` per Thiele modulus."""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(9, 6))
+    ax.invert_xaxis()
+    for i, phi in enumerate(thiele):
+        ax.plot(x, C[:, i], label="Φ=%g" % phi)
+    _grid(ax)
+    ax.set_xlabel("x$^*$ [-]")
+    ax.set_ylabel("C$^*$ [-]")
+    ax.set_title("Diffusion and Reaction Through Slab", fontsize=16)
+    ax.legend(loc="lower left", shadow=True, fontsize=12)
+    return fig
+
+
+def plot_effectiveness(thiele, curves):
+    """Log-log effectiveness factor curves, ``curves`` mapping shape name to η."""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(9, 6))
+    for shape, eta in curves.items():
+        ax.loglog(thiele, eta, label=shape)
+    ax.set_xlabel("Φ [-]")
+    ax.set_ylabel("η$_i$ [-]")
+    ax.set_title("Effectivness Factor for Internal Mass Transfer - Different Shape Catalysts", fontsize=14)
+    _grid(ax)
+    ax.legend(loc="lower left", shadow=True, fontsize=12)
+    return fig
@@ -0,0 +1,304 @@
+"""Instrumentation of solve_ivp solves.
+
+:class:`SolverProfiler` records where the time of a solve goes: RHS calls and
+their cumulative time, Jacobian evaluations, LU factorizations and
+back-substitutions with their times, and every step with its size, accepted or
+rejected. ``profiler.method("Radau")`` returns a subclass of the scipy solver
+class that wraps the model function, the Jacobian and the LU routines of each
+solver instance; solve_ivp accepts such a class as ``method`` and behaves
+exactly as with the name (t_eval, events and dense output included), so the
+record of a solve is made by the solver itself. :meth:`SolverProfiler.solve_ivp`
+is the drop-in entry point.
+
+solve_ivp does not report rejected step attempts. A step counts as rejected
+here when the solver took a smaller step than it proposed (the proposal
+``h_abs``, clipped to ``max_step`` and the end of the interval), i.e. when at
+least one attempt was rejected before the accepted one. LSODA proposes no step
+to the caller, so its rejections are not counted.
+
+With ``sample_every=n`` only every n-th RHS, Jacobian and LU call (from a
+random start) is timed and its time scaled by n, and only every n-th step is
+kept in the history; the counts stay exact. This keeps the overhead negligible in production sweeps.
+The records export to JSON (:meth:`SolverProfiler.to_json`) and to the
+Prometheus text format (:meth:`SolverProfiler.to_prometheus`).
+"""
+
+import json
+import random
+import time
+
+import numpy as np
+from scipy.integrate import LSODA, solve_ivp
+
+from chemical_kinetics.stiffness import METHODS
+
+# Upper edges of the step-size histogram of the Prometheus export.
+STEP_BUCKETS = tuple(10.0**e for e in range(-9, 3))
+
+# Fields of SolveMetrics summed by SolverProfiler.summary.
+_TOTALS = ("rhs_calls", "rhs_seconds", "nfev", "njev", "nlu", "jac_seconds", "lu_seconds", "solve_lu_calls",
+           "solve_lu_seconds", "accepted_steps", "rejected_steps", "setup_seconds", "wall_seconds")
+
+
+class SolveMetrics:
+    """Metrics of one solve.
+
+    Attributes
+    ----------
+    label, method : str
+    n : int
+        Number of equations.
+    rhs_calls, rhs_seconds : int, float
+        Calls of the model function (including those of finite-difference
+        Jacobians) and their cumulative time.
+    nfev, njev, nlu : int
+        The counters of the solver.
+    jac_seconds : float
+        Time of the Jacobian updates during the steps (finite differences
+        included); the Jacobian evaluated at set-up is in ``setup_seconds``.
+    lu_seconds, solve_lu_calls, solve_lu_seconds : float, int, float
+        Time of the LU factorizations, number and time of the solves with them.
+    accepted_steps, rejected_steps : int
+        Steps taken, and steps preceded by at least one rejected attempt.
+    setup_seconds, wall_seconds : float
+        Time of the solver construction, and from its start to the last step.
+    status : str
+        ``"running"``, ``"finished"``, ``"terminated"`` (by an event) or ``"failed"``.
+    t, h : list of float
+        Time reached and size of the recorded steps.
+    """
+
+    def __init__(self, method, n, label=None):
+        self.label = label
+        self.method = method
+        self.n = n
+        self.rhs_calls = 0
+        self.rhs_seconds = 0.0
+        self.nfev = self.njev = self.nlu = 0
+        self.jac_seconds = 0.0
+        self.lu_seconds = 0.0
+        self.solve_lu_calls = 0
+        self.solve_lu_seconds = 0.0
+        self.accepted_steps = 0
+        self.rejected_steps = 0
+        self.setup_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.status = "running"
+        self.t = []
+        self.h = []
+
+    def __repr__(self):
+        return "SolveMetrics(%s, %s, %d steps (%d rejected), %d RHS calls, %d LU)" % (
+            self.label, self.method, self.accepted_steps, self.rejected_steps, self.rhs_calls, self.nlu)
+
+    def as_dict(self, history=True):
+        """Metrics as a JSON-serializable dict, with the step history if ``history``."""
+        metrics = {name: value for name, value in vars(self).items() if name not in ("t", "h")}
+        metrics["h_min"] = min(self.h) if self.h else None
+        metrics["h_max"] = max(self.h) if self.h else None
+        if history:
+            metrics["t"] = list(self.t)
+            metrics["h"] = list(self.h)
+        return metrics
+
+
+def _timed(fun, every, phase=0):
+    # Wraps ``fun`` to count every call and time every ``every``-th, scaling
+    # its duration by ``every``; a random ``phase`` keeps the estimate
+    # unbiased for solves with few calls. Returns the wrapper and a function
+    # giving (calls, seconds).
+    calls = 0
+    seconds = 0.0
+
+    def wrapper(*args):
+        nonlocal calls, seconds
+        calls += 1
+        if (calls + phase) % every:
+            return fun(*args)
+        start = time.perf_counter()
+        result = fun(*args)
+        seconds += every*(time.perf_counter() - start)
+        return result
+
+    return wrapper, lambda: (calls, seconds)
+
+
+def _instrument(base, profiler):
+    every = profiler.sample_every
+
+    class Instrumented(base):
+
+        def __init__(self, fun, t0, y0, t_bound, **options):
+            start = time.perf_counter()
+            metrics = self.metrics = SolveMetrics(base.__name__, np.size(y0))
+            profiler.records.append(metrics)
+            self._timers = []
+            super().__init__(self._timed(fun, "rhs_calls", "rhs_seconds"), t0, y0, t_bound, **options)
+            # Later Jacobian updates and the LU routines go through these
+            # instance attributes (Radau and BDF).
+            if getattr(self, "jac", None) is not None:
+                self.jac = self._timed(self.jac, None, "jac_seconds")
+            if hasattr(self, "lu"):
+                self.lu = self._timed(self.lu, None, "lu_seconds")
+                self.solve_lu = self._timed(self.solve_lu, "solve_lu_calls", "solve_lu_seconds")
+            self._start = start
+            metrics.setup_seconds = time.perf_counter() - start
+            metrics.wall_seconds = metrics.setup_seconds
+            self._update()
+
+        def _timed(self, fun, calls, seconds):
+            wrapper, totals = _timed(fun, every, profiler._random.randrange(every))
+            self._timers.append((calls, seconds, totals))
+            return wrapper
+
+        def _update(self):
+            metrics = self.metrics
+            # LSODA reports NumPy integers.
+            metrics.nfev, metrics.njev, metrics.nlu = int(self.nfev), int(self.njev), int(self.nlu)
+            metrics.status = self.status
+            for calls, seconds, totals in self._timers:
+                n, elapsed = totals()
+                if calls is not None:
+                    setattr(metrics, calls, n)
+                setattr(metrics, seconds, elapsed)
+
+        def step(self):
+            proposed = getattr(self, "h_abs", None)
+            if proposed is not None:
+                proposed = min(proposed, self.max_step, abs(self.t_bound - self.t))
+            message = super().step()
+            metrics = self.metrics
+            if self.status != "failed":
+                h = abs(self.t - self.t_old)
+                metrics.accepted_steps += 1
+                if proposed is not None and h < proposed*(1 - 1e-10):
+                    metrics.rejected_steps += 1
+                if metrics.accepted_steps % every == 0:
+                    metrics.t.append(float(self.t))
+                    metrics.h.append(float(h))
+            self._update()
+            metrics.wall_seconds = time.perf_counter() - self._start
+            return message
+
+    Instrumented.__name__ = Instrumented.__qualname__ = "Instrumented" + base.__name__
+    return Instrumented
+
+
+class SolverProfiler:
+    """Collector of :class:`SolveMetrics` for solve_ivp solves.
+
+    Parameters
+    ----------
+    sample_every : int, optional
+        Time only every n-th RHS, Jacobian and LU call and keep only every
+        n-th step in the history; counts are always exact.
+    seed : int, optional
+        Seed of the random phases of the sampling.
+
+    Attributes
+    ----------
+    records : list of SolveMetrics
+        One entry per solve, in order.
+    """
+
+    def __init__(self, sample_every=1, seed=None):
+        self.sample_every = int(sample_every)
+        self._random = random.Random(seed)
+        self.records = []
+        self._classes = {}
+
+    def __repr__(self):
+        return "SolverProfiler(%d solves, sample_every=%d)" % (len(self.records), self.sample_every)
+
+    def method(self, name):
+        """Instrumented solver class for ``name`` ("RK45", "Radau", ...) to pass as solve_ivp's ``method``."""
+        if name not in self._classes:
+            self._classes[name] = _instrument({**METHODS, "LSODA": LSODA}[name], self)
+        return self._classes[name]
+
+    def solve_ivp(self, fun, t_span, y0, method="Radau", label=None, **options):
+        """solve_ivp with an instrumented solver.
+
+        Takes the arguments of solve_ivp plus a ``label`` for the record.
+        The returned solution carries its record as ``sol.metrics``.
+        """
+        sol = solve_ivp(fun, t_span, y0, method=self.method(method), **options)
+        metrics = self.records[-1]
+        metrics.label = label
+        metrics.status = "finished" if sol.status == 0 else "terminated" if sol.status == 1 else "failed"
+        sol.metrics = metrics
+        return sol
+
+    def clear(self):
+        """Drop all records."""
+        self.records.clear()
+
+    def summary(self):
+        """Totals over all records, grouped by ``(method, label)``."""
+        groups = {}
+        for metrics in self.records:
+            group = groups.setdefault((metrics.method, metrics.label), {"solves": 0})
+            group["solves"] += 1
+            for name in _TOTALS:
+                group[name] = group.get(name, 0) + getattr(metrics, name)
+        return groups
+
+    def to_json(self, path=None, history=True):
+        """Records as a JSON document, written to ``path`` if given.
+
+        Returns
+        -------
+        str
+        """
+        text = json.dumps({"sample_every": self.sample_every,
+                           "solves": [metrics.as_dict(history) for metrics in self.records]}, indent=1)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def to_prometheus(self, prefix="chemical_kinetics_solver"):
+        """Totals per ``(method, label)`` in the Prometheus text exposition format.
+
+        Counters for solves, RHS calls and time, Jacobian evaluations, LU
+        factorizations and time, and accepted/rejected steps, plus a histogram
+        of the recorded step sizes.
+        """
+        counters = [
+            ("solves", "solves", "Solves."),
+            ("rhs_calls", "rhs_calls", "Calls of the model function."),
+            ("rhs_seconds", "rhs_seconds", "Time spent in the model function."),
+            ("jacobian_evaluations", "njev", "Jacobian evaluations."),
+            ("jacobian_seconds", "jac_seconds", "Time spent updating the Jacobian."),
+            ("lu_decompositions", "nlu", "LU factorizations."),
+            ("lu_seconds", "lu_seconds", "Time spent in LU factorizations."),
+            ("lu_solve_seconds", "solve_lu_seconds", "Time spent solving with the LU factors."),
+            ("wall_seconds", "wall_seconds", "Wall time of the solves."),
+        ]
+        groups = self.summary()
+        lines = []
+
+        def labels(method, label, **extra):
+            pairs = [("method", method)] + ([("label", label)] if label is not None else []) + list(extra.items())
+            return "{%s}" % ",".join('%s="%s"' % (key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+                                     for key, value in pairs)
+
+        for name, field, help_text in counters:
+            lines += ["# HELP %s_%s_total %s" % (prefix, name, help_text), "# TYPE %s_%s_total counter" % (prefix, name)]
+            lines += ["%s_%s_total%s %s" % (prefix, name, labels(*key), group[field])
+                      for key, group in groups.items()]
+        lines += ["# HELP %s_steps_total Integration steps by outcome." % prefix, "# TYPE %s_steps_total counter" % prefix]
+        for key, group in groups.items():
+            lines.append("%s_steps_total%s %d" % (prefix, labels(*key, outcome="accepted"), group["accepted_steps"]))
+            lines.append("%s_steps_total%s %d" % (prefix, labels(*key, outcome="rejected"), group["rejected_steps"]))
+
+        lines += ["# HELP %s_step_size Sizes of the recorded steps." % prefix, "# TYPE %s_step_size histogram" % prefix]
+        for key in groups:
+            h = np.concatenate([metrics.h for metrics in self.records if (metrics.method, metrics.label) == key] + [[]])
+            counts = np.searchsorted(np.sort(h), STEP_BUCKETS, side="right")
+            for edge, count in zip(STEP_BUCKETS, counts):
+                lines.append("%s_step_size_bucket%s %d" % (prefix, labels(*key, le="%g" % edge), count))
+            lines.append("%s_step_size_bucket%s %d" % (prefix, labels(*key, le="+Inf"), h.size))
+            lines.append("%s_step_size_sum%s %s" % (prefix, labels(*key), float(h.sum())))
+            lines.append("%s_step_size_count%s %d" % (prefix, labels(*key), h.size))
+        return "\n".join(lines) + "\n"
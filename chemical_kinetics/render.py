@@ -0,0 +1,287 @@
+"""Headless rendering of sweep results to image files.
+
+The figures of :mod:`chemical_kinetics.plotting` are built through pyplot for
+interactive display, with every artist created from scratch. For automated
+output of hundreds of cases this module renders on the Agg canvas directly
+(``matplotlib.figure.Figure``, no pyplot and no GUI backend) and reuses
+figure templates: a template lays out its axes, labels, grid and legend once,
+and each case only replaces the data of the existing lines before saving.
+
+Dense trajectories are decimated before plotting with a min-max scheme that
+keeps the extremes of every series in every bucket, so peaks such as the
+intermediate maximum survive. :func:`render_cases` distributes the cases over
+worker processes in chunks; each worker builds its template once and reuses it
+for all cases it renders, keeping a few templates between calls. With a single
+worker the template is built for the call and released at its end.
+"""
+
+import math
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from chemical_kinetics.plotting import SPECIES_STYLES, _grid, _plot_species, _style
+
+
+def decimate(t, C, max_points=2000):
+    """Reduce a trajectory to at most about ``max_points`` times for plotting.
+
+    The times are split into buckets and, in every bucket, the indices of the
+    minimum and maximum of each series are kept, together with the end points.
+
+    Parameters
+    ----------
+    t : array_like, shape (n_times,)
+    C : array_like, shape (..., n_times)
+        Series sharing the time axis, e.g. (n_species, n_times) or
+        (N_cases, n_species, n_times).
+    max_points : int, optional
+        Upper bound on the number of times kept.
+
+    Returns
+    -------
+    t, C
+        The selected times and the series at those times.
+    """
+    t = np.asarray(t)
+    C = np.asarray(C)
+    series = C.reshape(-1, t.size)
+    n_buckets = max_points//(2*series.shape[0])
+    if t.size <= max_points or n_buckets < 1:
+        return t, C
+    width = t.size//n_buckets
+    blocks = series[:, :n_buckets*width].reshape(series.shape[0], n_buckets, width)
+    offsets = width*np.arange(n_buckets)
+    keep = np.unique(np.concatenate([[0, t.size - 1], (blocks.argmin(axis=2) + offsets).ravel(),
+                                     (blocks.argmax(axis=2) + offsets).ravel()]))
+    return t[keep], C[..., keep]
+
+
+def _figure(figsize, dpi):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    _style()
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _set_lines(lines, t, C, labels, legend_texts):
+    for line, conc, label, text in zip(lines, C, labels, legend_texts):
+        line.set_data(t, conc)
+        line.set_label(label)
+        text.set_text(label)
+
+
+def _species_labels(suffix):
+    return [name + suffix for name, _ in SPECIES_STYLES]
+
+
+class ComparisonTemplate:
+    """Reusable single-axes figure of a case (solid) against a reference (dashed).
+
+    The layout is the one of :func:`chemical_kinetics.plotting.plot_comparison`.
+    """
+
+    def __init__(self, figsize=(9, 6), dpi=100):
+        self.figure = _figure(figsize, dpi)
+        ax = self.ax = self.figure.add_subplot()
+        empty = np.zeros((3, 0))
+        self.case_lines = _plot_species(ax, [], empty, "-")
+        self.base_lines = _plot_species(ax, [], empty, "--")
+        ax.set_xlabel("Time [s]")
+        ax.set_ylabel("Concentration [mol/L]")
+        self.title = ax.set_title("", fontsize=15)
+        _grid(ax)
+        self.legend = ax.legend(loc="upper right", shadow=True, fontsize=12)
+
+    def update(self, t, C_case, C_base=None, case_label="", base_label="", title=""):
+        """Replace the data, labels and title of the figure."""
+        texts = self.legend.get_texts()
+        _set_lines(self.case_lines, t, C_case, _species_labels("| " + case_label), texts[:3])
+        base = C_base is not None
+        for line in self.base_lines:
+            line.set_visible(base)
+        if base:
+            _set_lines(self.base_lines, t, C_base, _species_labels("| " + base_label), texts[3:])
+        for handle, text in zip(self.legend.legend_handles[3:], texts[3:]):
+            handle.set_visible(base)
+            text.set_visible(base)
+        self.title.set_text(title)
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
+
+    def save(self, path, **options):
+        """Write the figure to ``path``; the format follows the extension."""
+        self.figure.savefig(path, **options)
+
+
+class GridTemplate:
+    """Reusable 2x2 grid of four cases against a common base case.
+
+    The layout is the one of :func:`chemical_kinetics.plotting.plot_k2_sweep`.
+    """
+
+    def __init__(self, figsize=(20, 15), dpi=150, suptitle_fontsize=35):
+        self.figure = _figure(figsize, dpi)
+        self.suptitle = self.figure.suptitle("", fontsize=suptitle_fontsize, y=0.95)
+        self.axes = self.figure.subplots(nrows=2, ncols=2).flat
+        empty = np.zeros((3, 0))
+        self.panels = []
+        for ax in self.axes:
+            base_lines = _plot_species(ax, [], empty, "-")
+            case_lines = _plot_species(ax, [], empty, "--")
+            ax.set_xlabel("Time [s]", fontsize=20)
+            ax.set_ylabel("Concentration [mol/L]", fontsize=20)
+            title = ax.set_title("", fontsize=20)
+            _grid(ax)
+            legend = ax.legend(loc="upper right", shadow=True, fontsize=14)
+            self.panels.append((ax, base_lines, case_lines, title, legend))
+
+    def update(self, t, C_base, C_cases, base_label, case_labels, suptitle=""):
+        """Replace the data of the panels; panels without a case are hidden."""
+        self.suptitle.set_text(suptitle)
+        for i, (ax, base_lines, case_lines, title, legend) in enumerate(self.panels):
+            ax.set_visible(i < len(C_cases))
+            if i >= len(C_cases):
+                continue
+            texts = legend.get_texts()
+            _set_lines(base_lines, t, C_base, _species_labels("| " + base_label), texts[:3])
+            _set_lines(case_lines, t, C_cases[i], _species_labels("| " + case_labels[i]), texts[3:])
+            title.set_text(case_labels[i] + " [1/s]")
+            ax.relim()
+            ax.autoscale_view()
+
+    def save(self, path, **options):
+        """Write the figure to ``path``; the format follows the extension."""
+        self.figure.savefig(path, **options)
+
+
+TEMPLATES = {"comparison": ComparisonTemplate, "grid": GridTemplate}
+
+# Templates of a worker process, built on first use; the least recently used
+# is dropped beyond _MAX_TEMPLATES.
+_MAX_TEMPLATES = 4
+_templates = OrderedDict()
+
+
+def _worker_template(template, template_options):
+    key = (template, tuple(sorted(template_options.items())))
+    if key not in _templates:
+        _templates[key] = TEMPLATES[template](**template_options)
+        while len(_templates) > _MAX_TEMPLATES:
+            _templates.popitem(last=False)[1].figure.clear()
+    _templates.move_to_end(key)
+    return _templates[key]
+
+
+def _render_chunk(template, template_options, jobs, save_options, figure=None):
+    if figure is None:
+        figure = _worker_template(template, template_options)
+    for path, data in jobs:
+        figure.update(**data)
+        figure.save(path, **save_options)
+    return len(jobs)
+
+
+def render_cases(t, C_cases, directory, C_base=None, labels=None, base_label="", title="", template="comparison",
+                 fmt="png", max_points=2000, max_workers=None, chunk_size=None, progress=None,
+                 template_options=None, **save_options):
+    """Render every case of a sweep to an image file.
+
+    Parameters
+    ----------
+    t : array_like, shape (n_times,)
+        Times shared by all cases.
+    C_cases : array_like, shape (N_cases, n_species, n_times)
+        Trajectories, e.g. the result of :func:`chemical_kinetics.sweep.run_sweep`.
+    directory : str
+        Output directory; created if missing.
+    C_base : array_like, shape (n_species, n_times), optional
+        Reference trajectory drawn in every figure (required for ``"grid"``).
+    labels : sequence of str, optional
+        Label of every case; ``"case <i>"`` by default.
+    base_label, title : str, optional
+        Label of the reference and title of every figure.
+    template : {"comparison", "grid"}, optional
+        One case per figure, or four cases per 2x2 grid page.
+    fmt : str, optional
+        File format, e.g. ``"png"`` or ``"svg"``.
+    max_points : int, optional
+        The trajectories of every figure are decimated to at most this many
+        times (see :func:`decimate`) before they are sent to the workers.
+    max_workers : int, optional
+        Number of worker processes; defaults to the number of CPUs. With a
+        single worker the figures are rendered in the calling process.
+    chunk_size : int, optional
+        Figures per task; about four tasks per worker by default.
+    progress : callable, optional
+        Called as ``progress(n_done, n_figures)`` after every finished chunk.
+    template_options : dict, optional
+        Keyword arguments of the template, e.g. ``{"dpi": 100}``.
+    **save_options
+        Further keyword arguments for ``Figure.savefig``.
+
+    Returns
+    -------
+    list of str
+        Paths of the written files, in case order.
+    """
+    if template not in TEMPLATES:
+        raise ValueError("template must be one of %s, got %r." % (", ".join(TEMPLATES), template))
+    if template == "grid" and C_base is None:
+        raise ValueError("render_cases(template=\"grid\") needs the reference trajectory C_base.")
+    C_cases = np.asarray(C_cases)
+    n_cases = C_cases.shape[0]
+    labels = list(labels) if labels is not None else ["case %d" % i for i in range(n_cases)]
+    C_base = None if C_base is None else np.asarray(C_base)
+    os.makedirs(directory, exist_ok=True)
+
+    # Each figure is decimated on its own, in this process, so that only the
+    # points actually drawn are sent to the workers.
+    jobs = []
+    if template == "grid":
+        for page, start in enumerate(range(0, n_cases, 4)):
+            t_page, C_page = decimate(t, np.concatenate([C_cases[start:start + 4], C_base[None]]), max_points)
+            jobs.append((os.path.join(directory, "page_%04d.%s" % (page, fmt)),
+                         dict(t=t_page, C_base=C_page[-1], C_cases=C_page[:-1], base_label=base_label,
+                              case_labels=labels[start:start + 4], suptitle=title)))
+    else:
+        for i in range(n_cases):
+            if C_base is None:
+                t_case, C_case = decimate(t, C_cases[i], max_points)
+                C_ref = None
+            else:
+                t_case, C_pair = decimate(t, np.stack([C_cases[i], C_base]), max_points)
+                C_case, C_ref = C_pair
+            jobs.append((os.path.join(directory, "case_%04d.%s" % (i, fmt)),
+                         dict(t=t_case, C_case=C_case, C_base=C_ref, case_label=labels[i],
+                              base_label=base_label, title=title)))
+
+    template_options = template_options or {}
+    max_workers = max_workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, math.ceil(len(jobs)/(4*max_workers)))
+    chunks = [jobs[start:start + chunk_size] for start in range(0, len(jobs), chunk_size)]
+    done = 0
+    if max_workers == 1:
+        # Rendered with a template of this call, released when it finishes.
+        figure = TEMPLATES[template](**template_options)
+        try:
+            for chunk in chunks:
+                done += _render_chunk(template, template_options, chunk, save_options, figure)
+                if progress is not None:
+                    progress(done, len(jobs))
+        finally:
+            figure.figure.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_render_chunk, template, template_options, chunk, save_options)
+                       for chunk in chunks]
+            for future in as_completed(futures):
+                done += future.result()
+                if progress is not None:
+                    progress(done, len(jobs))
+    return [path for path, _ in jobs]
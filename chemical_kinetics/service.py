@@ -0,0 +1,436 @@
+"""Asynchronous simulation service over local HTTP or a Unix socket.
+
+Internal tools send JSON requests instead of running the example scripts:
+
+- ``{"model": "full" | "qssa" | "rea", "k": [...], "c_ini": [...],
+  "t_eval": [...]}`` integrates one of the models of
+  :mod:`chemical_kinetics.models` (``t_span`` defaults to ``[0, t_eval[-1]]``;
+  the REA initial state is projected with
+  :func:`~chemical_kinetics.models.rea_initial_conditions`) and answers
+  ``{"t": [...], "y": [[...], ...]}``;
+- ``{"effectiveness": "slab" | "cylinder" | "sphere", "thiele": [...]}``
+  answers ``{"eta": [...]}``.
+
+:class:`SimulationService` queues the requests in a bounded asyncio queue. A
+dispatcher takes a request, collects whatever else arrives within
+``batch_window`` seconds (up to ``max_batch`` requests), and groups them:
+model requests that differ only in the values of their rate constants become
+one :func:`chemical_kinetics.batch.solve_batch` call with one case per
+distinct ``k``, effectiveness requests of one shape one kernel call, and
+identical requests share a single case. Each group runs in a process pool, with at most
+``max_workers`` groups in flight; while they are busy the dispatcher stops
+taking requests, the queue fills up and :meth:`SimulationService.submit`
+waits, which holds back the clients (backpressure).
+
+Every request records its latency and the time it waited in the queue, and
+the queue depth is sampled at every arrival; :meth:`SimulationService.metrics`
+summarizes them. :func:`serve` exposes the service with ``POST /solve``,
+``GET /metrics`` and ``GET /health``. :class:`HTTPClient` talks to it, and
+:class:`LocalClient` is an in-process stand-in with the same interface for
+tests.
+"""
+
+import asyncio
+import collections
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from chemical_kinetics.batch import solve_batch
+from chemical_kinetics.models import (
+    rea_initial_conditions,
+    series_reactions_batch,
+    series_reactions_batch_jac,
+    series_reactions_batch_QSSA,
+    series_reactions_batch_QSSA_jac,
+    series_reactions_batch_REA,
+    series_reactions_batch_REA_jac,
+)
+from chemical_kinetics.tables import KERNELS
+
+MODELS = {
+    "full": (series_reactions_batch, series_reactions_batch_jac),
+    "qssa": (series_reactions_batch_QSSA, series_reactions_batch_QSSA_jac),
+    "rea": (series_reactions_batch_REA, series_reactions_batch_REA_jac),
+}
+# Accepted numbers of rate constants of every model.
+N_PARAMS = {"full": (2, 4), "qssa": (2,), "rea": (3,)}
+
+
+def _floats(request, name):
+    try:
+        values = [float(v) for v in np.ravel(request[name])]
+    except KeyError:
+        raise ValueError("missing field %r" % name) from None
+    except (TypeError, ValueError):
+        raise ValueError("field %r must be a list of numbers" % name) from None
+    if not values or not np.all(np.isfinite(values)):
+        raise ValueError("field %r must be a non-empty list of finite numbers" % name)
+    return tuple(values)
+
+
+def _parse(request):
+    # (group key, case key) of a request. Requests with the same group key
+    # are solved in one call; the case key identifies the case within it.
+    if not isinstance(request, dict):
+        raise ValueError("a request must be a JSON object")
+    if "effectiveness" in request:
+        shape = request["effectiveness"]
+        if shape not in KERNELS:
+            raise ValueError("unknown shape %r" % (shape,))
+        return ("effectiveness", shape), _floats(request, "thiele")
+    model = request.get("model")
+    if model not in MODELS:
+        raise ValueError("unknown model %r; expected one of %s" % (model, ", ".join(sorted(MODELS))))
+    t_eval = _floats(request, "t_eval")
+    t_span = _floats(request, "t_span") if "t_span" in request else (0.0, t_eval[-1])
+    c_ini = _floats(request, "c_ini")
+    if len(c_ini) != 3:
+        raise ValueError("c_ini must hold the three concentrations CA, CB, CC")
+    k = _floats(request, "k")
+    if len(k) not in N_PARAMS[model]:
+        raise ValueError("model %r takes %s rate constants, got %d"
+                         % (model, " or ".join(map(str, N_PARAMS[model])), len(k)))
+    return ("model", model, len(k), c_ini, t_span, t_eval, request.get("method", "Radau")), k
+
+
+def _run_group(group, cases):
+    # Runs in a worker process: one vectorized evaluation for all cases.
+    if group[0] == "effectiveness":
+        sizes = [len(thiele) for thiele in cases]
+        eta = KERNELS[group[1]](np.concatenate([np.array(thiele) for thiele in cases]))
+        return [{"eta": part.tolist()} for part in np.split(eta, np.cumsum(sizes)[:-1])]
+    _, model, _, c_ini, t_span, t_eval, method = group
+    fun, jac = MODELS[model]
+    k_cases = np.array(cases)
+    c0 = np.asarray(c_ini)
+    if model == "rea":
+        c0 = np.stack(np.broadcast_arrays(*rea_initial_conditions(c0, k_cases[:, 2])), axis=1)
+    y = solve_batch(fun, t_span, c0, k_cases, t_eval=t_eval, method=method, jac=jac)
+    return [{"t": list(t_eval), "y": y_case.tolist()} for y_case in y]
+
+
+class SimulationService:
+    """Request queue with coalescing and a bounded process pool.
+
+    Use as ``async with SimulationService() as service`` or call
+    :meth:`start` and :meth:`close`.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        Worker processes, and groups in flight; defaults to the number of CPUs.
+    max_queue : int, optional
+        Capacity of the request queue; :meth:`submit` waits while it is full.
+    batch_window : float, optional
+        Seconds the dispatcher waits for further requests to coalesce.
+    max_batch : int, optional
+        Largest number of requests taken from the queue at once.
+    history : int, optional
+        Number of recent requests kept for the latency statistics.
+    """
+
+    def __init__(self, max_workers=None, max_queue=1024, batch_window=0.002, max_batch=256, history=10000):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._latency = collections.deque(maxlen=history)
+        self._waiting = collections.deque(maxlen=history)
+        self._depth = collections.deque(maxlen=history)
+        self._counts = collections.Counter()
+        self._max_depth = 0
+        self._queue = None
+        self._pool = None
+        self._dispatcher = None
+
+    def __repr__(self):
+        return "SimulationService(max_workers=%d, max_queue=%d)" % (self.max_workers, self.max_queue)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self):
+        self._queue = asyncio.Queue(self.max_queue)
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._pool = ProcessPoolExecutor(self.max_workers)
+        self._tasks = set()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def close(self):
+        self._dispatcher.cancel()
+        await asyncio.gather(self._dispatcher, *self._tasks, return_exceptions=True)
+        self._pool.shutdown(cancel_futures=True)
+
+    async def submit(self, request):
+        """Queue ``request`` and return its response.
+
+        Raises
+        ------
+        ValueError
+            If the request is malformed.
+        """
+        group, case = _parse(request)
+        future = asyncio.get_running_loop().create_future()
+        arrived = time.perf_counter()
+        await self._queue.put((group, case, future, arrived))
+        depth = self._queue.qsize()
+        self._depth.append(depth)
+        self._max_depth = max(self._max_depth, depth)
+        self._counts["requests"] += 1
+        try:
+            return await future
+        finally:
+            self._latency.append(time.perf_counter() - arrived)
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Take requests only when a worker is free, so that a busy pool
+            # leaves them in the bounded queue.
+            await self._slots.acquire()
+            items = [await self._queue.get()]
+            if self._queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.batch_window)
+            while len(items) < self.max_batch and not self._queue.empty():
+                items.append(self._queue.get_nowait())
+            now = time.perf_counter()
+            groups = collections.defaultdict(lambda: collections.defaultdict(list))
+            for group, case, future, arrived in items:
+                self._waiting.append(now - arrived)
+                groups[group][case].append(future)
+            self._counts["batches"] += 1
+            self._counts["coalesced"] += len(items) - sum(len(cases) for cases in groups.values())
+            groups = list(groups.items())
+            for i, (group, cases) in enumerate(groups):
+                if i > 0:
+                    await self._slots.acquire()
+                task = asyncio.create_task(self._run(loop, group, cases))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, loop, group, cases):
+        try:
+            results = await loop.run_in_executor(self._pool, _run_group, group, list(cases))
+        except Exception as error:
+            self._counts["errors"] += 1
+            for futures in cases.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(error)
+        else:
+            self._counts["solves"] += 1
+            for futures, result in zip(cases.values(), results):
+                for future in futures:
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def metrics(self):
+        """Counters, queue depth and latency percentiles [s] of recent requests."""
+        def summary(values):
+            if not values:
+                return {"mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+            values = np.array(values)
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            return {"mean": float(values.mean()), "p50": float(p50), "p95": float(p95), "p99": float(p99),
+                    "max": float(values.max())}
+
+        counts = {key: self._counts[key] for key in ("requests", "batches", "solves", "coalesced", "errors")}
+        return {**counts,
+                "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+                "max_queue_depth": self._max_depth,
+                "mean_queue_depth": float(np.mean(self._depth)) if self._depth else 0.0,
+                "in_flight": len(self._tasks),
+                "latency": summary(self._latency),
+                "queue_wait": summary(self._waiting)}
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+async def _read_request(reader):
+    # One HTTP/1.1 request: (method, path, headers, body), or None at EOF.
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return method, path, headers, body
+
+
+def _write_response(writer, status, payload):
+    body = json.dumps(payload).encode()
+    writer.write(b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                 % (status, _REASONS[status].encode(), len(body)) + body)
+
+
+async def _handle(service, reader, writer):
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except (ValueError, asyncio.IncompleteReadError):
+                _write_response(writer, 400, {"error": "malformed HTTP request"})
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            if path == "/solve" and method == "POST":
+                try:
+                    status, payload = 200, await service.submit(json.loads(body))
+                except ValueError as error:
+                    status, payload = 400, {"error": str(error)}
+                except Exception as error:
+                    status, payload = 500, {"error": "%s: %s" % (type(error).__name__, error)}
+            elif path == "/metrics" and method == "GET":
+                status, payload = 200, service.metrics()
+            elif path == "/health" and method == "GET":
+                status, payload = 200, {"status": "ok"}
+            elif path in ("/solve", "/metrics", "/health"):
+                status, payload = 405, {"error": "method not allowed"}
+            else:
+                status, payload = 404, {"error": "not found"}
+            _write_response(writer, status, payload)
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                break
+    finally:
+        writer.close()
+
+
+async def serve(service, host="127.0.0.1", port=8000, path=None):
+    """Start serving ``service`` over HTTP on ``host:port`` or the Unix socket ``path``.
+
+    Returns the ``asyncio.Server``; the caller keeps the event loop running,
+    e.g. ``await server.serve_forever()``.
+    """
+    handler = lambda reader, writer: _handle(service, reader, writer)
+    if path is not None:
+        return await asyncio.start_unix_server(handler, path)
+    return await asyncio.start_server(handler, host, port)
+
+
+class HTTPClient:
+    """Client of :func:`serve` over one keep-alive connection.
+
+    Parameters
+    ----------
+    host, port : optional
+        TCP address of the service.
+    path : str, optional
+        Unix socket of the service, used instead of ``host`` and ``port``.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8000, path=None):
+        self.host, self.port, self.path = host, port, path
+        self._reader = self._writer = None
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+    async def _request(self, method, target, payload=None):
+        async with self._lock:
+            if self._writer is None:
+                if self.path is not None:
+                    self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+                else:
+                    self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            body = b"" if payload is None else json.dumps(payload).encode()
+            self._writer.write(b"%s %s HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\n"
+                               b"Content-Length: %d\r\n\r\n" % (method.encode(), target.encode(),
+                                                                str(self.host).encode(), len(body)) + body)
+            await self._writer.drain()
+            status_line = await self._reader.readline()
+            status = int(status_line.split()[1])
+            length = 0
+            while True:
+                line = await self._reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            response = json.loads(await self._reader.readexactly(length))
+        if status == 400:
+            raise ValueError(response["error"])
+        if status != 200:
+            raise RuntimeError(response["error"])
+        return response
+
+    async def solve(self, request):
+        """Response to ``request``; raises ValueError for malformed ones."""
+        return await self._request("POST", "/solve", request)
+
+    async def metrics(self):
+        return await self._request("GET", "/metrics")
+
+
+class LocalClient:
+    """In-process stand-in for :class:`HTTPClient` that calls the service directly.
+
+    Responses go through a JSON round trip, so they are the ones an HTTP
+    client would receive.
+    """
+
+    def __init__(self, service):
+        self.service = service
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        pass
+
+    async def solve(self, request):
+        """Response to ``request``; raises ValueError for malformed ones."""
+        return json.loads(json.dumps(await self.service.submit(json.loads(json.dumps(request)))))
+
+    async def metrics(self):
+        return self.service.metrics()
+
+
+async def _main(args):
+    async with SimulationService(max_workers=args.workers, max_queue=args.queue) as service:
+        server = await serve(service, args.host, args.port, args.socket)
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the kinetic models over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--socket", help="Unix socket path, instead of host and port")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPUs)")
+    parser.add_argument("--queue", type=int, default=1024, help="request queue capacity")
+    asyncio.run(_main(parser.parse_args()))
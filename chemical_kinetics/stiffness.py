@@ -0,0 +1,178 @@
+"""Stiffness estimation and automatic solver selection.
+
+The cost of an explicit Runge-Kutta step is a handful of RHS calls, but its
+step size is bounded by stability to roughly 3/|λ_max|, with λ_max the fastest
+eigenvalue of the Jacobian. Over an interval Δt an explicit solver therefore
+needs at least |λ_max| Δt / 3 steps however smooth the solution is. Below
+``EXPLICIT_LIMIT`` that bound is irrelevant and RK45 (or DOP853 at tight
+tolerances) is cheapest; above it the implicit solvers win: Radau for small
+systems, BDF for large (sparse) ones.
+
+:func:`solve_auto` applies the selection along the trajectory: the time span
+is split into segments and the method is re-selected at the start of each
+segment from the current state, so a problem that becomes (non-)stiff after an
+initial transient switches solver. The solver classes are stepped directly, so
+a segment that keeps the method continues the running solver. Every choice is
+logged on the ``chemical_kinetics.stiffness`` logger and returned in
+``sol.methods``.
+"""
+
+import logging
+
+import numpy as np
+from scipy.integrate import BDF, DOP853, RK45, Radau, solve_ivp
+from scipy.optimize import OptimizeResult
+
+from chemical_kinetics.reduction import _jacobian
+
+logger = logging.getLogger(__name__)
+
+# |λ_max| Δt below which explicit solvers are used. Measured on the series
+# reactions, RK45 stays cheaper than a continuing Radau solve up to about 50.
+EXPLICIT_LIMIT = 50.0
+
+# Systems larger than this use BDF instead of Radau when stiff.
+RADAU_MAX_SPECIES = 50
+
+METHODS = {"RK45": RK45, "DOP853": DOP853, "Radau": Radau, "BDF": BDF}
+IMPLICIT = ("Radau", "BDF")
+IMPLICIT_ONLY_OPTIONS = ("jac_sparsity",)
+
+
+def stiffness(fun, t, c, k, dt, jac=None):
+    """Stiffness measures of ``fun`` at state ``c`` over an interval ``dt``.
+
+    Returns
+    -------
+    dict
+        ``fastest`` and ``slowest`` relaxation rates |Re λ| (zero modes of
+        conserved quantities excluded), their ``ratio`` and the stiffness
+        index ``fastest*dt``.
+    """
+    w = np.linalg.eigvals(_jacobian(fun, jac, t, c, k))
+    rates = np.abs(w.real)
+    rates = rates[rates > 1e-7*rates.max(initial=0.0)]
+    fastest = rates.max() if rates.size else 0.0
+    slowest = rates.min() if rates.size else 0.0
+    return {
+        "fastest": fastest,
+        "slowest": slowest,
+        "ratio": fastest/slowest if slowest > 0 else 1.0,
+        "index": fastest*abs(dt),
+    }
+
+
+def select_method(measures, n_species, rtol=1e-3):
+    """Choose a solve_ivp method from :func:`stiffness` measures.
+
+    Returns
+    -------
+    method : str
+    reason : str
+        Human-readable justification of the choice.
+    """
+    if measures["index"] < EXPLICIT_LIMIT:
+        method = "DOP853" if rtol < 1e-6 else "RK45"
+        return method, "non-stiff: |λ|max·Δt = %.3g < %g (stiffness ratio %.3g)" % (
+            measures["index"], EXPLICIT_LIMIT, measures["ratio"])
+    method = "Radau" if n_species <= RADAU_MAX_SPECIES else "BDF"
+    return method, "stiff: |λ|max·Δt = %.3g >= %g (stiffness ratio %.3g)" % (
+        measures["index"], EXPLICIT_LIMIT, measures["ratio"])
+
+
+def solve_auto(fun, t_span, c_ini, t_eval=None, jac=None, args=(), segments=4, **options):
+    """solve_ivp with the method selected (and switched) by stiffness.
+
+    The time span is split into ``segments`` equal parts. At the start of
+    each part the stiffness of the current state over that part is estimated
+    and the solver chosen with :func:`select_method`; the running solver is
+    only replaced when the choice changes, so an unchanged method continues
+    with its step size and Jacobian. With ``events`` or ``dense_output`` the
+    method is selected once at ``t0`` and the call forwarded to solve_ivp.
+    A backward span (``t_span[0] > t_span[-1]``) is integrated backward,
+    with ``t_eval`` then in decreasing order as for solve_ivp.
+
+    Returns
+    -------
+    OptimizeResult
+        With the fields of the solve_ivp result (``nfev``, ``njev`` and
+        ``nlu`` summed over the solvers used) plus ``methods``, a list of
+        ``(t_start, t_end, method, reason)`` tuples.
+    """
+    k = args[0] if args else None
+    model = fun if args else (lambda t, c, k: fun(t, c))
+    model_jac = (jac if args else (lambda t, c, k: jac(t, c))) if callable(jac) else None
+    t0, tf = float(t_span[0]), float(t_span[-1])
+    y = np.asarray(c_ini, dtype=float)
+    rtol = options.get("rtol", 1e-3)
+
+    if options.get("events") is not None or options.get("dense_output"):
+        method, reason = select_method(stiffness(model, t0, y, k, tf - t0, jac=model_jac), y.size, rtol=rtol)
+        logger.info("t = [%g, %g]: %s (%s)", t0, tf, method, reason)
+        implicit = {"jac": jac} if method in IMPLICIT else {}
+        sol = solve_ivp(fun, t_span, y, method=method, t_eval=t_eval, args=args, **implicit, **options)
+        sol.methods = [(t0, tf, method, reason)]
+        return sol
+
+    f = lambda t, c: fun(t, c, *args)
+    J = (lambda t, c: jac(t, c, *args)) if callable(jac) else jac
+    explicit_options = {key: value for key, value in options.items() if key not in IMPLICIT_ONLY_OPTIONS}
+    # Times are compared along the direction of integration.
+    direction = -1.0 if tf < t0 else 1.0
+    checkpoints = np.linspace(t0, tf, segments + 1)[1:]
+    t_eval = None if t_eval is None else np.asarray(t_eval, dtype=float)
+
+    t_out, y_out = [], []
+    if t_eval is None:
+        t_out.append([t0])
+        y_out.append(y[:, None])
+        next_eval = 0
+    else:
+        next_eval = np.searchsorted(direction*t_eval, direction*t0)
+    methods, stats, solver, t = [], {"nfev": 0, "njev": 0, "nlu": 0}, None, t0
+    while direction*(tf - t) > 0:
+        b = checkpoints[np.searchsorted(direction*checkpoints, direction*t, side="right")]
+        method, reason = select_method(stiffness(model, t, y, k, b - t, jac=model_jac), y.size, rtol=rtol)
+        if solver is None or method != methods[-1][2]:
+            logger.info("t = %g: %s (%s)", t, method, reason)
+            if solver is not None:
+                _add_stats(stats, solver)
+            if method in IMPLICIT:
+                solver = METHODS[method](f, t, y, tf, jac=J, **options)
+            else:
+                solver = METHODS[method](f, t, y, tf, **explicit_options)
+            methods.append([t, t, method, reason])
+
+        while solver.status == "running" and direction*(b - solver.t) > 0:
+            t_old = solver.t
+            solver.step()
+            if solver.status == "failed":
+                _add_stats(stats, solver)
+                methods[-1][1] = solver.t
+                return OptimizeResult(t=np.concatenate(t_out), y=np.hstack(y_out), sol=None,
+                                      t_events=None, y_events=None, status=-1,
+                                      message="%s failed at t = %g." % (method, solver.t),
+                                      success=False, methods=[tuple(m) for m in methods], **stats)
+            if t_eval is None:
+                t_out.append([solver.t])
+                y_out.append(solver.y[:, None].copy())
+            else:
+                stop = np.searchsorted(direction*t_eval, direction*solver.t, side="right")
+                if stop > next_eval and solver.t != t_old:
+                    t_out.append(t_eval[next_eval:stop])
+                    y_out.append(solver.dense_output()(t_eval[next_eval:stop]))
+                    next_eval = stop
+        t, y = solver.t, solver.y
+        methods[-1][1] = t
+
+    _add_stats(stats, solver)
+    return OptimizeResult(t=np.concatenate(t_out), y=np.hstack(y_out), sol=None, t_events=None,
+                          y_events=None, status=0,
+                          message="The solver successfully reached the end of the integration interval.",
+                          success=True, methods=[tuple(m) for m in methods], **stats)
+
+
+def _add_stats(stats, solver):
+    stats["nfev"] += solver.nfev
+    stats["njev"] += solver.njev
+    stats["nlu"] += solver.nlu
@@ -0,0 +1,246 @@
+"""Streaming of long trajectories to chunked on-disk storage.
+
+:func:`solve_stream` steps a solve_ivp solver class (``Radau`` and friends)
+directly and never holds more than one chunk of the trajectory in memory: the
+points are appended to a buffer of ``chunk_size`` points that is written out
+as a compressed ``chunk_<i>.npz`` file whenever it fills up, so memory use is
+independent of the length of the run.
+
+A store is a directory of chunk files plus a ``trajectory.json`` manifest
+with the number of points written and the run status. Every file is written
+to a temporary name and moved into place, and the manifest is updated after
+the chunks it refers to, so a :class:`TrajectoryStore` opened by another
+process always reads a consistent prefix of a run in progress. The partially
+filled chunk is also written every ``flush_interval`` seconds, so readers
+see recent points without waiting for a chunk to fill.
+
+HDF5 or Zarr would serve as well; the directory of ``.npz`` chunks keeps the
+same layout with NumPy only.
+"""
+
+import glob
+import json
+import os
+import time
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from chemical_kinetics.stiffness import IMPLICIT, IMPLICIT_ONLY_OPTIONS, METHODS, logger, select_method, stiffness
+
+_MANIFEST = "trajectory.json"
+
+
+def _write_atomic(path, write):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+class TrajectoryStore:
+    """Reader of a trajectory written by :func:`solve_stream`.
+
+    The store can be opened while the run is in progress; :meth:`refresh`
+    picks up the points written since.
+
+    Attributes
+    ----------
+    n_points : int
+        Number of points available to readers.
+    status : str
+        ``"running"``, ``"finished"`` or ``"failed"``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.refresh()
+
+    def __repr__(self):
+        return "TrajectoryStore(%r, %d points, %s)" % (self.path, self.n_points, self.status)
+
+    def __len__(self):
+        return self.n_points
+
+    def refresh(self):
+        """Re-read the manifest."""
+        with open(os.path.join(self.path, _MANIFEST)) as f:
+            manifest = json.load(f)
+        self.n_species = manifest["n_species"]
+        self.chunk_size = manifest["chunk_size"]
+        self.n_points = manifest["n_points"]
+        self.status = manifest["status"]
+        self.message = manifest["message"]
+        self.method = manifest["method"]
+        return self
+
+    def chunks(self, start=0, stop=None):
+        """Iterate over ``(t, y)`` blocks of points ``start:stop``, one chunk at a time."""
+        stop = self.n_points if stop is None else min(stop, self.n_points)
+        for i in range(start//self.chunk_size, -(-stop//self.chunk_size)):
+            with np.load(os.path.join(self.path, "chunk_%05d.npz" % i)) as data:
+                t, y = data["t"], data["y"]
+            # A chunk may hold more points than the manifest counted when it
+            # was rewritten after the manifest was read.
+            first = i*self.chunk_size
+            lo, hi = max(start - first, 0), min(stop - first, t.size)
+            yield t[lo:hi], y[:, lo:hi]
+
+    def read(self, start=0, stop=None):
+        """Points ``start:stop`` as ``(t, y)`` with ``y`` of shape (n_species, n)."""
+        blocks = list(self.chunks(start, stop))
+        if not blocks:
+            return np.empty(0), np.empty((self.n_species, 0))
+        return np.concatenate([t for t, _ in blocks]), np.hstack([y for _, y in blocks])
+
+
+class _ChunkWriter:
+
+    def __init__(self, path, n_species, chunk_size, method, compress, flush_interval):
+        self.path = path
+        self.n_species = n_species
+        self.chunk_size = chunk_size
+        self.method = method
+        self.save = np.savez_compressed if compress else np.savez
+        self.flush_interval = flush_interval
+        self.t = np.empty(chunk_size)
+        self.y = np.empty((n_species, chunk_size))
+        self.filled = 0
+        self.chunk = 0
+        self.last_flush = time.monotonic()
+        os.makedirs(path, exist_ok=True)
+        # Reset the manifest before removing the chunks of a previous run, so
+        # readers never count points from files that are gone or stale.
+        self._manifest("running", "")
+        for old in glob.glob(os.path.join(path, "chunk_*.npz")):
+            os.remove(old)
+
+    def append(self, t, y):
+        t = np.atleast_1d(t)
+        y = y.reshape(self.n_species, -1)
+        done = 0
+        while done < t.size:
+            n = min(t.size - done, self.chunk_size - self.filled)
+            self.t[self.filled:self.filled + n] = t[done:done + n]
+            self.y[:, self.filled:self.filled + n] = y[:, done:done + n]
+            self.filled += n
+            done += n
+            if self.filled == self.chunk_size:
+                self.flush()
+                self.chunk += 1
+                self.filled = 0
+        if self.filled and time.monotonic() - self.last_flush > self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        t, y = self.t[:self.filled], self.y[:, :self.filled]
+        _write_atomic(os.path.join(self.path, "chunk_%05d.npz" % self.chunk), lambda f: self.save(f, t=t, y=y))
+        self._manifest("running", "")
+        self.last_flush = time.monotonic()
+
+    def close(self, status, message):
+        if self.filled:
+            self.flush()
+        self._manifest(status, message)
+
+    @property
+    def n_points(self):
+        return self.chunk*self.chunk_size + self.filled
+
+    def _manifest(self, status, message):
+        manifest = {"n_species": self.n_species, "chunk_size": self.chunk_size, "n_points": self.n_points,
+                    "status": status, "message": message, "method": self.method}
+        _write_atomic(os.path.join(self.path, _MANIFEST), lambda f: f.write(json.dumps(manifest).encode()))
+
+
+def solve_stream(fun, t_span, c_ini, path, t_eval=None, method="Radau", jac=None, args=(), chunk_size=4096,
+                 compress=True, flush_interval=5.0, **options):
+    """Integrate ``fun`` step by step, streaming the trajectory to ``path``.
+
+    Parameters
+    ----------
+    fun : callable
+        Right-hand side ``fun(t, y, *args)`` as for solve_ivp.
+    t_span : sequence of float
+        Integration interval ``[t0, tf]``.
+    c_ini : array_like, shape (n_species,)
+        Initial concentrations.
+    path : str
+        Directory of the store; an existing store there is overwritten.
+    t_eval : array_like, optional
+        Times at which the solution is stored, interpolated with the dense
+        output of each step, sorted in the direction of integration (in
+        decreasing order for a backward span, as for solve_ivp). The solver
+        steps are stored if None.
+    method : str, optional
+        ``"RK45"``, ``"DOP853"``, ``"Radau"``, ``"BDF"``, or ``"auto"`` to
+        select it from the stiffness at ``t0`` (see
+        :mod:`chemical_kinetics.stiffness`).
+    jac : callable, optional
+        Jacobian ``jac(t, y, *args)`` for the implicit methods.
+    chunk_size : int, optional
+        Number of points per chunk file.
+    compress : bool, optional
+        Write compressed chunks.
+    flush_interval : float, optional
+        Seconds after which a partially filled chunk is written out.
+    **options
+        Further keyword arguments for the solver class (rtol, atol, ...).
+
+    Returns
+    -------
+    OptimizeResult
+        With ``store`` (a :class:`TrajectoryStore` of the run), ``nfev``,
+        ``njev``, ``nlu``, ``status``, ``message`` and ``success``; the
+        trajectory itself is only on disk.
+    """
+    t0, tf = float(t_span[0]), float(t_span[-1])
+    y0 = np.asarray(c_ini, dtype=float)
+    t_eval = None if t_eval is None else np.asarray(t_eval, dtype=float)
+    if t_eval is not None and (np.any(t_eval < min(t0, tf)) or np.any(t_eval > max(t0, tf))):
+        raise ValueError("Values in `t_eval` are not within `t_span`.")
+    f = lambda t, y: fun(t, y, *args)
+    J = (lambda t, y: jac(t, y, *args)) if callable(jac) else jac
+
+    if method == "auto":
+        model = fun if args else (lambda t, c, k: fun(t, c))
+        model_jac = (jac if args else (lambda t, c, k: jac(t, c))) if callable(jac) else None
+        measures = stiffness(model, t0, y0, args[0] if args else None, tf - t0, jac=model_jac)
+        method, reason = select_method(measures, y0.size, rtol=options.get("rtol", 1e-3))
+        logger.info("solve_stream: %s (%s)", method, reason)
+    if method in IMPLICIT:
+        solver = METHODS[method](f, t0, y0, tf, jac=J, **options)
+    else:
+        solver = METHODS[method](f, t0, y0, tf,
+                                 **{key: value for key, value in options.items() if key not in IMPLICIT_ONLY_OPTIONS})
+
+    writer = _ChunkWriter(path, y0.size, chunk_size, method, compress, flush_interval)
+    # Times are compared along the direction of integration.
+    direction = -1.0 if tf < t0 else 1.0
+    if t_eval is None:
+        writer.append(t0, y0)
+        next_eval = 0
+    else:
+        next_eval = np.searchsorted(direction*t_eval, direction*t0)
+        if next_eval < t_eval.size and t_eval[next_eval] == t0:
+            writer.append(t0, y0)
+            next_eval += 1
+
+    while solver.status == "running":
+        solver.step()
+        if solver.status == "failed":
+            break
+        if t_eval is None:
+            writer.append(solver.t, solver.y)
+        else:
+            stop = np.searchsorted(direction*t_eval, direction*solver.t, side="right")
+            if stop > next_eval:
+                writer.append(t_eval[next_eval:stop], solver.dense_output()(t_eval[next_eval:stop]))
+                next_eval = stop
+
+    success = solver.status == "finished"
+    message = ("The solver successfully reached the end of the integration interval." if success
+               else "%s failed at t = %g." % (method, solver.t))
+    writer.close("finished" if success else "failed", message)
+    return OptimizeResult(store=TrajectoryStore(path), nfev=solver.nfev, njev=solver.njev, nlu=solver.nlu,
+                          status=0 if success else -1, message=message, success=success)
@@ -0,0 +1,443 @@
+"""Trained surrogate of a kinetic model with an error estimate and exact fallback.
+
+A :class:`Surrogate` replaces the integration of ``fun(t, c_ini, k)`` on a
+fixed output grid by a feature evaluation and two small matrix products. It is
+trained on trajectories of (k, c_ini) sampled from a box with a scrambled
+Sobol sequence and solved with :func:`chemical_kinetics.batch.solve_batch`:
+
+- proper orthogonal decomposition (POD): the trajectories, flattened over
+  species and times, are centred and their leading right singular vectors
+  kept as modes, enough to hold all but ``1 - energy`` of the variance;
+- regression of the POD coefficients on the parameters, scaled to the unit
+  cube (rate constants on a log scale): ``"rbf"`` interpolates them with
+  cubic radial basis functions centred at the training samples plus a
+  linear polynomial, ``"pce"`` fits a polynomial chaos, the total-degree
+  Legendre polynomials, by least squares. Both evaluate as a feature vector
+  of the parameters times a coefficient matrix. The RBF is the more accurate
+  for a given number of samples (the trajectories of stiff cases change
+  sharply with log k2); the polynomial chaos is cheaper to query once the
+  samples outnumber its basis functions.
+
+The error estimate comes from a committee of ``n_folds`` fits, each leaving
+out one fold of the training samples: their spread around the committee mean
+(in coefficient space, where the norm equals that of the trajectories) is
+scaled by a factor calibrated on a validation split that no fit has seen, as
+the 95th percentile of true error over spread. At query time every case whose
+estimate exceeds the tolerance, or which lies outside the training box, is
+integrated exactly instead.
+
+Accuracy and cost depend strongly on the dimension and on how sharply the
+trajectories change across the box. Measured on the series reactions with 110
+output times and the defaults:
+
+- irreversible, k1 in [1, 4] and k2 in [1, 1e4] (512 samples): median error
+  1e-5, 95th percentile 8e-4; about 20% of the cases fall back at
+  ``tol=1e-3``; a query costs about 55 µs alone and 10 µs per case in a
+  batch;
+- reversible, k1 in [0.5, 2], k_1 in [0.25, 1] and k2, k_2 in [1, 1e4]
+  (2048 samples): median error 6e-3, worst validation error 0.13, so every
+  case falls back at ``tol=1e-3``; a query costs about 130 µs alone and
+  30 µs per case. More samples improve this slowly (0.1 with 4096), and the
+  polynomial chaos is worse (about 1).
+
+A query is therefore cheaper than an integration by two to three orders of
+magnitude, but it is not a microsecond lookup, and in four or more
+dimensions over several decades the surrogate is only useful with a looser
+``tol`` or a narrower box. Check :attr:`Surrogate.validation_error` before
+relying on it.
+
+:func:`validation_report` draws the QSSA/REA comparison figures of the
+example scripts for the surrogate against the full solver, on the scripts'
+k2 sweeps.
+"""
+
+import itertools
+import os
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from chemical_kinetics.batch import solve_batch
+from chemical_kinetics.uncertainty import _unit_samples
+
+# Cases of the example scripts: irreversible (k1, k2) and reversible
+# (k1, k_1, k2, k_2) series with their initial concentrations.
+SCRIPT_CASES = {
+    2: ([[2, k2] for k2 in (1, 10, 100, 1000, 10000)], [1, 0, 0]),
+    4: ([[1, 0.5, k2, k2] for k2 in (1, 10, 100, 1000, 10000)], [2, 0.8, 0]),
+}
+
+
+def _exponents(n_dims, degree):
+    # Multi-indices of total degree <= degree, ordered by degree.
+    rows = [np.zeros(n_dims, dtype=int)]
+    for total in range(1, degree + 1):
+        for dims in itertools.combinations_with_replacement(range(n_dims), total):
+            rows.append(np.bincount(dims, minlength=n_dims))
+    return np.array(rows)
+
+
+def _legendre_basis(x, exponents):
+    # Basis matrix (N, n_terms) of the products of Legendre polynomials.
+    n_dims = x.shape[1]
+    P = np.ones((n_dims, exponents.max() + 1, x.shape[0]))
+    if P.shape[1] > 1:
+        P[:, 1] = x.T
+    for n in range(1, P.shape[1] - 1):
+        P[:, n + 1] = ((2*n + 1)*x.T*P[:, n] - n*P[:, n - 1])/(n + 1)
+    return np.prod(P[np.arange(n_dims), exponents], axis=1).T
+
+
+def _rbf_basis(U, centres, norms=None):
+    # Cubic radial basis functions at the centres and the linear tail [1, U].
+    # Distances in the unit cube by |u|² + |c|² - 2 u.c, one matrix product;
+    # ``norms`` are the precomputed |c|².
+    norms = (centres**2).sum(axis=1) if norms is None else norms
+    r2 = np.maximum((U**2).sum(axis=1)[:, None] + norms - 2*U @ centres.T, 0.0)
+    return np.hstack([r2*np.sqrt(r2), np.ones((U.shape[0], 1)), U])
+
+
+def _features(U, regression, basis, norms=None):
+    # Feature matrix (N, n_features) of points U of the unit cube.
+    if regression == "pce":
+        return _legendre_basis(2*U - 1, basis)
+    return _rbf_basis(U, basis, norms)
+
+
+def _fit_coefficients(regression, Phi, A, rows):
+    # Coefficients (n_features, n_modes) fitted to the training rows ``rows``
+    # of Phi, whose RBF columns are all training samples; the RBF centres
+    # outside ``rows`` get zero weight.
+    if regression == "pce":
+        return np.linalg.lstsq(Phi[rows], A[rows], rcond=None)[0]
+    n = Phi.shape[0]
+    tail = Phi.shape[1] - n
+    P = Phi[rows, n:]
+    system = np.block([[Phi[np.ix_(rows, rows)], P], [P.T, np.zeros((tail, tail))]])
+    solution = np.linalg.solve(system, np.vstack([A[rows], np.zeros((tail, A.shape[1]))]))
+    coef = np.zeros((Phi.shape[1], A.shape[1]))
+    coef[rows] = solution[:len(rows)]
+    coef[n:] = solution[len(rows):]
+    return coef
+
+
+def _scaled_bounds(bounds, log):
+    # Bounds on the sampling scale: logarithmic for the rate constants.
+    return np.where(log[:, None], np.log(np.where(log[:, None], bounds, 1.0)), bounds)
+
+
+class Surrogate:
+    """POD surrogate of a kinetic model; use :meth:`fit` or :meth:`load`.
+
+    Attributes
+    ----------
+    t : ndarray
+        Output times.
+    bounds : ndarray, shape (n_params + n_species, 2) or (n_params, 2)
+        Training box of the rate constants followed by the initial
+        concentrations when they vary.
+    regression : {"rbf", "pce"}
+        Regression of the POD coefficients.
+    n_modes : int
+        Number of POD modes.
+    calibration : float
+        Factor from committee spread to error estimate.
+    validation_error : ndarray
+        Largest absolute error of every validation trajectory.
+    """
+
+    def __init__(self, fun, jac, t, bounds, log, n_params, c_ini, regression, basis, mean, modes, coef, committee,
+                 calibration, validation_error, method="Radau", options=None):
+        self.fun = fun
+        self.jac = jac
+        self.t = t
+        self.bounds = bounds
+        self.log = log
+        self.n_params = n_params
+        self.c_ini = c_ini
+        self.regression = regression
+        self.basis = basis
+        self.mean = mean
+        self.modes = modes
+        self.coef = coef
+        self.committee = committee
+        self.calibration = calibration
+        self.validation_error = validation_error
+        self.method = method
+        self.options = options or {}
+        self.n_species = mean.size//t.size
+        scaled = _scaled_bounds(bounds, log)
+        self._low = scaled[:, 0]
+        self._width = scaled[:, 1] - scaled[:, 0]
+        self._varying = self._width > 0
+        # Prediction and committee deviations from one matrix product: the
+        # coefficients followed by every member minus the committee mean.
+        deviations = (committee - committee.mean(axis=0)).transpose(1, 0, 2)
+        self._weights = np.hstack([coef, deviations.reshape(coef.shape[0], -1)])
+        self._norms = (basis**2).sum(axis=1) if regression == "rbf" else None
+
+    def __repr__(self):
+        error = self.validation_error.max() if self.validation_error.size else np.nan
+        return ("Surrogate(%d parameters, %d modes, %s, validation error %.2g)"
+                % (self.bounds.shape[0], self.n_modes, self.regression, error))
+
+    @property
+    def n_modes(self):
+        return self.modes.shape[0]
+
+    @classmethod
+    def fit(cls, fun, t_eval, k_bounds, c_ini, jac=None, c_bounds=None, regression="rbf", n_samples=None, degree=6,
+            n_folds=5, validation=0.2, log_k=True, energy=1 - 1e-12, seed=None, method="Radau", **options):
+        """Sample, solve and fit a surrogate of ``fun`` on the output times ``t_eval``.
+
+        Parameters
+        ----------
+        fun, jac : callable
+            Model ``fun(t, c_ini, k)`` and optional analytic Jacobian; also
+            used for the exact fallback.
+        t_eval : array_like, shape (n_times,)
+            Output times; the integration starts at ``t_eval[0]``.
+        k_bounds : array_like, shape (n_params, 2)
+            Range of every rate constant; equal bounds fix it.
+        c_ini : array_like, shape (n_species,)
+            Initial concentrations, or the centre of ``c_bounds``.
+        c_bounds : array_like, shape (n_species, 2), optional
+            Range of the initial concentrations; fixed at ``c_ini`` if None.
+        regression : {"rbf", "pce"}, optional
+            Radial basis function interpolation or polynomial chaos.
+        n_samples : int, optional
+            Training plus validation samples, best a power of two for the
+            balance of the Sobol sequence. By default 2**(7 + n_dims), at
+            most 4096, for ``"rbf"`` and the power of two above four per
+            basis function for ``"pce"``. The RBF query cost grows in
+            proportion; see the module notes on accuracy.
+        degree : int, optional
+            Total degree of the polynomial chaos.
+        n_folds : int, optional
+            Members of the committee behind the error estimate.
+        validation : float, optional
+            Fraction of the samples kept out of the fits for the calibration
+            and the reported validation error.
+        log_k : bool, optional
+            Scale the rate constants logarithmically (their bounds must then
+            be positive).
+        energy : float, optional
+            Fraction of the trajectory variance kept by the POD modes.
+        seed : int, optional
+            Seed of the sampling.
+        method : str, optional
+            Integration method of the training and fallback solves.
+        **options
+            Further keyword arguments for solve_batch.
+        """
+        t = np.asarray(t_eval, dtype=float)
+        c_ini = np.asarray(c_ini, dtype=float)
+        k_bounds = np.atleast_2d(np.asarray(k_bounds, dtype=float))
+        n_params = k_bounds.shape[0]
+        bounds = k_bounds if c_bounds is None else np.vstack([k_bounds, np.asarray(c_bounds, dtype=float)])
+        log = np.zeros(bounds.shape[0], dtype=bool)
+        log[:n_params] = log_k
+        if np.any(bounds[log] <= 0):
+            raise ValueError("log_k needs positive rate constant bounds.")
+        varying = bounds[:, 1] > bounds[:, 0]
+        n_dims = int(varying.sum())
+        if regression == "pce":
+            basis = _exponents(n_dims, degree)
+            n_samples = n_samples or 2**int(np.ceil(np.log2(4*len(basis))))
+        elif regression == "rbf":
+            n_samples = n_samples or 2**min(7 + n_dims, 12)
+        else:
+            raise ValueError("regression must be 'rbf' or 'pce', got %r." % (regression,))
+
+        U = _unit_samples(n_samples, bounds.shape[0], "sobol", seed)
+        scaled = _scaled_bounds(bounds, log)
+        X = scaled[:, 0] + U*(scaled[:, 1] - scaled[:, 0])
+        params = np.where(log, np.exp(X), X)
+        c0 = params[:, n_params:] if c_bounds is not None else c_ini
+        Y = solve_batch(fun, [t[0], t[-1]], c0, params[:, :n_params], t_eval=t, method=method, jac=jac, **options)
+        Y = Y.reshape(n_samples, -1)
+        U = U[:, varying]
+
+        n_valid = int(round(validation*n_samples))
+        order = np.random.default_rng(seed).permutation(n_samples)
+        valid, train = order[:n_valid], order[n_valid:]
+        if regression == "rbf":
+            basis = U[train]
+        n_features = len(basis) if regression == "pce" else n_dims + 1
+        if train.size <= n_features:
+            raise ValueError("%d training samples for %d basis functions; raise n_samples or lower degree."
+                             % (train.size, n_features))
+
+        mean = Y[train].mean(axis=0)
+        _, s, Vt = np.linalg.svd(Y[train] - mean, full_matrices=False)
+        captured = np.cumsum(s**2)/max(np.sum(s**2), np.finfo(float).tiny)
+        n_modes = min(int(np.searchsorted(captured, energy)) + 1, s.size)
+        modes = Vt[:n_modes]
+        A = (Y[train] - mean) @ modes.T
+
+        Phi = _features(U[train], regression, basis)
+        rows = np.arange(train.size)
+        coef = _fit_coefficients(regression, Phi, A, rows)
+        committee = np.stack([_fit_coefficients(regression, Phi, A, np.setdiff1d(rows, fold))
+                              for fold in np.array_split(rows, n_folds)])
+
+        surrogate = cls(fun, jac, t, bounds, log, n_params, c_ini, regression, basis, mean, modes, coef,
+                        committee, 1.0, np.zeros(0), method, options)
+        if n_valid:
+            predicted, spread = surrogate._evaluate(U[valid])
+            error = np.abs(predicted - Y[valid]).max(axis=1)
+            surrogate.validation_error = error
+            surrogate.calibration = float(np.percentile(error/np.maximum(spread, np.finfo(float).tiny), 95))
+        return surrogate
+
+    def _unit(self, k, c_ini):
+        # Parameters of the cases mapped to the unit cube, shape (N, n_dims).
+        k = np.atleast_2d(np.asarray(k, dtype=float))
+        params = k
+        if self.bounds.shape[0] > self.n_params:
+            c = self.c_ini if c_ini is None else np.asarray(c_ini, dtype=float)
+            params = np.hstack([k, np.broadcast_to(c, (k.shape[0], c.shape[-1]))])
+        X = params.copy()
+        X[:, self.log] = np.log(np.maximum(params[:, self.log], np.finfo(float).tiny))
+        U = (X[:, self._varying] - self._low[self._varying])/self._width[self._varying]
+        fixed = self.bounds[~self._varying, 0]
+        on_fixed = np.abs(params[:, ~self._varying] - fixed) <= 1e-12*np.abs(fixed)
+        inside = np.all((U >= 0) & (U <= 1), axis=1) & np.all(on_fixed, axis=1)
+        if c_ini is not None and self.bounds.shape[0] == self.n_params:
+            # Trained at the fixed c_ini only: other initial states are outside.
+            c = np.asarray(c_ini, dtype=float)
+            inside &= np.all(np.abs(c - self.c_ini) <= 1e-12*np.abs(self.c_ini), axis=-1)
+        return U, inside
+
+    def _evaluate(self, U):
+        # Trajectories (N, n_species*n_times) and committee spread (N,).
+        W = _features(U, self.regression, self.basis, self._norms) @ self._weights
+        n_modes = self.n_modes
+        spread = np.sqrt((W[:, n_modes:]**2).reshape(U.shape[0], -1, n_modes).sum(axis=2)).max(axis=1)
+        return W[:, :n_modes] @ self.modes + self.mean, spread
+
+    def predict(self, k, c_ini=None):
+        """Surrogate trajectories without fallback.
+
+        Returns
+        -------
+        y : ndarray, shape (N_cases, n_species, n_times)
+        estimate : ndarray, shape (N_cases,)
+            Estimated largest absolute error of every trajectory.
+        inside : ndarray of bool, shape (N_cases,)
+            Whether the case lies in the training box.
+        """
+        U, inside = self._unit(k, c_ini)
+        Y, spread = self._evaluate(np.clip(U, 0, 1))
+        return Y.reshape(-1, self.n_species, self.t.size), self.calibration*spread, inside
+
+    def __call__(self, k, c_ini=None, tol=1e-3):
+        """Trajectories of the cases ``k``, solved exactly where the surrogate is not trusted.
+
+        Parameters
+        ----------
+        k : array_like, shape (n_params,) or (N_cases, n_params)
+        c_ini : array_like, shape (n_species,) or (N_cases, n_species), optional
+            Initial concentrations; the training value by default. Cases
+            outside ``c_bounds``, or differing from the training value when
+            it was fixed, are integrated exactly.
+        tol : float, optional
+            Largest accepted estimated absolute error [mol/L].
+
+        Returns
+        -------
+        OptimizeResult
+            With ``t``, ``y`` (N_cases, n_species, n_times), ``estimate``,
+            ``exact`` (the cases integrated instead) and ``n_exact``.
+        """
+        k = np.atleast_2d(np.asarray(k, dtype=float))
+        y, estimate, inside = self.predict(k, c_ini)
+        exact = ~inside | (estimate > tol)
+        if exact.any():
+            c = self.c_ini if c_ini is None else np.asarray(c_ini, dtype=float)
+            c = np.broadcast_to(c, (k.shape[0], c.shape[-1]))[exact]
+            y[exact] = solve_batch(self.fun, [self.t[0], self.t[-1]], c, k[exact], t_eval=self.t,
+                                   method=self.method, jac=self.jac, **self.options)
+            estimate[exact] = 0.0
+        return OptimizeResult(t=self.t, y=y, estimate=estimate, exact=exact, n_exact=int(exact.sum()))
+
+    def save(self, path):
+        """Write the trained surrogate to the ``.npz`` file ``path``."""
+        np.savez(path, t=self.t, bounds=self.bounds, log=self.log, n_params=self.n_params, c_ini=self.c_ini,
+                 regression=self.regression, basis=self.basis, mean=self.mean, modes=self.modes, coef=self.coef,
+                 committee=self.committee, calibration=self.calibration, validation_error=self.validation_error,
+                 method=self.method)
+
+    @classmethod
+    def load(cls, path, fun, jac=None, **options):
+        """Read a surrogate written by :meth:`save`; ``fun`` and ``jac`` serve the fallback."""
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        return cls(fun, jac, arrays["t"], arrays["bounds"], arrays["log"], int(arrays["n_params"]),
+                   arrays["c_ini"], str(arrays["regression"]), arrays["basis"], arrays["mean"], arrays["modes"],
+                   arrays["coef"], arrays["committee"], float(arrays["calibration"]), arrays["validation_error"],
+                   str(arrays["method"]), options)
+
+
+def validation_report(surrogate, k_cases=None, c_ini=None, directory=None, fmt="png"):
+    """Compare the surrogate with the full solver on the k2 sweeps of the example scripts.
+
+    Every case is drawn like the QSSA/REA comparisons of the scripts, with
+    :func:`chemical_kinetics.plotting.plot_comparison`: the surrogate solid,
+    the exact solution dashed.
+
+    Parameters
+    ----------
+    surrogate : Surrogate
+    k_cases : array_like, shape (N_cases, n_params), optional
+        Cases to compare; by default those of the scripts' k2 sweeps (with
+        the scripts' initial concentrations) that lie in the training box.
+    c_ini : array_like, shape (n_species,), optional
+        Initial concentrations of ``k_cases``; the training value by default.
+    directory : str, optional
+        Save the figures there as ``surrogate_<i>.<fmt>`` and close them,
+        instead of returning them.
+    fmt : str, optional
+        File format of the saved figures.
+
+    Returns
+    -------
+    OptimizeResult
+        With ``k``, ``error`` (largest absolute error of every case),
+        ``estimate`` (its estimate) and ``figures`` (paths if saved).
+    """
+    from chemical_kinetics import plotting
+
+    if k_cases is None:
+        if surrogate.n_params not in SCRIPT_CASES:
+            raise ValueError("No example script has %d rate constants; pass k_cases." % surrogate.n_params)
+        k_cases, script_c = SCRIPT_CASES[surrogate.n_params]
+        if c_ini is None and surrogate.bounds.shape[0] > surrogate.n_params:
+            c_ini = script_c
+        k_cases = np.array(k_cases, dtype=float)
+        k_cases = k_cases[surrogate._unit(k_cases, c_ini)[1]]
+        if not len(k_cases):
+            raise ValueError("No case of the example scripts lies in the training box; pass k_cases.")
+    k_cases = np.atleast_2d(np.asarray(k_cases, dtype=float))
+    c = surrogate.c_ini if c_ini is None else np.asarray(c_ini, dtype=float)
+
+    y, estimate, _ = surrogate.predict(k_cases, c_ini)
+    exact = solve_batch(surrogate.fun, [surrogate.t[0], surrogate.t[-1]], c, k_cases, t_eval=surrogate.t,
+                        method=surrogate.method, jac=surrogate.jac, **surrogate.options)
+    error = np.abs(y - exact).max(axis=(1, 2))
+
+    figures = []
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    for i, k in enumerate(k_cases):
+        label = "k = [%s]" % ", ".join("%g" % value for value in k)
+        fig = plotting.plot_comparison(surrogate.t, y[i], exact[i], "surrogate", "full model",
+                                       "Surrogate vs Full Reaction Model, %s (error %.1e)" % (label, error[i]))
+        if directory is None:
+            figures.append(fig)
+        else:
+            path = os.path.join(directory, "surrogate_%d.%s" % (i, fmt))
+            fig.savefig(path)
+            plotting._pyplot().close(fig)
+            figures.append(path)
+    return OptimizeResult(k=k_cases, error=error, estimate=estimate, figures=figures)
@@ -0,0 +1,142 @@
+"""Parallel parameter sweeps with results written to shared memory.
+
+A sweep splits a parameter grid into chunks and hands them to a
+ProcessPoolExecutor. Every worker attaches to one
+``multiprocessing.shared_memory`` block and writes its chunk of results in
+place, so only the (small) parameter chunks are pickled; the trajectories never
+travel back through the executor.
+
+Functions passed to the workers must be picklable, i.e. defined at module
+level. With the default "fork" start method on Linux this includes functions
+defined in the running script.
+"""
+
+import functools
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from chemical_kinetics.batch import solve_batch
+
+
+def _attach(name):
+    # Workers only borrow the block; the parent owns and unlinks it. Before
+    # Python 3.13 attaching always registers the block with the resource
+    # tracker, which the workers share with the parent, so the duplicate
+    # registration is harmless and is cleared by the parent's unlink.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _run_chunk(func, params, shm_name, shape, start):
+    shm = _attach(shm_name)
+    try:
+        out = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        out[start:start + len(params)] = func(params)
+        del out
+    finally:
+        shm.close()
+    return len(params)
+
+
+def _solve_chunk(params, fun, t_span, c_ini, t_eval, method, jac, options):
+    return solve_batch(fun, t_span, c_ini, params, t_eval=t_eval, method=method, jac=jac, **options)
+
+
+def map_sweep(func, params, out_shape, max_workers=None, chunk_size=None, progress=None):
+    """Evaluate ``func`` over the rows of ``params`` in parallel.
+
+    Parameters
+    ----------
+    func : callable
+        Picklable function mapping a (n_chunk, n_params) array of parameters
+        to an array of shape (n_chunk, *out_shape).
+    params : array_like, shape (N_cases, n_params)
+        Parameter grid, one row per case.
+    out_shape : tuple of int
+        Shape of the result of a single case.
+    max_workers : int, optional
+        Number of worker processes; defaults to the number of CPUs. With a
+        single worker the sweep runs in the calling process.
+    chunk_size : int, optional
+        Cases per task. Defaults to about four tasks per worker so that
+        uneven case costs are balanced.
+    progress : callable, optional
+        Called as ``progress(n_done, n_cases)`` after every finished chunk.
+
+    Returns
+    -------
+    ndarray, shape (N_cases, *out_shape)
+    """
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    n_cases = params.shape[0]
+    shape = (n_cases, *out_shape)
+    max_workers = max_workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, math.ceil(n_cases/(4*max_workers)))
+    starts = range(0, n_cases, chunk_size)
+
+    if max_workers == 1:
+        result = np.empty(shape)
+        for start in starts:
+            result[start:start + chunk_size] = func(params[start:start + chunk_size])
+            if progress is not None:
+                progress(min(start + chunk_size, n_cases), n_cases)
+        return result
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, math.prod(shape))*8)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_run_chunk, func, params[start:start + chunk_size], shm.name, shape, start)
+                       for start in starts]
+            done = 0
+            for future in as_completed(futures):
+                done += future.result()
+                if progress is not None:
+                    progress(done, n_cases)
+        result = np.ndarray(shape, dtype=float, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return result
+
+
+def run_sweep(fun, t_span, c_ini, k_cases, t_eval, method="Radau", jac=None, max_workers=None,
+              chunk_size=None, progress=None, **options):
+    """Integrate the model ``fun`` for every row of ``k_cases`` across worker processes.
+
+    Each chunk of rate constants is integrated with
+    :func:`chemical_kinetics.batch.solve_batch`, so the cases inside a chunk
+    are vectorized (or evaluated in closed form for linear networks) while the
+    chunks run in parallel.
+
+    Parameters
+    ----------
+    fun, jac : callable
+        Picklable model ``fun(t, c_ini, k)`` and optional analytic Jacobian.
+    t_span : sequence of float
+        Integration interval ``[t0, tf]``.
+    c_ini : array_like, shape (n_species,)
+        Initial concentrations shared by all cases.
+    k_cases : array_like, shape (N_cases, n_params)
+        Rate constants, one row per case.
+    t_eval : array_like, shape (n_times,)
+        Output times; required so that every case has the same result shape.
+    max_workers, chunk_size, progress
+        See :func:`map_sweep`.
+    **options
+        Further keyword arguments for solve_batch.
+
+    Returns
+    -------
+    ndarray, shape (N_cases, n_species, n_times)
+    """
+    func = functools.partial(_solve_chunk, fun=fun, t_span=t_span, c_ini=c_ini, t_eval=t_eval,
+                             method=method, jac=jac, options=options)
+    out_shape = (np.size(c_ini), np.size(t_eval))
+    return map_sweep(func, k_cases, out_shape, max_workers=max_workers, chunk_size=chunk_size,
+                     progress=progress)
@@ -0,0 +1,197 @@
+"""Precomputed effectiveness-factor tables for reactor hot loops.
+
+A packed-bed model evaluates η(Φ) once per pellet per RHS call. An
+:class:`EffectivenessTable` replaces the special functions of
+:mod:`chemical_kinetics.effectiveness` by a cubic spline in u = ln Φ on a
+uniform grid, so a lookup is one logarithm, one index computation and a
+Horner step, with no search. The spline interpolates η (1 + Φ), which is
+bounded between slowly varying limits (1 for small Φ, 1 + O(1/Φ) for large Φ),
+so its relative error is the relative error of η.
+
+Tables are built by doubling the number of intervals until the relative error
+measured at seven interior points of every interval is below ``rtol``, or
+``max_intervals`` is reached (with a RuntimeWarning); the measured bound is
+stored as ``max_rel_error``. Outside [phi_min, phi_max] the
+exact kernels are used, which evaluate the cheap series and asymptotic
+branches there.
+
+The table pays off for the cylinder, whose kernel needs Bessel functions: a
+lookup is 2 to 20 times faster. The slab and sphere kernels are elementary
+functions. Their tables are only faster for large arrays spread over many
+decades of Φ, and up to about 2.5 times slower for small arrays or Φ of
+order one.
+
+:func:`effectiveness_tables` builds the tables once into a directory of
+``<shape>.npy`` coefficient arrays with ``<shape>.json`` metadata and loads
+them memory-mapped afterwards, so worker processes share the pages of one
+copy.
+"""
+
+import json
+import os
+import tempfile
+import warnings
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+
+from chemical_kinetics.effectiveness import effectiveness_cylinder, effectiveness_slab, effectiveness_sphere
+
+KERNELS = {
+    "slab": effectiveness_slab,
+    "cylinder": effectiveness_cylinder,
+    "sphere": effectiveness_sphere,
+}
+
+# Interior points per interval at which the error bound is checked.
+_CHECK_POINTS = np.linspace(0, 1, 9)[1:-1]
+
+
+class EffectivenessTable:
+    """Cubic-spline lookup table of the effectiveness factor of one pellet shape.
+
+    Use :meth:`build` or :meth:`load` rather than the constructor.
+
+    Attributes
+    ----------
+    shape : str
+        ``"slab"``, ``"cylinder"`` or ``"sphere"``.
+    phi_min, phi_max : float
+        Range covered by the table.
+    max_rel_error : float
+        Largest relative error measured against the exact kernel.
+    rtol, max_intervals : float and int, or None
+        Settings the table was built with (None for tables saved without
+        them).
+    """
+
+    def __init__(self, shape, coefficients, phi_min, phi_max, max_rel_error, rtol=None, max_intervals=None):
+        self.shape = shape
+        self.coefficients = coefficients
+        self.phi_min = phi_min
+        self.phi_max = phi_max
+        self.max_rel_error = max_rel_error
+        self.rtol = rtol
+        self.max_intervals = max_intervals
+        self._u0 = np.log(phi_min)
+        self._h = (np.log(phi_max) - self._u0)/coefficients.shape[1]
+        self._kernel = KERNELS[shape]
+
+    def __repr__(self):
+        return "EffectivenessTable(%r, %d intervals, max_rel_error=%.2g)" % (
+            self.shape, self.coefficients.shape[1], self.max_rel_error)
+
+    @classmethod
+    def build(cls, shape, phi_min=1e-3, phi_max=1e3, rtol=1e-10, max_intervals=2**20):
+        """Tabulate ``shape`` over [phi_min, phi_max] to a relative error below ``rtol``.
+
+        Warns with a RuntimeWarning when ``max_intervals`` intervals do not
+        reach ``rtol``; the table is then returned with its larger
+        ``max_rel_error``.
+        """
+        kernel = KERNELS[shape]
+        u0, u1 = np.log(phi_min), np.log(phi_max)
+        n = 64
+        while True:
+            u = np.linspace(u0, u1, n + 1)
+            phi = np.exp(u)
+            spline = CubicSpline(u, kernel(phi)*(1 + phi))
+            # Rows c3, c2, c1, c0 of the interval polynomials in powers of u - u_i.
+            table = cls(shape, np.ascontiguousarray(spline.c), phi_min, phi_max, 0.0, rtol, max_intervals)
+            check = np.exp((u[:-1, None] + (u[1] - u[0])*_CHECK_POINTS).ravel())
+            exact = kernel(check)
+            error = np.abs(table(check)/exact - 1).max()
+            if error <= rtol or n >= max_intervals:
+                table.max_rel_error = float(error)
+                if error > rtol:
+                    warnings.warn("The %s table reaches a relative error of %.2g with %d intervals, above rtol = %g."
+                                  % (shape, error, n, rtol), RuntimeWarning, stacklevel=2)
+                return table
+            n *= 2
+
+    def __call__(self, thiele):
+        """Effectiveness factor at ``thiele`` (scalar or array of any shape)."""
+        thiele = np.asarray(thiele, dtype=float)
+        phi = np.abs(thiele)
+        inside = (phi >= self.phi_min) & (phi <= self.phi_max)
+        if inside.all():
+            eta = self._lookup(phi)
+        else:
+            eta = np.empty_like(phi)
+            eta[inside] = self._lookup(phi[inside])
+            eta[~inside] = self._kernel(phi[~inside])
+        return eta if eta.ndim else eta[()]
+
+    def _lookup(self, phi):
+        s = (np.log(phi) - self._u0)/self._h
+        c3, c2, c1, c0 = self.coefficients
+        i = np.minimum(s.astype(np.intp), c0.size - 1)
+        d = (s - i)*self._h
+        # Gathering each coefficient row separately is faster than gathering
+        # rows of an (n, 4) array.
+        return (((c3[i]*d + c2[i])*d + c1[i])*d + c0[i])/(1 + phi)
+
+    def save(self, directory):
+        """Write ``<shape>.npy`` and ``<shape>.json`` to ``directory``."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.shape)
+        meta = {"phi_min": self.phi_min, "phi_max": self.phi_max, "max_rel_error": self.max_rel_error,
+                "rtol": self.rtol, "max_intervals": self.max_intervals}
+        _replace(path + ".npy", "wb", lambda f: np.save(f, np.asarray(self.coefficients)))
+        _replace(path + ".json", "w", lambda f: json.dump(meta, f))
+
+    @classmethod
+    def load(cls, directory, shape, mmap_mode="r"):
+        """Load a saved table, memory-mapping the coefficients by default."""
+        path = os.path.join(directory, shape)
+        with open(path + ".json") as f:
+            meta = json.load(f)
+        coefficients = np.load(path + ".npy", mmap_mode=mmap_mode)
+        return cls(shape, coefficients, meta["phi_min"], meta["phi_max"], meta["max_rel_error"],
+                   meta.get("rtol"), meta.get("max_intervals"))
+
+
+def _replace(path, mode, write):
+    # Write through a uniquely named temporary file in the same directory, so
+    # readers never see a partial file and concurrent writers do not collide.
+    with tempfile.NamedTemporaryFile(mode, dir=os.path.dirname(path), prefix=os.path.basename(path) + ".",
+                                     suffix=".tmp", delete=False) as f:
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    os.replace(f.name, path)
+
+
+def effectiveness_tables(directory, phi_min=1e-3, phi_max=1e3, rtol=1e-10, max_intervals=2**20):
+    """Tables of all pellet shapes, built into ``directory`` on first use.
+
+    Saved tables are loaded memory-mapped if they cover [phi_min, phi_max]
+    within ``rtol``, or were built with the same ``rtol`` and
+    ``max_intervals`` (and so cannot be improved by rebuilding); otherwise
+    they are rebuilt and saved.
+
+    Returns
+    -------
+    dict
+        Shape name to :class:`EffectivenessTable`.
+    """
+    tables = {}
+    for shape in KERNELS:
+        table = None
+        if os.path.exists(os.path.join(directory, shape + ".json")):
+            table = EffectivenessTable.load(directory, shape)
+            covers = table.phi_min <= phi_min and table.phi_max >= phi_max
+            # A table that missed rtol at the same settings would only be
+            # rebuilt to the same result.
+            settled = table.max_rel_error <= rtol or (table.rtol == rtol and table.max_intervals == max_intervals)
+            if not (covers and settled):
+                table = None
+        if table is None:
+            table = EffectivenessTable.build(shape, phi_min, phi_max, rtol, max_intervals)
+            table.save(directory)
+            table = EffectivenessTable.load(directory, shape)
+        tables[shape] = table
+    return tables
@@ -0,0 +1,286 @@
+"""Monte Carlo propagation of rate-constant uncertainties.
+
+The uncertain rate constants are given as scipy.stats distributions. Points of
+the unit cube are drawn from a scrambled Sobol sequence, a Latin hypercube or
+plain random sampling, and mapped through the inverse distribution functions.
+The resulting cases are integrated in chunks with
+:func:`chemical_kinetics.batch.solve_batch` (vectorized over the cases of a
+chunk), or across worker processes with
+:func:`chemical_kinetics.sweep.run_sweep`.
+
+Every chunk of trajectories is reduced as soon as it is solved and then
+dropped, so memory does not grow with the number of samples:
+
+- :class:`StreamingStats` keeps the count, mean and sum of squared
+  deviations of every species at every time (merged chunk by chunk), the
+  extremes, and a histogram per species and time from which percentiles are
+  interpolated. The histogram range follows the data: when a chunk falls
+  outside it, the bins of that species and time are merged in pairs and the
+  range doubled, so the percentiles are resolved to 1/n_bins to 2/n_bins of
+  the spread of the samples.
+- With ``sensitivity=True`` the samples follow Saltelli's scheme: matrices A
+  and B of independent points, and for every parameter i the matrix AB_i of
+  A with column i taken from B. The first-order and total Sobol indices
+  then follow from running sums (Saltelli 2010 and Jansen estimators),
+
+      S_i  = mean(f_B (f_ABi - f_A)) / V,
+      ST_i = mean((f_A - f_ABi)²) / (2 V),
+
+  where V is the variance over A and B, at a cost of (n_params + 2) solves per
+  base sample.
+"""
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from chemical_kinetics.batch import solve_batch
+from chemical_kinetics.sweep import run_sweep
+
+SAMPLING = ("sobol", "lhs", "random")
+
+
+class StreamingStats:
+    """Mean, variance, extremes and percentiles of samples arriving in chunks.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        Shape of one sample, e.g. (n_species, n_times).
+    n_bins : int, optional
+        Histogram bins per entry, an even number.
+    """
+
+    def __init__(self, shape, n_bins=512):
+        if n_bins < 2 or n_bins % 2:
+            raise ValueError("n_bins must be an even number >= 2.")
+        self.shape = tuple(shape)
+        self.n_bins = n_bins
+        size = int(np.prod(self.shape))
+        self.count = 0
+        self._mean = np.zeros(size)
+        self._m2 = np.zeros(size)
+        self._min = np.full(size, np.inf)
+        self._max = np.full(size, -np.inf)
+        self._lo = None
+        self._width = None
+        self._counts = np.zeros((size, n_bins))
+
+    def __repr__(self):
+        return "StreamingStats(shape=%s, count=%d)" % (self.shape, self.count)
+
+    def update(self, samples):
+        """Add the samples of shape (m, *shape)."""
+        Y = np.asarray(samples, dtype=float).reshape(-1, self._mean.size)
+        m = Y.shape[0]
+        if m == 0:
+            return
+        # Merge the mean and squared deviations of the chunk (Chan et al.).
+        mean = Y.mean(axis=0)
+        m2 = ((Y - mean)**2).sum(axis=0)
+        n = self.count + m
+        delta = mean - self._mean
+        self._mean += delta*m/n
+        self._m2 += m2 + delta**2*self.count*m/n
+        self.count = n
+        low, high = Y.min(axis=0), Y.max(axis=0)
+        self._min = np.minimum(self._min, low)
+        self._max = np.maximum(self._max, high)
+        self._bin(Y, low, high)
+
+    def _bin(self, Y, low, high):
+        size, n_bins = self._counts.shape
+        if self._lo is None:
+            self._lo = low.copy()
+            spread = high - low
+            self._width = np.where(spread > 0, spread, 1e-12*np.maximum(np.abs(low), 1.0))/n_bins
+        # Widen the range of the entries the chunk falls outside of: merge
+        # the bins in pairs and extend by the old range on the side needed.
+        while True:
+            below = low < self._lo
+            above = high > self._lo + n_bins*self._width
+            if not (below.any() or above.any()):
+                break
+            grow = below | above
+            merged = self._counts[grow].reshape(-1, n_bins//2, 2).sum(axis=2)
+            empty = np.zeros_like(merged)
+            down = below[grow][:, None]
+            self._counts[grow] = np.where(down, np.hstack([empty, merged]), np.hstack([merged, empty]))
+            self._lo[grow] -= np.where(below[grow], n_bins*self._width[grow], 0.0)
+            self._width[grow] *= 2
+        index = np.clip(((Y - self._lo)/self._width).astype(int), 0, n_bins - 1)
+        flat = index + n_bins*np.arange(size)
+        self._counts += np.bincount(flat.ravel(), minlength=size*n_bins).reshape(size, n_bins)
+
+    @property
+    def mean(self):
+        return self._mean.reshape(self.shape)
+
+    @property
+    def variance(self):
+        """Sample variance (with the n - 1 denominator)."""
+        return (self._m2/max(self.count - 1, 1)).reshape(self.shape)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def min(self):
+        return self._min.reshape(self.shape)
+
+    @property
+    def max(self):
+        return self._max.reshape(self.shape)
+
+    def percentile(self, q):
+        """Percentiles ``q`` in [0, 100], interpolated in the histograms.
+
+        Returns an array of shape (len(q), *shape), or ``shape`` for a scalar q.
+        """
+        q = np.asarray(q, dtype=float)
+        cdf = np.cumsum(self._counts, axis=1)
+        out = []
+        for target in np.atleast_1d(q)/100*self.count:
+            index = np.minimum((cdf < target).sum(axis=1), self.n_bins - 1)
+            rows = np.arange(cdf.shape[0])
+            before = np.where(index > 0, cdf[rows, index - 1], 0.0)
+            inside = self._counts[rows, index]
+            fraction = np.divide(target - before, inside, out=np.zeros_like(inside), where=inside > 0)
+            value = self._lo + (index + fraction)*self._width
+            out.append(np.clip(value, self._min, self._max).reshape(self.shape))
+        out = np.array(out)
+        return out[0] if q.ndim == 0 else out
+
+
+def _unit_samples(n, dim, sampling, seed):
+    # Imported here because scipy.stats is slow to import and only needed
+    # when sampling (here and in chemical_kinetics.surrogate).
+    from scipy.stats import qmc
+
+    if sampling == "sobol":
+        return qmc.Sobol(dim, scramble=True, seed=seed).random(n)
+    if sampling == "lhs":
+        return qmc.LatinHypercube(dim, seed=seed).random(n)
+    if sampling == "random":
+        return np.random.default_rng(seed).random((n, dim))
+    raise ValueError("sampling must be one of %s, got %r." % (", ".join(SAMPLING), sampling))
+
+
+def propagate_uncertainty(fun, t_span, c_ini, distributions, t_eval, n_samples=1024, sampling="sobol",
+                          sensitivity=False, percentiles=(5, 50, 95), chunk_size=1024, n_bins=512, seed=None,
+                          method="Radau", jac=None, max_workers=1, progress=None, **options):
+    """Statistics of the trajectories of ``fun`` under uncertain rate constants.
+
+    Parameters
+    ----------
+    fun : callable
+        Species balances ``fun(t, c_ini, k)``, vectorized over cases like the
+        models in :mod:`chemical_kinetics.models`.
+    t_span : sequence of float
+        Integration interval ``[t0, tf]``.
+    c_ini : array_like, shape (n_species,)
+        Initial concentrations.
+    distributions : sequence
+        One entry per rate constant: a frozen scipy.stats distribution, e.g.
+        ``scipy.stats.lognorm(0.1, scale=k1)``, or a float for a constant.
+    t_eval : array_like, shape (n_times,)
+        Times at which the statistics are computed.
+    n_samples : int, optional
+        Number of samples, or of base samples with ``sensitivity``; a power
+        of two keeps the balance of the Sobol sequence.
+    sampling : {"sobol", "lhs", "random"}, optional
+        Scrambled Sobol sequence, Latin hypercube or plain Monte Carlo.
+    sensitivity : bool, optional
+        Also estimate first-order and total Sobol indices of every uncertain
+        rate constant, at (n_uncertain + 2) solves per base sample.
+    percentiles : sequence of float, optional
+        Percentiles in [0, 100] to report.
+    chunk_size : int, optional
+        Samples (base samples with ``sensitivity``) integrated and reduced at
+        a time; bounds the memory used.
+    n_bins : int, optional
+        Histogram bins per species and time for the percentiles.
+    seed : int, optional
+        Seed of the sampling.
+    method, jac
+        Integration method and optional analytic Jacobian, see
+        :func:`chemical_kinetics.batch.solve_batch`.
+    max_workers : int, optional
+        Worker processes per chunk (see :func:`chemical_kinetics.sweep.run_sweep`);
+        1 integrates in the calling process.
+    progress : callable, optional
+        Called as ``progress(n_done, n_samples)`` after every chunk.
+    **options
+        Further keyword arguments for solve_batch.
+
+    Returns
+    -------
+    OptimizeResult
+        With ``t``, ``mean``, ``std``, ``min`` and ``max`` (n_species,
+        n_times), ``percentiles`` (len(percentiles), n_species, n_times) at
+        ``q``, ``stats`` the :class:`StreamingStats`, ``n_samples`` and
+        ``n_solves``; with ``sensitivity`` also ``first_order`` and ``total``
+        (n_uncertain, n_species, n_times), NaN where the variance is zero, and
+        ``uncertain`` the indices of the uncertain rate constants.
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    c_ini = np.asarray(c_ini, dtype=float)
+    shape = (c_ini.size, t_eval.size)
+    uncertain = [i for i, dist in enumerate(distributions) if hasattr(dist, "ppf")]
+    fixed = np.array([np.nan if i in uncertain else float(dist) for i, dist in enumerate(distributions)])
+    d = len(uncertain)
+    if d == 0:
+        raise ValueError("At least one distribution is needed.")
+
+    def rate_constants(U):
+        k = np.tile(fixed, (U.shape[0], 1))
+        for column, i in enumerate(uncertain):
+            k[:, i] = distributions[i].ppf(U[:, column])
+        return k
+
+    def solve(k):
+        if max_workers == 1:
+            return solve_batch(fun, t_span, c_ini, k, t_eval=t_eval, method=method, jac=jac, **options)
+        return run_sweep(fun, t_span, c_ini, k, t_eval, method=method, jac=jac, max_workers=max_workers,
+                         **options)
+
+    U = _unit_samples(n_samples, 2*d if sensitivity else d, sampling, seed)
+    stats = StreamingStats(shape, n_bins)
+    first = np.zeros((d,) + shape)
+    total = np.zeros((d,) + shape)
+    n_solves = 0
+    for start in range(0, n_samples, chunk_size):
+        chunk = U[start:start + chunk_size]
+        m = chunk.shape[0]
+        if not sensitivity:
+            stats.update(solve(rate_constants(chunk)))
+            n_solves += m
+        else:
+            A, B = chunk[:, :d], chunk[:, d:]
+            blocks = [A, B]
+            for i in range(d):
+                AB = A.copy()
+                AB[:, i] = B[:, i]
+                blocks.append(AB)
+            Y = solve(rate_constants(np.concatenate(blocks))).reshape(d + 2, m, *shape)
+            n_solves += (d + 2)*m
+            f_A, f_B = Y[0], Y[1]
+            stats.update(Y[:2].reshape(2*m, *shape))
+            for i in range(d):
+                first[i] += (f_B*(Y[2 + i] - f_A)).sum(axis=0)
+                total[i] += ((f_A - Y[2 + i])**2).sum(axis=0)
+            del Y
+        if progress is not None:
+            progress(min(start + chunk_size, n_samples), n_samples)
+
+    result = OptimizeResult(t=t_eval, mean=stats.mean, std=stats.std, min=stats.min, max=stats.max,
+                            q=np.asarray(percentiles, dtype=float), percentiles=stats.percentile(percentiles),
+                            stats=stats, n_samples=n_samples, n_solves=n_solves)
+    if sensitivity:
+        # Population variance over A and B, matching the estimators' means.
+        V = stats.variance*(stats.count - 1)/stats.count
+        nonzero = V > 1e-14*np.maximum(stats.mean**2, 1e-300)
+        result.first_order = np.divide(first/n_samples, V, out=np.full_like(first, np.nan), where=nonzero)
+        result.total = np.divide(total/(2*n_samples), V, out=np.full_like(total, np.nan), where=nonzero)
+        result.uncertain = np.array(uncertain)
+    return result
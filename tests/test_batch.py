@@ -0,0 +1,22 @@
+"""Batched integration against one solve_ivp call per case."""
+
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+from chemical_kinetics.batch import solve_batch
+from chemical_kinetics.models import series_reactions_batch, series_reactions_batch_jac
+
+T = np.linspace(0, 5, 11)
+K = [[2, 10], [2, 100]]
+
+
+@pytest.mark.parametrize("method", ["RK45", "Radau", "BDF", "LSODA"])
+@pytest.mark.parametrize("jac", [None, series_reactions_batch_jac])
+def test_methods(method, jac):
+    y = solve_batch(series_reactions_batch, [0, 5], [1, 0, 0], K, t_eval=T, method=method, jac=jac,
+                    closed_form=False, rtol=1e-8, atol=1e-10)
+    for case, k in enumerate(K):
+        ref = solve_ivp(series_reactions_batch, [0, 5], [1, 0, 0], method="Radau", t_eval=T, args=[k],
+                        rtol=1e-10, atol=1e-12)
+        np.testing.assert_allclose(y[case], ref.y, atol=1e-6)
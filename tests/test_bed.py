@@ -0,0 +1,44 @@
+"""Steady outlets of the bed against the closed forms for A -> B."""
+
+import numpy as np
+import pytest
+
+from chemical_kinetics.bed import pellet_effectiveness, solve_bed
+from chemical_kinetics.effectiveness import effectiveness_sphere
+from chemical_kinetics.models import series_reactions_batch, series_reactions_batch_jac
+
+# k2 = 0 leaves A -> B; with L = u = 1 the Damköhler number is k1.
+N_CELLS = 400
+
+
+def danckwerts(Da, Pe):
+    # Outlet fraction of a first-order reaction with axial dispersion.
+    a = np.sqrt(1 + 4*Da/Pe)
+    return 4*a*np.exp(Pe/2)/((1 + a)**2*np.exp(a*Pe/2) - (1 - a)**2*np.exp(-a*Pe/2))
+
+
+@pytest.mark.parametrize("jac", [None, series_reactions_batch_jac])
+def test_plug_flow(jac):
+    # Upwind cells in series reach (1 + k dz/u)^-n, which tends to exp(-1).
+    sol = solve_bed(series_reactions_batch, [0, 4], [1, 0, 0], [1.0, 0.0], n_cells=N_CELLS, jac=jac, t_eval=[4],
+                    rtol=1e-8, atol=1e-10)
+    assert sol.y.shape == (3, N_CELLS, 1) and sol.z[-1] == pytest.approx(1 - 0.5/N_CELLS)
+    np.testing.assert_allclose(sol.outlet[0, -1], (1 + 1/N_CELLS)**-N_CELLS, rtol=1e-9)
+    np.testing.assert_allclose(sol.outlet[:, -1], [np.exp(-1), 1 - np.exp(-1), 0], rtol=2e-3, atol=1e-12)
+
+
+def test_dispersion():
+    sol = solve_bed(series_reactions_batch, [0, 5], [1, 0, 0], [1.0, 0.0], dispersion=0.1, n_cells=N_CELLS,
+                    jac=series_reactions_batch_jac, t_eval=[5], rtol=1e-8, atol=1e-10)
+    np.testing.assert_allclose(sol.outlet[0, -1], danckwerts(1.0, 10.0), rtol=2e-3)
+
+
+def test_pellet():
+    # Thiele modulus R/3 sqrt(k1/D) = 1 for k1; k2 is not first order.
+    eta = pellet_effectiveness([4.0, 0.0], shape="sphere", size=1.5, first_order=[0])
+    np.testing.assert_allclose(eta, [effectiveness_sphere(1.0), 1.0])
+    sol = solve_bed(series_reactions_batch, [0, 4], [1, 0, 0], [4.0, 0.0], n_cells=N_CELLS, effectiveness=eta,
+                    jac=series_reactions_batch_jac, t_eval=[4], rtol=1e-8, atol=1e-10)
+    np.testing.assert_allclose(sol.k_eff, [4*eta[0], 0])
+    np.testing.assert_allclose(sol.outlet[0, -1], (1 + 4*eta[0]/N_CELLS)**-N_CELLS, rtol=1e-9)
+    np.testing.assert_allclose(sol.outlet[0, -1], np.exp(-4*eta[0]), rtol=1e-2)
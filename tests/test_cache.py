@@ -0,0 +1,77 @@
+"""Cached trajectories against fresh integrations."""
+
+import os
+
+import numpy as np
+import pytest
+
+from chemical_kinetics.cache import TrajectoryCache
+
+
+def decay(t, c, k):
+    return [-k[0]*c[0]]
+
+
+@pytest.mark.parametrize("directory", [False, True])
+def test_direction(tmp_path, directory):
+    cache = TrajectoryCache(directory=str(tmp_path) if directory else None)
+    options = dict(args=[[1.0]], rtol=1e-10, atol=1e-12)
+    assert not cache.solve(decay, [0, 5], [1.0], **options).cached
+    assert cache.solve(decay, [0, 5], [1.0], t_eval=[1, 2], **options).cached
+    if directory:
+        cache.clear()
+    sol = cache.solve(decay, [0, -2], [1.0], **options)
+    assert not sol.cached
+    np.testing.assert_allclose(sol.y[0], [1, np.exp(2)], rtol=1e-6)
+    assert cache.solve(decay, [0, -1], [1.0], **options).cached
+    if directory:
+        cache.clear()
+        sol = cache.solve(decay, [0, -1.5], [1.0], t_eval=[-1.5, -0.5], **options)
+        assert sol.cached
+        np.testing.assert_allclose(sol.y[0], np.exp([1.5, 0.5]), rtol=1e-6)
+
+
+def test_t_eval_outside_span():
+    with pytest.raises(ValueError, match="t_span"):
+        TrajectoryCache().solve(decay, [0, 1], [1.0], t_eval=[3, 8], args=[[1.0]])
+
+
+def make_decay(k):
+    def decay_k(t, c):
+        return [-k*c[0]]
+    return decay_k
+
+
+def test_closures(tmp_path):
+    cache = TrajectoryCache(directory=str(tmp_path))
+    slow = cache.solve(make_decay(1.0), [0, 1], [1.0], rtol=1e-10, atol=1e-12)
+    fast = cache.solve(make_decay(5.0), [0, 1], [1.0], rtol=1e-10, atol=1e-12)
+    assert not fast.cached
+    np.testing.assert_allclose([slow.y[0, -1], fast.y[0, -1]], np.exp([-1, -5]), rtol=1e-6)
+    # Equal closures share the entry, also through the disk tier.
+    cache.clear()
+    assert cache.solve(make_decay(5.0), [0, 1], [1.0], rtol=1e-10, atol=1e-12).cached
+
+
+def make_default(rate):
+    def decay_default(t, c, k=rate):
+        return [-k*c[0]]
+    return decay_default
+
+
+def test_jac_and_defaults():
+    cache = TrajectoryCache()
+    cache.solve(make_default(1.0), [0, 1], [1.0])
+    assert not cache.solve(make_default(2.0), [0, 1], [1.0]).cached
+    assert not cache.solve(make_default(1.0), [0, 1], [1.0], jac=lambda t, c: [[-1.0]]).cached
+    assert cache.solve(make_default(1.0), [0, 1], [1.0]).cached
+
+
+def test_bound_methods_stay_in_memory(tmp_path):
+    class Model:
+        def rhs(self, t, c):
+            return [-c[0]]
+
+    cache = TrajectoryCache(directory=str(tmp_path))
+    cache.solve(Model().rhs, [0, 1], [1.0])
+    assert len(cache) == 1 and not os.listdir(tmp_path)
@@ -0,0 +1,26 @@
+"""Steady states of the series reactions against their closed forms."""
+
+import numpy as np
+import pytest
+
+from chemical_kinetics.equilibrium import solve_steady_state
+from chemical_kinetics.models import series_reactions_batch, series_reactions_batch_jac
+
+
+@pytest.mark.parametrize("jac", [None, series_reactions_batch_jac])
+def test_irreversible(jac):
+    # A -> B -> C ends in pure C; without the conservation law Newton would
+    # stop at the zero state, which also has zero rates.
+    sol = solve_steady_state(series_reactions_batch, [1, 0, 0], [[2, 1], [2, 3]], jac=jac)
+    np.testing.assert_allclose(sol.c, [[0, 0, 1], [0, 0, 1]], atol=1e-12)
+    assert sol.conservation.shape == (1, 3)
+
+
+@pytest.mark.parametrize("jac", [None, series_reactions_batch_jac])
+def test_reversible(jac):
+    # A <-> B <-> C with K1 = k1/k_1 and K2 = k2/k_2: CB = K1 CA, CC = K2 CB.
+    k = np.array([[1, 0.5, 10, 10], [1, 0.5, 100, 50]])
+    sol = solve_steady_state(series_reactions_batch, [2, 0.8, 0], k, jac=jac)
+    K1, K2 = k[:, 0]/k[:, 1], k[:, 2]/k[:, 3]
+    CA = 2.8/(1 + K1 + K1*K2)
+    np.testing.assert_allclose(sol.c, np.c_[CA, K1*CA, K1*K2*CA], rtol=1e-10)
@@ -0,0 +1,56 @@
+"""Event times of the series reactions against their closed forms."""
+
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+from chemical_kinetics.events import conversion, crossing, solve_until, steady_state
+from chemical_kinetics.models import series_reactions_batch, series_reactions_batch_jac
+
+# A -> B -> C: CA = exp(-k1 t), so 99 % conversion of A is at ln(100)/k1.
+K = np.array([[0.5, 1.0], [2.0, 1.0], [20.0, 3.0], [200.0, 1000.0]])
+
+
+@pytest.mark.parametrize("compact", [True, False])
+@pytest.mark.parametrize("jac", [None, series_reactions_batch_jac])
+def test_conversion(compact, jac):
+    sol = solve_until(series_reactions_batch, [0, 100], [1, 0, 0], K, [conversion(0.99)], jac=jac, compact=compact,
+                      rtol=1e-10, atol=1e-12)
+    assert sol.status == 1 and sol.stopped.all()
+    np.testing.assert_allclose(sol.t_events[0], np.log(100)/K[:, 0], rtol=1e-6)
+    np.testing.assert_allclose(sol.t_stop, sol.t_events[0])
+    np.testing.assert_allclose(sol.c_stop[:, 0], 0.01, rtol=1e-6)
+
+
+def test_recorded_and_t_eval():
+    # B peaks where k1 CA = k2 CB; the crossing of CB = 0.2 is only recorded,
+    # and after the stop at 90 % conversion t_eval holds NaN.
+    k = np.array([[1.0, 2.0]])
+    t = np.linspace(0, 3, 31)
+    criteria = [crossing(1, 0.2, direction=1, terminal=False), conversion(0.9)]
+    sol = solve_until(series_reactions_batch, [0, 3], [1, 0, 0], k, criteria, t_eval=t, rtol=1e-10, atol=1e-12)
+    ref = solve_ivp(series_reactions_batch, [0, 3], [1, 0, 0], method="Radau", args=[k[0]], rtol=1e-10,
+                    atol=1e-12, events=[criterion.event([1, 0, 0], k[0]) for criterion in criteria])
+    np.testing.assert_allclose(sol.t_events[:, 0], [ref.t_events[0][0], np.log(10)], rtol=1e-6)
+    np.testing.assert_allclose(sol.y_events[0, 0, 1], 0.2, rtol=1e-6)
+    before = t <= np.log(10)
+    np.testing.assert_allclose(sol.y[0, 0, before], np.exp(-t[before]), rtol=1e-6)
+    assert np.isnan(sol.y[0, :, ~before]).all()
+
+
+def test_steady_state():
+    # A <-> B with k1 = k_1 = 1 relaxes as exp(-2 t): |dCA/dt| = exp(-2 t).
+    sol = solve_until(series_reactions_batch, [0, 50], [1, 0, 0], [[1, 1, 0, 0]],
+                      [steady_state(series_reactions_batch, tol=1e-4)], rtol=1e-12, atol=1e-14)
+    np.testing.assert_allclose(sol.t_stop, np.log(1e4)/2, rtol=1e-5)
+
+
+def test_unmet_and_met_at_start():
+    sol = solve_until(series_reactions_batch, [0, 1], [[1, 0, 0], [0, 0, 1]], [[1, 1], [1, 1]], [conversion(0.99)])
+    assert sol.status == 0 and list(sol.stopped) == [False, True]
+    np.testing.assert_allclose(sol.t_stop, [1, 0])
+
+
+def test_backward_span():
+    with pytest.raises(ValueError, match="forward"):
+        solve_until(series_reactions_batch, [1, 0], [1, 0, 0], [[1, 1]], [conversion(0.5)])
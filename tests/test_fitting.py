@@ -0,0 +1,21 @@
+"""Rate constants recovered from synthetic batch data."""
+
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+from chemical_kinetics.fitting import Experiment, fit_rate_constants
+from chemical_kinetics.models import series_reactions_batch, series_reactions_batch_jac
+
+T = np.linspace(0.1, 5, 10)
+
+
+@pytest.mark.parametrize("method", ["Radau", "BDF", "LSODA"])
+def test_fit(method):
+    # k2 = 1000 is stiff enough for LSODA to switch to BDF and call jac.
+    data = solve_ivp(series_reactions_batch, [0, 5], [1, 0, 0], t_eval=T, args=[[2, 1000]], method="Radau",
+                     rtol=1e-10, atol=1e-12).y
+    result = fit_rate_constants(series_reactions_batch, [Experiment(T, data, [1, 0, 0])], [1, 300],
+                                jac=series_reactions_batch_jac, method=method,
+                                solver_options=dict(rtol=1e-8, atol=1e-10))
+    np.testing.assert_allclose(result.k, [2, 1000], rtol=1e-3)
@@ -0,0 +1,75 @@
+"""Compiled kernels and the ROS3 integrator against the Python models.
+
+Every test runs with Numba (when installed) and with the plain-Python
+fallback, loaded as a second copy of the module with Numba hidden.
+"""
+
+import importlib.util
+import sys
+
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+from chemical_kinetics import jit
+from chemical_kinetics.models import series_reactions_batch, series_reactions_batch_jac
+
+K = {2: [2.0, 1000.0], 4: [1.0, 0.5, 10.0, 5.0]}
+
+
+@pytest.fixture(scope="module", params=["numba", "python"])
+def backend(request):
+    if request.param == "numba":
+        if not jit.HAVE_NUMBA:
+            pytest.skip("Numba is not installed.")
+        return jit
+    saved = sys.modules.get("numba")
+    sys.modules["numba"] = None
+    try:
+        spec = importlib.util.spec_from_file_location("chemical_kinetics._jit_fallback", jit.__file__)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        if saved is None:
+            del sys.modules["numba"]
+        else:
+            sys.modules["numba"] = saved
+    assert not module.HAVE_NUMBA
+    return module
+
+
+def reference(t_span, c_ini, k, t_eval):
+    return solve_ivp(series_reactions_batch, t_span, c_ini, method="Radau", t_eval=t_eval, args=[k],
+                     rtol=1e-11, atol=1e-13).y
+
+
+@pytest.mark.parametrize("n_params", [2, 4])
+def test_kernels(backend, n_params):
+    rhs, jac = backend.compiled(series_reactions_batch)
+    c = np.array([0.7, 0.2, 0.1])
+    np.testing.assert_allclose(rhs(0.0, c, K[n_params]), series_reactions_batch(0.0, c, K[n_params]))
+    np.testing.assert_allclose(jac(0.0, c, K[n_params]), series_reactions_batch_jac(0.0, c, K[n_params]))
+
+
+@pytest.mark.parametrize("n_params", [2, 4])
+def test_forward(backend, n_params):
+    t = np.linspace(0, 5, 11)
+    sol = backend.solve_jit(series_reactions_batch, [0, 5], [1, 0, 0], K[n_params], t_eval=t, rtol=1e-6,
+                            atol=1e-9)
+    assert sol.success
+    np.testing.assert_array_equal(sol.t, t)
+    np.testing.assert_allclose(sol.y, reference([0, 5], [1, 0, 0], K[n_params], t), atol=1e-4)
+
+
+def test_backward(backend):
+    t = np.linspace(0, -1, 5)
+    sol = backend.solve_jit(series_reactions_batch, [0, -1], [1, 0, 0], [2, 1], t_eval=t, rtol=1e-8, atol=1e-11)
+    assert sol.success and sol.n_accepted > 0
+    np.testing.assert_allclose(sol.y, reference([0, -1], [1, 0, 0], [2, 1], t), rtol=1e-5)
+
+
+def test_t_eval(backend):
+    with pytest.raises(ValueError, match="within"):
+        backend.solve_jit(series_reactions_batch, [0, 1], [1, 0, 0], [2, 1], t_eval=[3, 8])
+    with pytest.raises(ValueError, match="sorted"):
+        backend.solve_jit(series_reactions_batch, [0, -1], [1, 0, 0], [2, 1], t_eval=[-1, 0])
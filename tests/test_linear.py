@@ -0,0 +1,56 @@
+"""The closed-form solution against solve_ivp."""
+
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+from chemical_kinetics.batch import solve_batch
+from chemical_kinetics.linear import solve_kinetics
+from chemical_kinetics.models import series_reactions_batch
+
+T = np.linspace(0, 5, 11)
+
+
+def periodic(t, c_ini, k):
+    # First order with a coefficient equal at t = 0 and t = 5.
+    return [-k[0]*np.cos(2*np.pi*t/5)*c_ini[0]]
+
+
+def test_closed_form():
+    sol = solve_kinetics(series_reactions_batch, [0, 5], [1.0, 0, 0], t_eval=T, args=[[2, 10]])
+    ref = solve_ivp(series_reactions_batch, [0, 5], [1.0, 0, 0], t_eval=T, args=[[2, 10]], method="Radau",
+                    rtol=1e-10, atol=1e-12)
+    assert sol.message.startswith("Closed-form")
+    np.testing.assert_allclose(sol.y, ref.y, atol=1e-8)
+
+
+def test_time_dependent():
+    ref = solve_ivp(periodic, [0, 5], [1.0], t_eval=T, args=[[1.0]], rtol=1e-10, atol=1e-12)
+    sol = solve_kinetics(periodic, [0, 5], [1.0], t_eval=T, args=[[1.0]], rtol=1e-10, atol=1e-12)
+    assert not sol.message.startswith("Closed-form")
+    np.testing.assert_allclose(sol.y, ref.y, atol=1e-8)
+    y = solve_batch(periodic, [0, 5], [1.0], [[1.0]], t_eval=T, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(y[0], ref.y, atol=1e-8)
+
+
+def test_t_eval_outside_span():
+    with pytest.raises(ValueError, match="t_span"):
+        solve_kinetics(series_reactions_batch, [0, 1], [1.0, 0, 0], t_eval=[3, 8], args=[[2, 10]])
+    with pytest.raises(ValueError, match="t_span"):
+        solve_batch(series_reactions_batch, [0, 1], [1.0, 0, 0], [[2, 10]], t_eval=[3, 8])
+
+
+def clipped(t, c_ini, k):
+    # Written for scalar states: max() of an array with more than one entry
+    # raises, so the stacked linearity probe cannot be evaluated.
+    rate = k[0]*max(c_ini[0], 0.0)
+    return [-rate, rate - k[1]*c_ini[1]]
+
+
+def test_scalar_model():
+    ref = solve_ivp(clipped, [0, 5], [1.0, 0], t_eval=T, args=[[2, 1]], rtol=1e-10, atol=1e-12)
+    sol = solve_kinetics(clipped, [0, 5], [1.0, 0], t_eval=T, args=[[2, 1]], rtol=1e-10, atol=1e-12)
+    assert sol.success and not sol.message.startswith("Closed-form")
+    np.testing.assert_allclose(sol.y, ref.y, atol=1e-8)
+    y = solve_batch(clipped, [0, 5], [1.0, 0], [[2, 1]], t_eval=T, vectorized=False, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(y[0], ref.y, atol=1e-8)
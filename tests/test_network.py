@@ -0,0 +1,53 @@
+"""Network balances against the hand-written models, Jacobians against finite differences."""
+
+import numpy as np
+import pytest
+
+from chemical_kinetics.models import series_reactions_batch
+from chemical_kinetics.network import Reaction, ReactionNetwork
+
+
+def langmuir(C, k):
+    return k*C[0]/(1 + C[2])
+
+
+def langmuir_jac(C, k):
+    return [k/(1 + C[2]), 0.0, -k*C[0]/(1 + C[2])**2, 0.0]
+
+
+def network(rate_jac):
+    return ReactionNetwork(["A", "B", "C", "D"],
+                           ["2 A + B -> C", "A <-> D", "C + D -> 0",
+                            Reaction({"A": 1}, {"B": 1}, rate=langmuir, rate_jac=rate_jac)])
+
+
+def finite_differences(net, C, k, h=1e-6):
+    columns = []
+    for i in range(C.shape[0]):
+        up, down = C.copy(), C.copy()
+        up[i] += h
+        down[i] -= h
+        columns.append((net.rhs(0.0, up, k) - net.rhs(0.0, down, k))/(2*h))
+    return np.stack(columns, axis=1)
+
+
+def test_series():
+    net = ReactionNetwork(["A", "B", "C"], ["A <-> B", "B <-> C"])
+    C = np.random.default_rng(0).random((3, 5))
+    k = [2.0, 0.5, 10.0, 1.0]
+    np.testing.assert_allclose(net.rhs(0.0, C, k), series_reactions_batch(0.0, C, k))
+
+
+@pytest.mark.parametrize("rate_jac", [None, langmuir_jac])
+def test_jacobian(rate_jac):
+    net = network(rate_jac)
+    rng = np.random.default_rng(1)
+    # One state, and a batch of states with one rate-constant vector per case.
+    C1, k1 = rng.random(4) + 0.1, np.array([1.0, 2.0, 0.5, 3.0, 1.5])
+    Cn, kn = rng.random((4, 6)) + 0.1, rng.random((5, 6)) + 0.5
+    for C, k in ((C1, k1), (Cn, kn)):
+        J = net.jac(0.0, C, k)
+        np.testing.assert_allclose(J, finite_differences(net, C, k), rtol=1e-6, atol=1e-8)
+    J = net.jac(0.0, C1, k1)
+    np.testing.assert_allclose(net.jac_sparse(0.0, C1, k1).toarray(), J, atol=1e-12)
+    assert np.all(net.jac_sparsity.toarray()[J != 0] == 1)
@@ -0,0 +1,41 @@
+"""The pellet solver against the analytic first-order solutions."""
+
+import numpy as np
+import pytest
+
+from chemical_kinetics.effectiveness import (effectiveness_cylinder, effectiveness_slab,
+                                             effectiveness_sphere, slab_profile)
+from chemical_kinetics.models import series_reactions_batch, series_reactions_batch_jac
+from chemical_kinetics.network import ReactionNetwork
+from chemical_kinetics.pellet import SHAPES, solve_pellet
+
+THIELE = np.array([0.1, 1, 2, 10])
+ANALYTIC = {"slab": effectiveness_slab, "cylinder": effectiveness_cylinder, "sphere": effectiveness_sphere}
+
+
+def first_order_k(shape):
+    # A -> B with k = ((a+1) Φ)^2, D = 1 and L = 1 gives the Thiele modulus Φ.
+    return [((SHAPES[shape] + 1)*THIELE)**2, np.zeros_like(THIELE)]
+
+
+def test_slab_profile():
+    sol = solve_pellet(series_reactions_batch, [1.0, 0, 0], first_order_k("slab"),
+                       jac=series_reactions_batch_jac, n_cells=200)
+    np.testing.assert_allclose(sol.y[0], slab_profile(THIELE, sol.x), atol=1e-4)
+
+
+@pytest.mark.parametrize("shape", sorted(SHAPES))
+def test_effectiveness(shape):
+    sol = solve_pellet(series_reactions_batch, [1.0, 0, 0], first_order_k(shape), shape=shape,
+                       jac=series_reactions_batch_jac, n_cells=200)
+    np.testing.assert_allclose(sol.effectiveness[0], ANALYTIC[shape](THIELE), rtol=5e-4)
+
+
+def test_finite_difference_jacobian():
+    net = ReactionNetwork(["A", "B", "C"], ["2 A -> B", "B <-> C"])
+    k = [[1, 100], [1, 1], [0.5, 0.5]]
+    analytic = solve_pellet(net.rhs, [1, 0, 0], k, shape="sphere", jac=net.jac)
+    estimated = solve_pellet(net.rhs, [1, 0, 0], k, shape="sphere")
+    np.testing.assert_allclose(estimated.y, analytic.y, atol=1e-9)
+    assert np.isnan(analytic.effectiveness[2]).all()
+    assert analytic.effectiveness[0, 1] < analytic.effectiveness[0, 0] < 1
@@ -0,0 +1,26 @@
+"""Automatic reductions against the hand-derived QSSA and REA models."""
+
+import numpy as np
+
+from chemical_kinetics.models import rea_initial_conditions, series_reactions_batch, series_reactions_batch_jac
+from chemical_kinetics.reduction import reduce_model
+
+
+def test_qssa_initial_state():
+    # The fast B -> C projection takes the slow-manifold B = k1/(k2 - k1) CA
+    # out of C, which starts empty: it is clipped at zero and reported.
+    model = reduce_model(series_reactions_batch, [1, 0, 0], [1, 1000], jac=series_reactions_batch_jac)
+    assert model.fast_species == [1]
+    assert np.all(model.c_ini >= 0)
+    np.testing.assert_allclose(model.c_ini, [1, 1/999, 0], atol=1e-12)
+    np.testing.assert_allclose(model.clipped, 1/999, rtol=1e-9)
+    error = model.error([0, 5], np.linspace(0, 5, 51))
+    assert error["max_abs_error"].max() < 2e-3
+
+
+def test_rea_initial_state():
+    k = [1, 0.5, 1000, 500]
+    model = reduce_model(series_reactions_batch, [2, 0.8, 0], k, jac=series_reactions_batch_jac)
+    # Equal to the hand-derived split up to the timescale ratio.
+    np.testing.assert_allclose(model.c_ini, rea_initial_conditions([2, 0.8, 0], k[2]/k[3]), atol=2*model.epsilon)
+    assert model.clipped == 0
@@ -0,0 +1,24 @@
+"""Headless rendering of sweep results."""
+
+import os
+
+import numpy as np
+import pytest
+
+from chemical_kinetics import render
+
+T = np.linspace(0, 5, 51)
+C = np.stack([np.exp(-k*T)*np.ones((3, 1)) for k in (1, 2, 3)])
+
+
+def test_in_process(tmp_path):
+    paths = render.render_cases(T, C, str(tmp_path), C_base=C[0], max_workers=1)
+    assert [os.path.basename(path) for path in paths] == ["case_0000.png", "case_0001.png", "case_0002.png"]
+    assert all(os.path.getsize(path) > 0 for path in paths)
+    # The calling process keeps no template after the call.
+    assert not render._templates
+
+
+def test_grid_needs_base(tmp_path):
+    with pytest.raises(ValueError, match="C_base"):
+        render.render_cases(T, C, str(tmp_path), template="grid", max_workers=1)
@@ -0,0 +1,83 @@
+"""The simulation service through its in-process and HTTP clients."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from chemical_kinetics.batch import solve_batch
+from chemical_kinetics.effectiveness import effectiveness_sphere
+from chemical_kinetics.models import series_reactions_batch, series_reactions_batch_jac
+from chemical_kinetics.service import HTTPClient, LocalClient, SimulationService, serve
+
+T = list(np.linspace(0, 5, 11))
+
+
+def full(k2):
+    return {"model": "full", "k": [1, 0.5, k2, k2], "c_ini": [2, 0.8, 0], "t_eval": T}
+
+
+def run(coroutine):
+    return asyncio.run(coroutine())
+
+
+def test_coalescing():
+    async def scenario():
+        async with SimulationService(max_workers=1, batch_window=0.05) as service:
+            client = LocalClient(service)
+            requests = [full(k2) for k2 in (10, 100, 1000)]*3
+            responses = await asyncio.gather(*[client.solve(request) for request in requests])
+            return responses, service.metrics()
+
+    responses, metrics = run(scenario)
+    expected = solve_batch(series_reactions_batch, [0, 5], [2, 0.8, 0], [[1, 0.5, k2, k2] for k2 in (10, 100, 1000)],
+                           t_eval=T, jac=series_reactions_batch_jac)
+    for i, response in enumerate(responses):
+        np.testing.assert_allclose(response["y"], expected[i % 3], rtol=1e-12)
+    # Nine requests, three distinct cases, one vectorized solve.
+    assert metrics["requests"] == 9
+    assert metrics["coalesced"] == 6
+    assert metrics["solves"] == 1
+    assert metrics["latency"]["max"] >= metrics["queue_wait"]["max"] > 0
+
+
+def test_backpressure():
+    async def scenario():
+        async with SimulationService(max_workers=1, max_queue=2, batch_window=0, max_batch=1) as service:
+            client = LocalClient(service)
+            await asyncio.gather(*[client.solve(full(k2)) for k2 in range(1, 9)])
+            return service.metrics()
+
+    metrics = run(scenario)
+    assert metrics["requests"] == 8
+    assert metrics["max_queue_depth"] <= 2
+    assert metrics["solves"] == 8
+
+
+def test_invalid_request():
+    async def scenario():
+        async with SimulationService(max_workers=1) as service:
+            await LocalClient(service).solve({"model": "rea", "k": [1, 0.5], "c_ini": [2, 0.8, 0], "t_eval": T})
+
+    with pytest.raises(ValueError, match="rate constants"):
+        run(scenario)
+
+
+def test_http(tmp_path):
+    path = str(tmp_path/"service.sock")
+
+    async def scenario():
+        async with SimulationService(max_workers=1) as service:
+            server = await serve(service, path=path)
+            async with HTTPClient(path=path) as client:
+                eta = await client.solve({"effectiveness": "sphere", "thiele": [0.5, 5]})
+                with pytest.raises(ValueError, match="unknown model"):
+                    await client.solve({"model": "batch"})
+                metrics = await client.metrics()
+            server.close()
+            await server.wait_closed()
+            return eta, metrics
+
+    eta, metrics = run(scenario)
+    np.testing.assert_allclose(eta["eta"], effectiveness_sphere(np.array([0.5, 5])))
+    assert metrics["requests"] == 1
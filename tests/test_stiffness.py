@@ -0,0 +1,32 @@
+"""Automatic method selection against solve_ivp."""
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from chemical_kinetics.models import series_reactions_batch, series_reactions_batch_jac
+from chemical_kinetics.stiffness import solve_auto
+
+
+def decay(t, c, k):
+    return -k[0]*c
+
+
+def test_switching():
+    t = np.linspace(0, 5, 11)
+    sol = solve_auto(series_reactions_batch, [0, 5], [1, 0, 0], t_eval=t, jac=series_reactions_batch_jac,
+                     args=[[2, 1e4]], rtol=1e-8, atol=1e-10)
+    ref = solve_ivp(series_reactions_batch, [0, 5], [1, 0, 0], method="Radau", t_eval=t, args=[[2, 1e4]],
+                    rtol=1e-10, atol=1e-12)
+    assert sol.methods[0][2] == "Radau"
+    np.testing.assert_allclose(sol.y, ref.y, atol=1e-6)
+
+
+def test_backward():
+    t = np.linspace(0, -2, 5)
+    sol = solve_auto(decay, [0, -2], [1.0], t_eval=t, args=[[1.0]], rtol=1e-8, atol=1e-10)
+    np.testing.assert_array_equal(sol.t, t)
+    np.testing.assert_allclose(sol.y[0], np.exp(-t), rtol=1e-6)
+    sol = solve_auto(decay, [0, -2], [1.0], args=[[1.0]], rtol=1e-8, atol=1e-10)
+    assert sol.t[-1] == -2
+    np.testing.assert_allclose(sol.y[0, -1], np.exp(2), rtol=1e-6)
+
@@ -0,0 +1,68 @@
+"""Streamed trajectories read back from the store against solve_ivp."""
+
+import os
+
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+from chemical_kinetics.models import series_reactions_batch, series_reactions_batch_jac
+from chemical_kinetics.stream import TrajectoryStore, solve_stream
+
+K = [2.0, 1.0]
+
+
+@pytest.mark.parametrize("t_span, t_eval", [([0, 5], np.linspace(0, 5, 51)), ([0, -1], np.linspace(0, -1, 21)),
+                                            ([0, 5], np.linspace(1, 4, 7))])
+def test_round_trip(tmp_path, t_span, t_eval):
+    sol = solve_stream(series_reactions_batch, t_span, [1, 0, 0], str(tmp_path), t_eval=t_eval, args=[K],
+                       jac=series_reactions_batch_jac, chunk_size=8, rtol=1e-8, atol=1e-10)
+    assert sol.success
+    t, y = TrajectoryStore(str(tmp_path)).read()
+    ref = solve_ivp(series_reactions_batch, t_span, [1, 0, 0], method="Radau", t_eval=t_eval, args=[K],
+                    rtol=1e-11, atol=1e-13)
+    np.testing.assert_array_equal(t, t_eval)
+    np.testing.assert_allclose(y, ref.y, atol=1e-6)
+
+
+def test_steps_and_overwrite(tmp_path):
+    # A long run followed by a short one in the same directory: the chunks
+    # of the first run beyond the second's end are removed.
+    solve_stream(series_reactions_batch, [0, 5], [1, 0, 0], str(tmp_path), args=[K], chunk_size=4, rtol=1e-10,
+                 atol=1e-12)
+    long_chunks = len([name for name in os.listdir(tmp_path) if name.startswith("chunk_")])
+    sol = solve_stream(series_reactions_batch, [0, 5], [1, 0, 0], str(tmp_path), args=[K], chunk_size=4)
+    store = sol.store
+    assert store.status == "finished"
+    n_chunks = len([name for name in os.listdir(tmp_path) if name.startswith("chunk_")])
+    assert n_chunks == -(-len(store)//4) < long_chunks
+    t, y = store.read()
+    assert t[0] == 0 and t[-1] == 5 and np.all(np.diff(t) > 0)
+    np.testing.assert_allclose(y.sum(axis=0), 1, rtol=1e-6)
+
+
+def test_t_eval_outside_span(tmp_path):
+    with pytest.raises(ValueError, match="within"):
+        solve_stream(series_reactions_batch, [0, 1], [1, 0, 0], str(tmp_path), t_eval=[0.5, 2], args=[K])
+
+
+def test_reader_during_run(tmp_path):
+    # The model opens the store while the run is in progress; every snapshot
+    # is a running prefix of the finished trajectory.
+    snapshots = []
+
+    def model(t, c, k):
+        if os.path.exists(tmp_path / "trajectory.json"):
+            store = TrajectoryStore(str(tmp_path))
+            snapshots.append((store.status, store.read()))
+        return series_reactions_batch(t, c, k)
+
+    sol = solve_stream(model, [0, 5], [1, 0, 0], str(tmp_path), t_eval=np.linspace(0, 5, 101), args=[K],
+                       method="RK45", chunk_size=8, flush_interval=0)
+    t, y = sol.store.read()
+    assert any(0 < snapshot_t.size < t.size for _, (snapshot_t, _) in snapshots)
+    for status, (snapshot_t, snapshot_y) in snapshots:
+        assert status == "running"
+        n = snapshot_t.size
+        np.testing.assert_array_equal(snapshot_t, t[:n])
+        np.testing.assert_array_equal(snapshot_y, y[:, :n])
@@ -0,0 +1,46 @@
+"""The surrogate against the full model, with its exact fallback."""
+
+import numpy as np
+import pytest
+
+from chemical_kinetics.batch import solve_batch
+from chemical_kinetics.models import series_reactions_batch, series_reactions_batch_jac
+from chemical_kinetics.surrogate import Surrogate
+
+T = np.linspace(0, 5, 26)
+
+
+@pytest.fixture(scope="module")
+def surrogate():
+    return Surrogate.fit(series_reactions_batch, T, [[1, 4], [1, 100]], [1, 0, 0], jac=series_reactions_batch_jac,
+                         n_samples=128, seed=0)
+
+
+def exact(k, c_ini=(1, 0, 0)):
+    return solve_batch(series_reactions_batch, [0, 5], c_ini, k, t_eval=T, jac=series_reactions_batch_jac)
+
+
+def test_accuracy(surrogate):
+    k = [[2, 10], [3, 50]]
+    y, estimate, inside = surrogate.predict(k)
+    assert inside.all()
+    np.testing.assert_array_less(np.abs(y - exact(k)).max(axis=(1, 2)), 0.02)
+
+
+def test_fallback(surrogate):
+    # Outside the k box, and a c_ini other than the fixed training state.
+    sol = surrogate([[2, 10], [8, 10]], tol=1.0)
+    np.testing.assert_array_equal(sol.exact, [False, True])
+    np.testing.assert_allclose(sol.y[1], exact([[8, 10]])[0], rtol=1e-12)
+    sol = surrogate([2, 50], c_ini=[2, 0, 0], tol=1.0)
+    assert sol.exact[0]
+    np.testing.assert_allclose(sol.y[0, 0, 0], 2.0)
+    np.testing.assert_allclose(sol.y, exact([[2, 50]], [2, 0, 0]), rtol=1e-12)
+    assert not surrogate([2, 50], c_ini=[1, 0, 0], tol=1.0).exact[0]
+
+
+def test_save_load(surrogate, tmp_path):
+    surrogate.save(str(tmp_path/"surrogate.npz"))
+    loaded = Surrogate.load(str(tmp_path/"surrogate.npz"), series_reactions_batch, jac=series_reactions_batch_jac)
+    k = [[2, 10], [3, 50]]
+    np.testing.assert_array_equal(loaded.predict(k)[0], surrogate.predict(k)[0])
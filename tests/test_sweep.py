@@ -0,0 +1,34 @@
+"""Parallel sweeps against a serial run."""
+
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+from chemical_kinetics.models import series_reactions_batch, series_reactions_batch_jac
+from chemical_kinetics.sweep import map_sweep, run_sweep
+
+T = np.linspace(0, 2, 9)
+K = np.column_stack([np.geomspace(0.5, 50, 10), np.linspace(1, 3, 10)])
+
+
+def squares(params):
+    return np.stack([params**2, -params], axis=1)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_map_sweep(max_workers):
+    done = []
+    result = map_sweep(squares, K, (2, 2), max_workers=max_workers, chunk_size=3,
+                       progress=lambda n, total: done.append((n, total)))
+    np.testing.assert_array_equal(result, squares(K))
+    assert sorted(done)[-1] == (10, 10) and len(done) == 4
+
+
+@pytest.mark.parametrize("closed_form", [True, False])
+def test_run_sweep(closed_form):
+    result = run_sweep(series_reactions_batch, [0, 2], [1, 0, 0], K, T, jac=series_reactions_batch_jac,
+                       max_workers=2, chunk_size=4, closed_form=closed_form, rtol=1e-10, atol=1e-12)
+    serial = np.array([solve_ivp(series_reactions_batch, [0, 2], [1, 0, 0], method="Radau", t_eval=T, args=[k],
+                                 rtol=1e-10, atol=1e-12).y for k in K])
+    assert result.shape == (10, 3, 9)
+    np.testing.assert_allclose(result, serial, atol=1e-7)
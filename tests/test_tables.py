@@ -0,0 +1,43 @@
+"""Effectiveness tables against the exact kernels."""
+
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from chemical_kinetics.tables import KERNELS, EffectivenessTable, effectiveness_tables
+
+PHI = np.geomspace(1e-4, 1e4, 301)
+
+
+def test_accuracy(tmp_path):
+    tables = effectiveness_tables(str(tmp_path))
+    for shape, kernel in KERNELS.items():
+        np.testing.assert_allclose(tables[shape](PHI), kernel(PHI), rtol=1e-9)
+
+
+def test_concurrent_save(tmp_path):
+    table = effectiveness_tables(str(tmp_path/"build"))["sphere"]
+    directory = str(tmp_path/"shared")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: table.save(directory), range(32)))
+    assert sorted(os.listdir(directory)) == ["sphere.json", "sphere.npy"]
+    np.testing.assert_array_equal(EffectivenessTable.load(directory, "sphere")(PHI), table(PHI))
+
+
+def test_max_intervals(tmp_path):
+    # rtol cannot be met with 128 intervals: the build warns, and the saved
+    # tables are reused by later calls with the same settings.
+    with pytest.warns(RuntimeWarning, match="above rtol"):
+        tables = effectiveness_tables(str(tmp_path), rtol=1e-15, max_intervals=128)
+    assert all(table.max_rel_error > 1e-15 for table in tables.values())
+    mtimes = {name: os.stat(tmp_path/name).st_mtime_ns for name in os.listdir(tmp_path)}
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        effectiveness_tables(str(tmp_path), rtol=1e-15, max_intervals=128)
+    assert {name: os.stat(tmp_path/name).st_mtime_ns for name in os.listdir(tmp_path)} == mtimes
+    with pytest.warns(RuntimeWarning):
+        effectiveness_tables(str(tmp_path), rtol=1e-15, max_intervals=256)
+    assert EffectivenessTable.load(str(tmp_path), "slab").max_intervals == 256
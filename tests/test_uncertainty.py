@@ -0,0 +1,64 @@
+"""Streaming statistics and uncertainty propagation against direct computation."""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from chemical_kinetics.models import series_reactions_batch
+from chemical_kinetics.uncertainty import StreamingStats, _unit_samples, propagate_uncertainty
+
+T = np.linspace(0, 2, 5)
+
+
+def test_streaming_stats():
+    # Chunks that move away from the range of the first one force the
+    # histograms to widen on both sides.
+    rng = np.random.default_rng(1)
+    samples = np.concatenate([rng.normal(0, 1, (500, 2, 3)), rng.normal(5, 1, (500, 2, 3)),
+                              rng.normal(-8, 2, (500, 2, 3))])
+    s = StreamingStats((2, 3), n_bins=256)
+    for chunk in np.split(samples, [100, 500, 501, 1200]):
+        s.update(chunk)
+    assert s.count == 1500
+    np.testing.assert_allclose(s.mean, samples.mean(axis=0))
+    np.testing.assert_allclose(s.variance, samples.var(axis=0, ddof=1))
+    np.testing.assert_array_equal(s.min, samples.min(axis=0))
+    np.testing.assert_array_equal(s.max, samples.max(axis=0))
+    q = [1, 25, 50, 75, 99]
+    spread = samples.max(axis=0) - samples.min(axis=0)
+    assert np.all(np.abs(s.percentile(q) - np.percentile(samples, q, axis=0)) <= 2*spread/256)
+    assert s.percentile(50).shape == (2, 3)
+
+
+def test_n_bins():
+    with pytest.raises(ValueError, match="even"):
+        StreamingStats((2,), n_bins=5)
+
+
+def test_propagate_uncertainty():
+    # A -> B -> C with an uncertain k1: CA = exp(-k1 t) at the same samples,
+    # and CA decreases with k1, so its percentile q is at the k1 quantile 1 - q.
+    dist = stats.lognorm(0.3, scale=2.0)
+    sol = propagate_uncertainty(series_reactions_batch, [0, 2], [1, 0, 0], [dist, 1.0], T, n_samples=1024,
+                                chunk_size=300, seed=3)
+    k1 = dist.ppf(_unit_samples(1024, 1, "sobol", 3)[:, 0])
+    CA = np.exp(-np.outer(k1, T))
+    assert sol.n_solves == 1024
+    np.testing.assert_allclose(sol.mean[0], CA.mean(axis=0), rtol=1e-8)
+    np.testing.assert_allclose(sol.std[0], CA.std(axis=0, ddof=1), rtol=1e-6, atol=1e-12)
+    np.testing.assert_allclose(sol.mean.sum(axis=0), 1, rtol=1e-8)
+    np.testing.assert_allclose(sol.percentiles[:, 0], np.exp(-np.outer(dist.ppf([0.95, 0.5, 0.05]), T)),
+                               atol=0.01)
+
+
+def test_sensitivity():
+    # CA depends on k1 only, CC on both.
+    distributions = [stats.uniform(1, 2), stats.uniform(1, 2)]
+    sol = propagate_uncertainty(series_reactions_batch, [0, 2], [1, 0, 0], distributions, T[1:],
+                                n_samples=2048, sensitivity=True, seed=0)
+    assert sol.n_solves == 4*2048
+    np.testing.assert_array_equal(sol.uncertain, [0, 1])
+    np.testing.assert_allclose(sol.first_order[:, 0], [[1]*4, [0]*4], atol=0.05)
+    np.testing.assert_allclose(sol.total[:, 0], [[1]*4, [0]*4], atol=0.05)
+    assert np.all(sol.first_order[:, 2] > 0.05)
+    assert np.all(sol.first_order[:, 2].sum(axis=0) <= sol.total[:, 2].sum(axis=0) + 0.05)